@@ -20,8 +20,8 @@ from gaphor.core.modeling.properties import (
 def _directed_relationship_property_path_target_source(type):
     return lambda self: [
         element.targetContext
-        for element in self.model.select(type)
-        if element.sourceContext is self and element.targetContext
+        for element in DirectedRelationshipPropertyPath.sourceContext.referrers(self)
+        if isinstance(element, type) and element.targetContext
     ]
 
 from gaphor.UML.uml import NamedElement
@@ -309,8 +309,8 @@ AbstractRequirement.derived = derived("derived", AbstractRequirement, 0, "*",
 
 AbstractRequirement.derivedFrom = derived("derivedFrom", AbstractRequirement, 0, "*", lambda self: [
     element.sourceContext
-    for element in self.model.select(DeriveReqt)
-    if element.sourceContext and element.targetContext is self
+    for element in DirectedRelationshipPropertyPath.targetContext.referrers(self)
+    if isinstance(element, DeriveReqt) and element.sourceContext
 ])
 
 # 36: override AbstractRequirement.master: derived[AbstractRequirement]
@@ -15,7 +15,7 @@ from gaphas.geometry import Rectangle, distance_rectangle_point
 
 from gaphor import UML
 from gaphor.core.modeling.properties import association, attribute, enumeration
-from gaphor.core.styling import Style, merge_styles
+from gaphor.core.styling import Style, merge_inline_style
 from gaphor.diagram.presentation import LinePresentation, Named, get_center_pos
 from gaphor.diagram.shapes import (
     Box,
@@ -388,7 +388,7 @@ class AssociationEnd:
 
         p1 is the line end and p2 is the last but one point of the line.
         """
-        style = merge_styles(context.style, self._inline_style)
+        style = merge_inline_style(context.style, self._inline_style)
         ofs = 4.0
 
         dx = float(p2[0]) - float(p1[0])
@@ -417,4 +417,6 @@ def swap_element(element, new_class):
     Used in certain cases where the underlying element type may change.
     """
     if element.__class__ is not new_class:
+        old_class = element.__class__
         element.__class__ = new_class
+        element.model.reindex(element, old_class)
@@ -302,6 +302,16 @@ def test_metaclass_extension(factory):
     assert e.ownedEnd.type is s
 
 
+def test_metaclass_extension_after_unlink(factory):
+    c = factory.create(UML.Class)
+    s = factory.create(UML.Stereotype)
+    e = UML.recipes.create_extension(c, s)
+
+    e.unlink()
+
+    assert not c.extension
+
+
 def test_operation_parameter_deletion(factory):
     assert 0 == len(factory.lselect())
 
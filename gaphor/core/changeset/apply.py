@@ -86,9 +86,10 @@ def _(change: RefChange, element_factory, modeling_factory):
 
     if prop and prop.opposite:
         if other := next(
-            element_factory.select(
-                lambda e: isinstance(e, RefChange)
-                and e.element_id == change.property_ref
+            (
+                e
+                for e in element_factory.select(RefChange)
+                if e.element_id == change.property_ref
                 and e.property_ref == change.element_id
                 and e.property_name == prop.opposite
             ),
@@ -42,7 +42,7 @@ def test_similar_element_factories(current, ancestor, incoming):
     assert not change_set
 
 
-def test_added_element(current, ancestor, incoming, saver):
+def test_added_element(current, ancestor, incoming, saver, tmp_path):
     diagram = incoming.create(Diagram)
 
     change = next(compare(current, ancestor, incoming))
@@ -51,7 +51,7 @@ def test_added_element(current, ancestor, incoming, saver):
     assert change.element_id == diagram.id
     assert change.element_name == "Diagram"
 
-    with open("conflict.gaphor", "w", encoding="utf-8") as f:
+    with open(tmp_path / "conflict.gaphor", "w", encoding="utf-8") as f:
         f.write(saver())
 
 
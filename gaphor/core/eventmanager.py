@@ -1,32 +1,78 @@
 """Event Manager."""
 
+from __future__ import annotations
+
 from collections import deque
+from contextlib import contextmanager
+from typing import Iterator
 
-from generic.event import Event, Handler
+from generic.event import Event, Handler, HandlerSet
 from generic.event import Manager as _Manager
+from generic.registry import Registry, TypeAxis
 
 from gaphor.abc import Service
 
 
-def event_handler(*event_types):
+def event_handler(*event_types, batch=False):
     """Mark a function/method as an event handler for a particular type of
-    event."""
+    event.
+
+    With ``batch``, the handler is called with a list of events, instead
+    of a single event. Events sent during :meth:`EventManager.batch` are
+    delivered in one call.
+    """
 
     def wrapper(func):
         func.__event_types__ = event_types
+        func.__event_batch__ = batch
         return func
 
     return wrapper
 
 
+class _CachingRegistry(Registry[HandlerSet]):
+    """Registry that caches the handler sets per event type.
+
+    Handler sets are updated in place, so the cache only needs to be
+    cleared when a handler set is registered for a new event type.
+    """
+
+    def __init__(self) -> None:
+        super().__init__(("event_type", TypeAxis()))
+        self._handler_sets: dict[type, tuple[HandlerSet, ...]] = {}
+
+    def register(self, target: HandlerSet, *arg_keys, **kw_keys) -> None:
+        super().register(target, *arg_keys, **kw_keys)
+        self._handler_sets.clear()
+
+    def query(self, event: Event) -> Iterator[HandlerSet]:
+        try:
+            return iter(self._handler_sets[type(event)])
+        except KeyError:
+            handler_sets = self._handler_sets[type(event)] = tuple(
+                filter(None, super().query(event))
+            )
+            return iter(handler_sets)
+
+
+class _CachingManager(_Manager):
+    """Event manager that caches the handler sets per event type."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.registry = _CachingRegistry()
+
+
 class EventManager(Service):
     """The Event Manager."""
 
     def __init__(self) -> None:
-        self._events = _Manager()
-        self._priority = _Manager()
+        self._events = _CachingManager()
+        self._priority = _CachingManager()
+        self._batched = _CachingManager()
         self._queue: deque[Event] = deque()
         self._handling = False
+        self._pending: dict[Handler, list[Event]] | None = None
 
     def shutdown(self) -> None:
         pass
@@ -36,8 +82,14 @@ class EventManager(Service):
 
         Handlers are triggered (executed) when specific events are
         emitted through the handle() method.
+
+        Handlers marked with ``event_handler(..., batch=True)`` are called
+        with a list of events.
         """
-        self._subscribe(handler, self._events)
+        if getattr(handler, "__event_batch__", False):
+            self._subscribe(handler, self._batched)
+        else:
+            self._subscribe(handler, self._events)
 
     def priority_subscribe(self, handler: Handler) -> None:
         """Register a handler.
@@ -67,6 +119,7 @@ class EventManager(Service):
         for et in event_types:
             self._priority.unsubscribe(handler, et)
             self._events.unsubscribe(handler, et)
+            self._batched.unsubscribe(handler, et)
 
     def handle(self, *events: Event) -> None:
         """Send event notifications to registered handlers."""
@@ -80,6 +133,53 @@ class EventManager(Service):
             self._handling = True
             try:
                 while queue:
-                    self._events.handle(queue.pop())
+                    self._handle(queue.pop())
             finally:
                 self._handling = False
+
+    def _handle(self, event: Event) -> None:
+        try:
+            self._events.handle(event)
+        finally:
+            pending = {} if self._pending is None else self._pending
+            for handler_set in self._batched.registry.query(event):
+                for handler in handler_set:
+                    pending.setdefault(handler, []).append(event)
+            if self._pending is None and pending:
+                self._deliver(pending)
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Collect events for batch handlers and deliver them when the batch
+        ends.
+
+        Priority handlers and regular handlers are still called for each
+        event right away. Batch handlers receive all events sent during the
+        batch in one call, in the order the events were handled. Batches
+        can be nested. Events are delivered when the outermost batch ends.
+
+        >>> event_manager = EventManager()
+        >>> with event_manager.batch():
+        ...     event_manager.handle(object())
+        """
+        if self._pending is not None:
+            yield
+            return
+
+        self._pending = {}
+        try:
+            yield
+        finally:
+            pending, self._pending = self._pending, None
+            assert pending is not None
+            self._deliver(pending)
+
+    def _deliver(self, pending: dict[Handler, list[Event]]) -> None:
+        exceptions = []
+        for handler, events in pending.items():
+            try:
+                handler(events)
+            except Exception as e:
+                exceptions.append(e)
+        if exceptions:
+            raise ExceptionGroup("Error while handling events", exceptions)
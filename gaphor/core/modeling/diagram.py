@@ -5,10 +5,13 @@ Diagrams can be visualized and edited.
 from __future__ import annotations
 
 import logging
+from collections import OrderedDict
 from dataclasses import dataclass
 from functools import lru_cache
 from typing import (
+    TYPE_CHECKING,
     Callable,
+    Hashable,
     Iterable,
     Iterator,
     Protocol,
@@ -24,6 +27,7 @@ from cairo import Context as CairoContext
 from gaphor.core.modeling.collection import collection
 from gaphor.core.modeling.element import (
     Element,
+    Handler,
     Id,
     RepositoryProtocol,
     generate_id,
@@ -36,11 +40,16 @@ from gaphor.core.modeling.properties import (
     attribute,
     relation_many,
     relation_one,
+    umlproperty,
 )
 from gaphor.core.modeling.stylesheet import StyleSheet
-from gaphor.core.styling import CompiledStyleSheet, Style, StyleNode
+from gaphor.core.styling import ChildrenOf, CompiledStyleSheet, Style, StyleNode
+from gaphor.core.styling.pseudo import PseudoStyleNode
 from gaphor.i18n import translation
 
+if TYPE_CHECKING:
+    from gaphor.core.modeling.elementdispatcher import ElementDispatcher
+
 log = logging.getLogger(__name__)
 
 # Not all styles are required: "background-color", "font-weight",
@@ -79,30 +88,58 @@ class DrawContext:
     dropzone: bool
 
 
-@lru_cache()
+@lru_cache(maxsize=None)
+def attribute_names(cls: type) -> dict[str, str]:
+    """Map lower case (normalized) names to attribute names of a class."""
+    names: dict[str, str] = {}
+    for name in dir(cls):
+        names.setdefault(name.lower(), name)
+    return names
+
+
 def attrname(obj, lower_name):
     """Look up a real attribute name based on a lower case (normalized)
     name."""
-    return next((name for name in dir(obj) if name.lower() == lower_name), lower_name)
+    if name := attribute_names(obj.__class__).get(lower_name):
+        return name
+    return next(
+        (name for name in getattr(obj, "__dict__", ()) if name.lower() == lower_name),
+        lower_name,
+    )
 
 
 NO_ATTR = object()
 
+# Marks a lookup that depends on state we can not watch
+UNTRACKED = None
+
+
+def rgetattr(obj, names, dependencies=None):
+    """Recursively get a name, based on a list of names.
 
-def rgetattr(obj, names):
-    """Recursively get a name, based on a list of names."""
+    If a ``dependencies`` list is provided, the (element, property name)
+    pairs the value depends on are added to it.
+    """
     name, *tail = names
-    v = getattr(obj, attrname(obj, name), NO_ATTR)
+    real_name = attrname(obj, name)
+    v = getattr(obj, real_name, NO_ATTR)
+    if dependencies is not None and obj is not NO_ATTR and obj is not None:
+        if not isinstance(obj, Element):
+            dependencies.append(UNTRACKED)
+        elif isinstance(getattr(type(obj), real_name, None), umlproperty):
+            dependencies.append((obj, real_name))
+        elif v is not NO_ATTR:
+            dependencies.append(UNTRACKED)
     if isinstance(v, (collection, list, tuple)):
         if tail and not v:
             yield NO_ATTR
         if tail:
             for m in v:
-                yield from rgetattr(m, tail)
+                yield from rgetattr(m, tail, dependencies)
         else:
             yield from v
     elif tail:
-        yield from rgetattr(v, tail)
+        yield from rgetattr(v, tail, dependencies)
     elif v is not None:
         yield v
 
@@ -121,7 +158,9 @@ def attrstr(obj):
     return ""
 
 
-def lookup_attribute(element: Element, name: str) -> str | None:
+def lookup_attribute(
+    element: Element, name: str, dependencies: list | None = None
+) -> str | None:
     """Look up an attribute from an element.
 
     Attributes can be nested, e.g. ``owner.name``.
@@ -130,13 +169,89 @@ def lookup_attribute(element: Element, name: str) -> str | None:
     ``None`` if the attribute does not exist.
     """
     fields = name.split(".")
-    values = list(rgetattr(element, fields))
+    values = list(rgetattr(element, fields, dependencies))
     attr_values = [v for v in values if v is not NO_ATTR]
     if not attr_values and NO_ATTR in values:
         return None
     return " ".join(map(attrstr, attr_values)).strip()
 
 
+class StyleAttributes:
+    """Memoized attribute lookups for style nodes.
+
+    Values are cached per element and attribute name. A value is dropped
+    as soon as a property on its path changes, via the element dispatcher,
+    and ``changed`` is called with the (element, name) key.
+    Lookups that depend on plain Python attributes can not be watched, and
+    are not cached.
+
+    At most ``max_size`` values are kept. When the cache is full, the least
+    recently used value is dropped and reported as changed, since it's no
+    longer watched.
+    """
+
+    max_size = 10000
+
+    def __init__(
+        self,
+        element_dispatcher: ElementDispatcher | None,
+        changed: Callable[[tuple[Element, str]], None] | None = None,
+    ):
+        self.element_dispatcher = element_dispatcher
+        self.changed = changed
+        self._values: OrderedDict[tuple[Element, str], str | None] = OrderedDict()
+        self._handlers: dict[tuple[Element, str], Handler] = {}
+
+    def lookup(self, element: Element, name: str) -> str | None:
+        key = (element, name)
+        values = self._values
+        try:
+            value = values[key]
+        except KeyError:
+            pass
+        else:
+            values.move_to_end(key)
+            return value
+
+        if not (dispatcher := self.element_dispatcher):
+            return lookup_attribute(element, name)
+
+        dependencies: list[tuple[Element, str] | None] = []
+        value = lookup_attribute(element, name, dependencies)
+        if UNTRACKED in dependencies:
+            return value
+
+        if len(values) >= self.max_size:
+            self._evict(dispatcher)
+
+        def invalidate(_event):
+            self._values.pop(key, None)
+            self._handlers.pop(key, None)
+            dispatcher.unsubscribe(invalidate)
+            if changed := self.changed:
+                changed(key)
+
+        for dependency, property_name in dependencies:  # type: ignore[misc]
+            dispatcher.subscribe(invalidate, dependency, property_name)
+        values[key] = value
+        self._handlers[key] = invalidate
+        return value
+
+    def _evict(self, dispatcher: ElementDispatcher) -> None:
+        key, _ = self._values.popitem(last=False)
+        dispatcher.unsubscribe(self._handlers.pop(key))
+        # The value is no longer watched, so consider it changed
+        if changed := self.changed:
+            changed(key)
+
+    def clear(self) -> None:
+        if dispatcher := self.element_dispatcher:
+            for handler in self._handlers.values():
+                dispatcher.unsubscribe(handler)
+        self._values.clear()
+        self._handlers.clear()
+
+
 def qualifiedName(element: Element) -> list[str]:
     """Returns the qualified name of the element as a tuple."""
     qname = [getattr(e, "name", "??") for e in self_and_owners(element)]
@@ -170,7 +285,7 @@ class StyledDiagram:
         )
 
     def attribute(self, name: str) -> str | None:
-        return lookup_attribute(self.diagram, name)
+        return self.diagram.lookup_style_attribute(self.diagram, name)
 
     def state(self) -> Sequence[str]:
         return ()
@@ -187,6 +302,25 @@ class StyledDiagram:
         )
 
 
+def style_node_owner(node: StyleNode) -> Hashable:
+    """The presentation item or diagram a style node belongs to.
+
+    This is the item for the item's style node, and for the nodes of its
+    shapes and pseudo-elements. Cached styles are invalidated per owner.
+    """
+    while True:
+        if isinstance(node, StyledItem):
+            return node.item
+        elif isinstance(node, StyledDiagram):
+            return node.diagram
+        elif isinstance(node, PseudoStyleNode):
+            node = node.node
+        elif parent := node.parent():
+            node = parent
+        else:
+            return node
+
+
 class StyledItem:
     """Wrapper to allow style information to be retrieved.
 
@@ -239,9 +373,10 @@ class StyledItem:
         yield from (node.style_node(self) for node in item.css_nodes())
 
     def attribute(self, name: str) -> str | None:
-        a = lookup_attribute(self.item, name)
+        lookup = self.diagram.lookup_style_attribute
+        a = lookup(self.item, name)
         if a is None and self.item.subject:
-            a = lookup_attribute(self.item.subject, name)
+            a = lookup(self.item.subject, name)
         return a
 
     def state(self) -> Sequence[str]:
@@ -279,8 +414,12 @@ class Diagram(Element):
         self._connections = gaphas.connections.Connections()
         self._connections.add_handler(self._on_constraint_solved)
 
+        self._style_sheet: StyleSheet | None = None
+        self._style_sheet_source: CompiledStyleSheet | None = None
         self._compiled_style_sheet: CompiledStyleSheet | None = None
         self._registered_views: set[gaphas.model.View] = set()
+        self._style_attributes: StyleAttributes | None = None
+        self._item_order: dict[Presentation, int] | None = None
 
         self._watcher = self.watcher()
         self._watcher.watch("ownedPresentation", self._owned_presentation_changed)
@@ -296,7 +435,13 @@ class Diagram(Element):
         return qualifiedName(self)
 
     def _owned_presentation_changed(self, event):
+        self._item_order = None
+        if compiled_style_sheet := self._compiled_style_sheet:
+            # Top level items are the children of the diagram
+            compiled_style_sheet.invalidate(ChildrenOf(self))
         if isinstance(event, AssociationDeleted) and event.old_value:
+            if compiled_style_sheet:
+                compiled_style_sheet.invalidate(event.old_value)
             self._update_views(removed_items=(event.old_value,))
         elif isinstance(event, AssociationAdded):
             self._order_owned_presentation()
@@ -306,35 +451,80 @@ class Diagram(Element):
             return
 
         ownedPresentation = self.ownedPresentation
+        children: dict[Presentation | None, list[Presentation]] = {}
+        for item in ownedPresentation:
+            children.setdefault(item.parent, []).append(item)
 
         def traverse_items(parent=None) -> Iterable[Presentation]:
-            for item in ownedPresentation:
-                if item.parent is parent:
-                    yield item
-                    yield from traverse_items(item)
+            for item in children.get(parent, ()):
+                yield item
+                yield from traverse_items(item)
 
         new_order = sorted(
             traverse_items(), key=lambda e: int(isinstance(e, gaphas.Line))
         )
-        self.ownedPresentation.order(new_order.index)
+        positions = {item: n for n, item in enumerate(new_order)}
+        self.ownedPresentation.order(positions.__getitem__)
+        self._item_order = None
 
     @property
     def styleSheet(self) -> StyleSheet | None:
         return next(self.model.select(StyleSheet), None)
 
-    def style(self, node: StyleNode) -> Style:
-        if not (compiled_style_sheet := self._compiled_style_sheet):
-            style_sheet = self.styleSheet
-            compiled_style_sheet = self._compiled_style_sheet = (
-                style_sheet.new_compiled_style_sheet() if style_sheet else None
+    def compiled_style_sheet(self) -> CompiledStyleSheet | None:
+        """The compiled style sheet used by this diagram.
+
+        The diagram has its own copy, so it has its own style cache. A
+        new copy is made when the model's style sheet changes.
+        """
+        style_sheet = self._style_sheet
+        if not (style_sheet and style_sheet._model):
+            style_sheet = self._style_sheet = self.styleSheet
+            if not style_sheet:
+                self._style_sheet_source = self._compiled_style_sheet = None
+                return None
+
+        if self._style_sheet_source is not style_sheet.compiled_style_sheet:
+            self._style_sheet_source = style_sheet.compiled_style_sheet
+            self._compiled_style_sheet = style_sheet.new_compiled_style_sheet(
+                owner=style_node_owner
             )
+        return self._compiled_style_sheet
 
+    def style(self, node: StyleNode) -> Style:
         return (
             compiled_style_sheet.compute_style(node)
-            if compiled_style_sheet
+            if (compiled_style_sheet := self.compiled_style_sheet())
             else FALLBACK_STYLE
         )
 
+    def lookup_style_attribute(self, element: Element, name: str) -> str | None:
+        """Look up an attribute of an element on this diagram, for styling.
+
+        Values are memoized until the element changes.
+        """
+        if not (style_attributes := self._style_attributes):
+            style_attributes = self._style_attributes = StyleAttributes(
+                getattr(self._model, "element_dispatcher", None),
+                self._style_attribute_changed,
+            )
+        if compiled_style_sheet := self._compiled_style_sheet:
+            compiled_style_sheet.record_dependency((element, name))
+        return style_attributes.lookup(element, name)
+
+    def _style_attribute_changed(self, key: tuple[Element, str]) -> None:
+        """Drop the cached styles that depend on an attribute, and update
+        the items those styles belong to."""
+        if not (compiled_style_sheet := self._compiled_style_sheet):
+            return
+        items = {
+            owner
+            for node in compiled_style_sheet.invalidate(key)
+            if isinstance(owner := style_node_owner(node), Presentation)
+        }
+        if items:
+            self._update_views(dirty_items=items)
+
     def gettext(self, message: str) -> str:
         """Translate a message to the language used in the model."""
         style_sheet = self.styleSheet
@@ -380,6 +570,9 @@ class Diagram(Element):
         for item in self.ownedPresentation:
             self.connections.remove_connections_to_item(item)
         self._watcher.unsubscribe_all()
+        if self._style_attributes:
+            self._style_attributes.clear()
+            self._style_attributes = None
         super().unlink()
 
     @overload
@@ -420,8 +613,17 @@ class Diagram(Element):
         return iter(item.children)  # type: ignore[no-any-return]
 
     def sort(self, items: Sequence[Presentation]) -> Iterable[Presentation]:
+        """Sort items in the order of :meth:`get_all_items`.
+
+        Items not owned by this diagram are left out.
+        """
         items_set = set(items)
-        return (n for n in self.get_all_items() if n in items_set)
+        order = self._item_order
+        if order is None or not items_set.issubset(order):
+            order = self._item_order = {
+                item: n for n, item in enumerate(self.get_all_items())
+            }
+        return sorted(items_set.intersection(order), key=order.__getitem__)
 
     def request_update(self, item: gaphas.item.Item) -> None:
         if item in self.ownedPresentation:
@@ -439,15 +641,20 @@ class Diagram(Element):
     ) -> None:
         """Update the diagram canvas."""
 
-        # Clear our (cached) style sheet first
-        self._compiled_style_sheet = None
-
-        def dirty_items_with_ancestors():
-            for item in set(dirty_items):
-                yield item
-                yield from gaphas.canvas.ancestors(self, item)
+        dirty = frozenset(dirty_items)
+        ancestors = {
+            ancestor
+            for item in dirty
+            for ancestor in gaphas.canvas.ancestors(self, item)
+        }
+        if dirty and (compiled_style_sheet := self.compiled_style_sheet()):
+            # Drop the cached styles computed from dirty items, and styles
+            # of ancestors that depend on their children (:has(), :empty).
+            compiled_style_sheet.invalidate(
+                *dirty, *map(ChildrenOf, dirty), *map(ChildrenOf, ancestors)
+            )
 
-        for item in reversed(list(self.sort(dirty_items_with_ancestors()))):
+        for item in reversed(list(self.sort([*dirty, *ancestors]))):
             if update := getattr(item, "update", None):
                 update(UpdateContext(style=self.style(StyledItem(item))))
 
@@ -4,12 +4,23 @@
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, Callable, Iterator, Protocol, TypeVar, overload
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterator,
+    NamedTuple,
+    Protocol,
+    TypeVar,
+    overload,
+)
 from uuid import uuid1
 
 from gaphor.core.modeling.event import ElementUpdated
 from gaphor.core.modeling.properties import (
+    associationstub,
     attribute,
+    derived,
+    redefine,
     relation_many,
     relation_one,
     umlproperty,
@@ -67,7 +78,107 @@ def self_and_owners(element: Element | None) -> Iterator[Element]:
         e = e.owner
 
 
-class Element:
+class PropertyTable(NamedTuple):
+    """The properties of an element class.
+
+    Next to all properties, the properties that take part in saving,
+    post-loading and unlinking are listed, so other properties can be
+    skipped.
+    """
+
+    all: tuple[umlproperty, ...]
+    save: tuple[umlproperty, ...]
+    postload: tuple[umlproperty, ...]
+    unlink: tuple[umlproperty, ...]
+
+
+_property_tables: dict[type, PropertyTable] = {}
+_property_generation = 0
+
+
+def property_generation() -> int:
+    """A number that changes whenever a property is assigned to, or
+    removed from, an element class."""
+    return _property_generation
+
+
+def _property_changed() -> None:
+    global _property_generation
+    _property_generation += 1
+    _property_tables.clear()
+
+
+if TYPE_CHECKING:
+    _ProtocolMeta = type
+else:
+    # Element classes can also implement Protocols, such as gaphas' Item
+    _ProtocolMeta = type(Protocol)
+
+
+class ElementClass(_ProtocolMeta):
+    """Metaclass for model elements.
+
+    Properties are assigned to element classes after the class has been
+    created, for example by the generated model code. Cached property
+    tables are cleared when that happens.
+    """
+
+    __instancecheck__ = type.__instancecheck__
+    __subclasscheck__ = type.__subclasscheck__
+
+    def __setattr__(cls, name: str, value: object) -> None:
+        if isinstance(value, umlproperty) or isinstance(
+            vars(cls).get(name), umlproperty
+        ):
+            _property_changed()
+        super().__setattr__(name, value)
+
+    def __delattr__(cls, name: str) -> None:
+        if isinstance(vars(cls).get(name), umlproperty):
+            _property_changed()
+        super().__delattr__(name)
+
+
+def property_table(cls: type[Element]) -> PropertyTable:
+    """Return the (cached) property table for an element class."""
+    try:
+        return _property_tables[cls]
+    except KeyError:
+        pass
+
+    props = tuple(
+        prop
+        for propname in dir(cls)
+        if not propname.startswith("_")
+        and isinstance(prop := getattr(cls, propname), umlproperty)
+    )
+    # A redefine property only acts if it redefines a property with the same name
+    active = [
+        prop
+        for prop in props
+        if not isinstance(prop, redefine) or prop.original.name == prop.name
+    ]
+    table = _property_tables[cls] = PropertyTable(
+        all=props,
+        save=tuple(
+            prop for prop in active if not isinstance(prop, (derived, associationstub))
+        ),
+        postload=tuple(
+            prop
+            for prop in active
+            if isinstance(prop, (derived, redefine))
+            or type(prop).postload is not umlproperty.postload
+        ),
+        unlink=tuple(
+            prop
+            for prop in active
+            if isinstance(prop, redefine) or type(prop).unlink is not umlproperty.unlink
+        ),
+    )
+    return table
+
+
+class Element(metaclass=ElementClass):
     """Base class for all model data classes."""
 
     note: attribute[str] = attribute("note", str)
@@ -115,16 +226,11 @@ class Element:
     @classmethod
     def umlproperties(cls) -> Iterator[umlproperty]:
         """Iterate over all properties."""
-        umlprop = umlproperty
-        for propname in dir(cls):
-            if not propname.startswith("_"):
-                prop = getattr(cls, propname)
-                if isinstance(prop, umlprop):
-                    yield prop
+        return iter(property_table(cls).all)
 
     def save(self, save_func) -> None:
         """Save the state by calling ``save_func(name, value)``."""
-        for prop in self.umlproperties():
+        for prop in property_table(type(self)).save:
             prop.save(self, save_func)
 
     def load(self, name, value) -> None:
@@ -145,7 +251,7 @@ class Element:
 
         This is run after all elements are loaded.
         """
-        for prop in self.umlproperties():
+        for prop in property_table(type(self)).postload:
             prop.postload(self)
 
     def unlink(self) -> None:
@@ -168,7 +274,7 @@ class Element:
             self._unlink_lock -= 1
 
     def inner_unlink(self, unlink_event: UnlinkEvent):
-        for prop in self.umlproperties():
+        for prop in property_table(type(self)).unlink:
             prop.unlink(self)
 
         log.debug("unlinking %s", self)
@@ -252,6 +358,9 @@ class RepositoryProtocol(Protocol):
     def lookup(self, id: str) -> Element | None:
         ...
 
+    def reindex(self, element: Element, old_type: type[Element]) -> None:
+        ...
+
     def watcher(
         self, element: Element, default_handler: Handler | None = None
     ) -> EventWatcherProtocol:
@@ -6,7 +6,7 @@ import logging
 
 from gaphor.abc import Service
 from gaphor.core import event_handler
-from gaphor.core.modeling.element import Element, Handler
+from gaphor.core.modeling.element import Element, Handler, property_generation
 from gaphor.core.modeling.event import (
     AssociationAdded,
     AssociationDeleted,
@@ -18,6 +18,9 @@ from gaphor.core.modeling.properties import umlproperty
 
 log = logging.getLogger(__name__)
 
+# A compiled watch path
+PropertyPath = tuple[umlproperty, ...]
+
 
 class EventWatcher:
     """A helper for easy registering and unregistering event handlers."""
@@ -108,13 +111,19 @@ class ElementDispatcher(Service):
         self.modeling_language = modeling_language
 
         # Table used to fire events:
-        # (event.element, event.property): { handler: set(path, ..), ..}
-        self._handlers: dict[tuple[Element, umlproperty], dict[Handler, set]] = {}
+        # (event.element, event.property): { handler: (path, ..), ..}
+        self._handlers: dict[
+            tuple[Element, umlproperty], dict[Handler, tuple[PropertyPath, ...]]
+        ] = {}
 
         # Fast resolution when handlers are disconnected
         # handler: [(element, property), ..]
         self._reverse: dict[Handler, list[tuple[Element, umlproperty]]] = {}
 
+        # Compiled paths: (element type, path): (property, ..)
+        self._paths: dict[tuple[type[Element], str], PropertyPath] = {}
+        self._paths_generation = property_generation()
+
         self.event_manager.subscribe(self.on_model_loaded)
         self.event_manager.subscribe(self.on_element_change_event)
 
@@ -140,10 +149,25 @@ class ElementDispatcher(Service):
                     del self._handlers[key]
         del self._reverse[handler]
 
-    def _path_to_properties(self, element, path):
+    def _path_to_properties(self, element, path: str) -> PropertyPath:
         """Given a start element and a path, return a tuple of properties
-        (association, attribute, etc.) representing the path."""
-        c = type(element)
+        (association, attribute, etc.) representing the path.
+
+        Paths are compiled once per element type. Compiled paths are
+        dropped when properties are assigned to element classes.
+        """
+        if self._paths_generation != (generation := property_generation()):
+            self._paths.clear()
+            self._paths_generation = generation
+
+        key = (type(element), path)
+        try:
+            return self._paths[key]
+        except KeyError:
+            props = self._paths[key] = self._compile_path(type(element), path)
+            return props
+
+    def _compile_path(self, c: type[Element], path: str) -> PropertyPath:
         tpath = []
         for attr in path.split("."):
             cname = ""
@@ -176,12 +200,11 @@ class ElementDispatcher(Service):
             self._handlers[key] = handlers
 
         # Register handler and it's remaining paths
-        try:
-            remainders = handlers[handler]
-        except KeyError:
-            remainders = handlers[handler] = set()
-        if remainder:
-            remainders.add(remainder)
+        remainders = handlers.get(handler, ())
+        if remainder and remainder not in remainders:
+            handlers[handler] = remainders + (remainder,)
+        elif not remainders:
+            handlers[handler] = remainders
 
         # Also add them to the reverse table, easing disconnecting
         try:
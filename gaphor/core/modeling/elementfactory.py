@@ -69,6 +69,7 @@ class ElementFactory(Service):
         self.event_manager: EventHandler | None = event_manager
         self.element_dispatcher = element_dispatcher
         self._elements: dict[Id, Element] = OrderedDict()
+        self._elements_by_type: dict[type, dict[Id, Element]] = {}
         if event_manager:
             event_manager.subscribe(self._on_unlink_event)
 
@@ -112,10 +113,57 @@ class ElementFactory(Service):
         with self.block_events(event_recorder):
             element = type(id=id, **type_args)  # type: ignore[arg-type]
         self._elements[id] = element
+        self._index_element(element)
         self.handle(ElementCreated(self, element, diagram))
         event_recorder.replay()
         return element
 
+    def _index_element(self, element: Element) -> None:
+        """Register the element for every class in its hierarchy.
+
+        This keeps type based selections proportional to the number of
+        matches, rather than the number of elements in the model.
+        """
+        id = element.id
+        by_type = self._elements_by_type
+        for cls in type(element).__mro__[:-1]:
+            if cls in by_type:
+                by_type[cls][id] = element
+            else:
+                by_type[cls] = {id: element}
+
+    def _unindex_element(self, element: Element) -> None:
+        id = element.id
+        by_type = self._elements_by_type
+        for cls in type(element).__mro__[:-1]:
+            elements = by_type.get(cls)
+            if elements is None:
+                continue
+            elements.pop(id, None)
+            if not elements:
+                del by_type[cls]
+
+    def reindex(self, element: Element, old_type: type[Element]) -> None:
+        """Update the type index, after the type of an element has changed.
+
+        Classes shared by the old and new type keep the element in place.
+        """
+        if self.lookup(element.id) is not element:
+            return
+
+        id = element.id
+        by_type = self._elements_by_type
+        old_classes = old_type.__mro__[:-1]
+        new_classes = type(element).__mro__[:-1]
+        for cls in old_classes:
+            if cls not in new_classes and (elements := by_type.get(cls)):
+                elements.pop(id, None)
+                if not elements:
+                    del by_type[cls]
+        for cls in new_classes:
+            if cls not in old_classes:
+                by_type.setdefault(cls, {})[id] = element
+
     def size(self) -> int:
         """Return the amount of elements currently in the factory."""
         return len(self._elements)
@@ -151,7 +199,8 @@ class ElementFactory(Service):
         if expression is None:
             yield from self._elements.values()
         elif isinstance(expression, type):
-            yield from (e for e in self._elements.values() if isinstance(e, expression))
+            if elements := self._elements_by_type.get(expression):
+                yield from elements.values()
         else:
             yield from (e for e in self._elements.values() if expression(e))
 
@@ -236,6 +285,7 @@ class ElementFactory(Service):
             del self._elements[element.id]
         except KeyError:
             return
+        self._unindex_element(element)
         if self.event_manager:
             self.event_manager.handle(
                 ElementDeleted(self, event.element, event.diagram)
@@ -369,6 +369,22 @@ class association(umlproperty):
             setattr(obj, self._name, v)
         return v
 
+    def referrers(self, value) -> list:
+        """Return the elements that refer to ``value`` through this
+        association.
+
+        The opposite end (or the association stub for uni-directional
+        associations) is used, so no model wide scan is required.
+        """
+        if self.opposite:
+            opposite = getattr(type(value), self.opposite)
+            if opposite.upper == 1:
+                return [r] if (r := opposite.get(value)) is not None else []
+            return list(opposite.get(value))
+        elif self.stub:
+            return list(getattr(value, self.stub._name, ()))
+        return []
+
     def set(
         self, obj, value: T | None, index: int | None = None, from_opposite=False
     ) -> None:
@@ -554,15 +570,17 @@ class associationstub(umlproperty):
         pass
 
     def unlink(self, obj):
-        values = getattr(obj, self._name, [])
-        for value in set(values):
+        values = getattr(obj, self._name, {})
+        for value in list(values):
             self.association.delete(value, obj)
 
     def set(self, obj, value):
+        # A dict is used as an insertion ordered set, so referrers
+        # are returned in a stable order.
         try:
-            getattr(obj, self._name).add(value)
+            getattr(obj, self._name)[value] = None
         except AttributeError:
-            setattr(obj, self._name, {value})
+            setattr(obj, self._name, {value: None})
 
     def delete(self, obj, value, from_opposite=False):
         try:
@@ -570,7 +588,7 @@ class associationstub(umlproperty):
         except AttributeError:
             pass
         else:
-            c.discard(value)
+            c.pop(value, None)
 
 
 class unioncache:
@@ -2,11 +2,12 @@ from __future__ import annotations
 
 import importlib.resources
 import textwrap
+from typing import Callable, Hashable
 
 from gaphor.core.modeling.element import Element
 from gaphor.core.modeling.event import AttributeUpdated
 from gaphor.core.modeling.properties import attribute
-from gaphor.core.styling import CompiledStyleSheet
+from gaphor.core.styling import CompiledStyleSheet, StyleNode
 
 SYSTEM_STYLE_SHEET = (importlib.resources.files("gaphor") / "diagram.css").read_text(
     "utf-8"
@@ -48,8 +49,18 @@ class StyleSheet(Element):
             self.styleSheet,
         )
 
-    def new_compiled_style_sheet(self) -> CompiledStyleSheet:
-        return self._compiled_style_sheet.copy()
+    @property
+    def compiled_style_sheet(self) -> CompiledStyleSheet:
+        """The compiled style sheet.
+
+        A new instance is created whenever the style sheet changes.
+        """
+        return self._compiled_style_sheet
+
+    def new_compiled_style_sheet(
+        self, owner: Callable[[StyleNode], Hashable] | None = None
+    ) -> CompiledStyleSheet:
+        return self._compiled_style_sheet.copy(owner)
 
     def postload(self):
         super().postload()
@@ -2,6 +2,7 @@ import gaphas
 import pytest
 
 from gaphor.core.modeling import Diagram, Presentation, StyleSheet
+from gaphor.core.modeling.diagram import StyledItem
 
 
 class Example(gaphas.Element, Presentation):
@@ -128,3 +129,169 @@ def test_order_grouped_presentations(diagram):
     example_1.parent = example_2
 
     assert list(diagram.get_all_items()) == [example_2, example_1]
+
+
+def test_sort_items(diagram):
+    example_line = diagram.create(ExampleLine)
+    example_1 = diagram.create(Example)
+    example_2 = diagram.create(Example)
+
+    assert list(diagram.sort([example_line, example_2, example_1])) == [
+        example_1,
+        example_2,
+        example_line,
+    ]
+
+
+def test_sort_items_after_reorder(diagram):
+    example_1 = diagram.create(Example)
+    example_2 = diagram.create(Example)
+    assert list(diagram.sort([example_2, example_1])) == [example_1, example_2]
+
+    example_1.parent = example_2
+
+    assert list(diagram.sort([example_2, example_1])) == [example_2, example_1]
+
+
+def test_sort_leaves_out_items_of_other_diagrams(diagram, element_factory):
+    example = diagram.create(Example)
+    other = element_factory.create(Diagram).create(Example)
+
+    assert list(diagram.sort([other, example])) == [example]
+
+
+def test_sort_leaves_out_removed_items(diagram):
+    example_1 = diagram.create(Example)
+    example_2 = diagram.create(Example)
+    assert list(diagram.sort([example_2, example_1])) == [example_1, example_2]
+
+    example_1.unlink()
+
+    assert list(diagram.sort([example_2, example_1])) == [example_2]
+
+
+@pytest.fixture
+def style_sheet(element_factory):
+    style_sheet = element_factory.create(StyleSheet)
+    style_sheet.styleSheet = (
+        "example { color: red } example[test_unlinked] { color: blue }"
+    )
+    return style_sheet
+
+
+def test_style_cache_is_kept_between_updates(diagram, style_sheet):
+    example = diagram.create(Example)
+    other = diagram.create(Example)
+
+    diagram.update_now([example, other])
+    diagram.style(StyledItem(example))
+    diagram.style(StyledItem(other))
+    diagram.update_now([example])
+    diagram.style(StyledItem(example))
+    diagram.style(StyledItem(other))
+    info = diagram.compiled_style_sheet().cache_info()
+
+    assert info.hits == 3
+    assert info.misses == 4  # diagram, other, and example for every update
+
+
+def test_style_cache_is_cleared_if_style_of_dirty_item_changes(diagram, style_sheet):
+    example = diagram.create(Example)
+    diagram.update_now([example])
+    assert diagram.style(StyledItem(example))["color"] == (1, 0, 0, 1)
+
+    example._test_unlinked = True
+    diagram.update_now([example])
+
+    assert diagram.style(StyledItem(example))["color"] == (0, 0, 1, 1)
+
+
+def test_style_cache_is_kept_if_style_of_other_item_changes(diagram, style_sheet):
+    example = diagram.create(Example)
+    other = diagram.create(Example)
+    diagram.style(StyledItem(example))
+    diagram.style(StyledItem(other))
+
+    other._test_unlinked = True
+    diagram.update_now([example])
+
+    assert diagram.style(StyledItem(other))["color"] == (1, 0, 0, 1)
+
+
+def test_style_cache_is_replaced_when_style_sheet_changes(diagram, style_sheet):
+    example = diagram.create(Example)
+    diagram.update_now([example])
+    compiled_style_sheet = diagram.compiled_style_sheet()
+
+    style_sheet.styleSheet = "example { color: green }"
+
+    assert diagram.compiled_style_sheet() is not compiled_style_sheet
+    assert diagram.style(StyledItem(example))["color"] == (0, 0.5019607843137255, 0, 1)
+
+
+def test_dark_mode_is_part_of_the_cache_key(diagram, style_sheet):
+    style_sheet.styleSheet = "@media dark-mode { example { color: white } }"
+    example = diagram.create(Example)
+
+    light = diagram.style(StyledItem(example, dark_mode=False))
+    dark = diagram.style(StyledItem(example, dark_mode=True))
+
+    assert light["color"] != (1, 1, 1, 1)
+    assert dark["color"] == (1, 1, 1, 1)
+
+
+def test_style_of_child_is_updated_if_parent_style_changes(diagram, style_sheet):
+    parent = diagram.create(Example)
+    child = diagram.create(Example, parent=parent)
+    assert diagram.style(StyledItem(child))["color"] == (1, 0, 0, 1)
+
+    style_sheet.styleSheet = "example[test_unlinked] { color: blue }"
+    compiled_style_sheet = diagram.compiled_style_sheet()
+    diagram.style(StyledItem(child))
+    parent._test_unlinked = True
+    diagram.update_now([parent])
+
+    assert diagram.compiled_style_sheet() is compiled_style_sheet
+    assert diagram.style(StyledItem(child))["color"] == (0, 0, 1, 1)
+
+
+def test_style_of_parent_is_updated_if_child_changes(diagram, style_sheet):
+    style_sheet.styleSheet = "example:has(example[test_unlinked]) { color: blue }"
+    parent = diagram.create(Example)
+    child = diagram.create(Example, parent=parent)
+    assert diagram.style(StyledItem(parent))["color"] != (0, 0, 1, 1)
+
+    child._test_unlinked = True
+    diagram.update_now([child])
+
+    assert diagram.style(StyledItem(parent))["color"] == (0, 0, 1, 1)
+
+
+def test_style_of_parent_is_updated_if_child_is_added(diagram, style_sheet):
+    style_sheet.styleSheet = "example:empty { color: blue }"
+    parent = diagram.create(Example)
+    assert diagram.style(StyledItem(parent))["color"] == (0, 0, 1, 1)
+
+    child = diagram.create(Example, parent=parent)
+    diagram.update_now([child])
+
+    assert diagram.style(StyledItem(parent))["color"] != (0, 0, 1, 1)
+
+
+def test_style_of_parent_is_updated_if_child_is_removed(diagram, style_sheet):
+    style_sheet.styleSheet = "example:empty { color: blue }"
+    parent = diagram.create(Example)
+    child = diagram.create(Example, parent=parent)
+    assert diagram.style(StyledItem(parent))["color"] != (0, 0, 1, 1)
+
+    dirty_items = []
+
+    class View:
+        def request_update(self, items, removed_items=()):
+            dirty_items.extend(items)
+
+    diagram.register_view(View())
+    child.parent = None
+    diagram.update_now(dirty_items)
+
+    assert diagram.style(StyledItem(parent))["color"] == (0, 0, 1, 1)
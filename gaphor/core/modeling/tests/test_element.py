@@ -1,6 +1,9 @@
+from typing import Protocol
+
 import pytest
 
-from gaphor.core.modeling.element import Element
+from gaphor.core.modeling.element import Element, property_table
+from gaphor.core.modeling.properties import association, attribute, derivedunion
 
 
 def test_element_note():
@@ -15,3 +18,90 @@ def test_element_can_not_set_random_property():
 
     with pytest.raises(AttributeError):
         e.random_property = 1
+
+
+def test_umlproperties_are_updated_when_property_is_assigned():
+    class A(Element):
+        pass
+
+    assert A.note in A.umlproperties()
+    assert not any(p.name == "extra" for p in A.umlproperties())
+
+    A.extra = attribute("extra", str)
+
+    assert A.extra in A.umlproperties()
+
+
+def test_umlproperties_of_subclass_are_updated_when_property_is_assigned():
+    class A(Element):
+        pass
+
+    class B(A):
+        pass
+
+    assert not any(p.name == "extra" for p in B.umlproperties())
+
+    A.extra = attribute("extra", str)
+
+    assert A.extra in B.umlproperties()
+
+
+def test_umlproperties_are_updated_when_property_is_reassigned():
+    class A(Element):
+        pass
+
+    A.one = attribute("one", str)
+    A.two = attribute("two", str)
+    two = A.two
+    table = property_table(A)
+
+    A.alias = A.one
+    A.two = A.one
+
+    assert property_table(A) is not table
+    assert [p for p in A.umlproperties() if p is A.one] == [A.one, A.one, A.one]
+    assert two not in A.umlproperties()
+
+
+def test_umlproperties_are_updated_when_property_is_removed():
+    class A(Element):
+        pass
+
+    A.one = attribute("one", str)
+    one = A.one
+    assert one in A.umlproperties()
+
+    del A.one
+
+    assert one not in A.umlproperties()
+
+
+def test_element_class_can_implement_protocol():
+    class Named(Protocol):
+        name: str
+
+    class A(Element, Named):
+        pass
+
+    assert isinstance(A(), Element)
+    assert issubclass(A, Element)
+    assert not isinstance(Element(), A)
+
+
+def test_property_table_skips_derived_properties():
+    class A(Element):
+        pass
+
+    A.one = association("one", A, upper=1)
+    A.two = association("two", A)
+    A.union = derivedunion("union", A, 0, "*", A.one, A.two)
+
+    table = property_table(A)
+
+    assert A.union in table.all
+    assert A.union not in table.save
+    assert A.union not in table.unlink
+    assert A.union in table.postload
+    assert A.one in table.save
+    assert A.one in table.unlink
+    assert A.one not in table.postload
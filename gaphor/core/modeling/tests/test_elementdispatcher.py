@@ -419,3 +419,50 @@ def test_cyclic(element_factory, dispatcher, handler):
 
     a.unlink()
     assert 1 == len(dispatcher._handlers)
+
+
+def test_compiled_path_is_shared_per_type(element_factory, dispatcher):
+    a = element_factory.create(A)
+    b = element_factory.create(A)
+
+    path = dispatcher._path_to_properties(a, "one.two")
+
+    assert path == (A.one, A.two)
+    assert dispatcher._path_to_properties(b, "one.two") is path
+
+
+def test_compiled_path_with_cast(dispatcher, uml_class):
+    path = dispatcher._path_to_properties(
+        uml_class, "ownedAttribute.association[Association].memberEnd"
+    )
+
+    assert path == (
+        UML.Class.ownedAttribute,
+        UML.Property.association,
+        UML.Association.memberEnd,
+    )
+
+
+def test_compiled_paths_are_updated_when_property_is_reassigned(
+    element_factory, dispatcher
+):
+    class C(Element):
+        pass
+
+    C.one = association("one", A)
+    c = element_factory.create(C)
+    one = C.one
+    assert dispatcher._path_to_properties(c, "one") == (one,)
+
+    C.one = C.other = association("other", A)
+
+    assert dispatcher._path_to_properties(c, "one") == (C.other,)
+
+
+def test_remaining_paths_are_registered_once(element_factory, dispatcher, handler):
+    a = element_factory.create(A)
+    dispatcher.subscribe(handler, a, "one")
+    dispatcher.subscribe(handler, a, "one.two")
+    dispatcher.subscribe(handler, a, "one.two")
+
+    assert dispatcher._handlers[(a, A.one)][handler] == ((A.two,),)
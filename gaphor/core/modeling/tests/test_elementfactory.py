@@ -4,6 +4,7 @@ from collections.abc import Container, Iterable
 import pytest
 
 from gaphor.core import event_handler
+from gaphor.core.modeling import Element
 from gaphor.core.modeling.event import (
     ElementCreated,
     ElementDeleted,
@@ -12,7 +13,8 @@ from gaphor.core.modeling.event import (
     ServiceEvent,
 )
 from gaphor.core.modeling.presentation import Presentation
-from gaphor.UML import Operation, Parameter
+from gaphor.UML import ControlNode, ForkNode, JoinNode, Operation, Parameter
+from gaphor.UML.recipes import swap_element
 
 
 def test_element_factory_is_an_iterable(element_factory):
@@ -90,6 +92,68 @@ def test_unlink(element_factory):
     assert not list(element_factory.values()), list(element_factory.values())
 
 
+def test_unlink_during_event_batch(event_manager, element_factory):
+    p = element_factory.create(Parameter)
+
+    with event_manager.batch():
+        p.unlink()
+
+        assert p not in element_factory
+        assert not element_factory.lselect(Parameter)
+
+
+def test_select_by_type_includes_subclasses(element_factory):
+    operation = element_factory.create(Operation)
+    parameter = element_factory.create(Parameter)
+
+    assert element_factory.lselect(Operation) == [operation]
+    assert element_factory.lselect(Parameter) == [parameter]
+    assert element_factory.lselect(Element) == [operation, parameter]
+
+
+def test_select_by_type_keeps_creation_order(element_factory):
+    parameters = [element_factory.create(Parameter) for _ in range(5)]
+    element_factory.create(Operation)
+
+    assert element_factory.lselect(Parameter) == parameters
+
+
+def test_select_by_type_after_unlink(element_factory):
+    operation = element_factory.create(Operation)
+    parameter = element_factory.create(Parameter)
+
+    operation.unlink()
+
+    assert element_factory.lselect(Operation) == []
+    assert element_factory.lselect(Element) == [parameter]
+
+
+def test_select_by_type_after_flush(element_factory):
+    element_factory.create(Operation)
+    element_factory.create(Parameter)
+
+    element_factory.flush()
+
+    assert element_factory.lselect(Element) == []
+    assert not element_factory._elements_by_type
+
+
+def test_select_by_type_after_swapping_element_type(element_factory):
+    fork_node = element_factory.create(ForkNode)
+    join_node = element_factory.create(JoinNode)
+
+    swap_element(fork_node, JoinNode)
+
+    assert element_factory.lselect(ForkNode) == []
+    assert element_factory.lselect(JoinNode) == [join_node, fork_node]
+    assert element_factory.lselect(ControlNode) == [fork_node, join_node]
+
+    fork_node.unlink()
+
+    assert element_factory.lselect(JoinNode) == [join_node]
+    assert element_factory.lselect(Element) == [join_node]
+
+
 # Event handlers are registered as persisting top level handlers, since no
 # unsubscribe functionality is provided.
 handled = False
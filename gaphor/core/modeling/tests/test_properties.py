@@ -670,3 +670,66 @@ def test_composite():
     a.unlink()
     assert a.is_unlinked
     assert b.is_unlinked
+
+
+def test_association_referrers_through_opposite():
+    class A(Element):
+        one: relation_one[B]
+
+    class B(Element):
+        many: relation_many[A]
+
+    A.one = association("one", B, upper=1, opposite="many")
+    B.many = association("many", A, opposite="one")
+
+    a1 = A()
+    a2 = A()
+    b = B()
+    a1.one = b
+    a2.one = b
+
+    assert A.one.referrers(b) == [a1, a2]
+    assert B.many.referrers(a1) == [b]
+
+
+def test_association_referrers_without_opposite():
+    class A(Element):
+        one: relation_one[B]
+
+    class B(Element):
+        pass
+
+    A.one = association("one", B, upper=1)
+
+    a1 = A()
+    a2 = A()
+    b = B()
+
+    assert A.one.referrers(b) == []
+
+    a1.one = b
+    a2.one = b
+
+    assert A.one.referrers(b) == [a1, a2]
+
+    del a1.one
+
+    assert A.one.referrers(b) == [a2]
+
+
+def test_association_referrers_after_unlink():
+    class A(Element):
+        one: relation_one[B]
+
+    class B(Element):
+        pass
+
+    A.one = association("one", B, upper=1)
+
+    a = A()
+    b = B()
+    a.one = b
+    b.unlink()
+
+    assert a.one is None
+    assert A.one.referrers(b) == []
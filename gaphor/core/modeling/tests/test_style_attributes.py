@@ -1,6 +1,14 @@
 from gaphor import UML
+from gaphor.core.modeling import StyleSheet
 from gaphor.core.modeling.collection import collection
-from gaphor.core.modeling.diagram import Diagram, StyledItem, attrname, lookup_attribute
+from gaphor.core.modeling.diagram import (
+    Diagram,
+    StyleAttributes,
+    StyledItem,
+    attribute_names,
+    attrname,
+    lookup_attribute,
+)
 from gaphor.UML.classes import ClassItem
 
 
@@ -125,3 +133,116 @@ def test_attrname_diagram_subject():
 def test_attrname_collection_subject(diagram):
     collection1 = collection(None, None, int)
     assert attrname(collection1, "subject") == "subject"
+
+
+def test_attribute_names_are_normalized_per_class():
+    names = attribute_names(UML.Class)
+
+    assert names["ownedattribute"] == "ownedAttribute"
+    assert attribute_names(UML.Class) is names
+
+
+def test_style_attribute_is_updated_when_attribute_changes(diagram, element_factory):
+    class_ = element_factory.create(UML.Class)
+    classitem = diagram.create(ClassItem, subject=class_)
+    node = StyledItem(classitem)
+
+    class_.name = "first"
+    assert node.attribute("name") == "first"
+
+    class_.name = "second"
+    assert node.attribute("name") == "second"
+
+
+def test_style_attribute_is_updated_when_nested_attribute_changes(
+    diagram, element_factory
+):
+    class_ = element_factory.create(UML.Class)
+    attr = element_factory.create(UML.Property)
+    classitem = diagram.create(ClassItem, subject=class_)
+    node = StyledItem(classitem)
+
+    assert node.attribute("attribute.name") is None
+
+    class_.ownedAttribute = attr
+    attr.name = "first"
+    assert node.attribute("attribute.name") == "first"
+
+    attr.name = "second"
+    assert node.attribute("attribute.name") == "second"
+
+    del class_.ownedAttribute[attr]
+    assert node.attribute("attribute.name") is None
+
+
+def test_style_attribute_of_python_property_is_not_memoized(diagram, element_factory):
+    style_attributes = StyleAttributes(element_factory.element_dispatcher)
+    package = element_factory.create(UML.Package)
+    package.name = "first"
+
+    assert style_attributes.lookup(package, "qualifiedName") == "first"
+    assert style_attributes.lookup(package, "name") == "first"
+    assert (package, "qualifiedname") not in style_attributes._values
+    assert (package, "name") in style_attributes._values
+
+
+def test_style_attributes_clear_unsubscribes_handlers(element_factory):
+    dispatcher = element_factory.element_dispatcher
+    style_attributes = StyleAttributes(dispatcher)
+    class_ = element_factory.create(UML.Class)
+    style_attributes.lookup(class_, "name")
+
+    style_attributes.clear()
+
+    assert not style_attributes._values
+    assert not dispatcher._handlers
+
+
+def test_style_attributes_report_changed_attributes(element_factory):
+    changed = []
+    style_attributes = StyleAttributes(
+        element_factory.element_dispatcher, changed.append
+    )
+    class_ = element_factory.create(UML.Class)
+    style_attributes.lookup(class_, "name")
+
+    class_.name = "first"
+
+    assert changed == [(class_, "name")]
+
+
+def test_style_attributes_evict_least_recently_used(element_factory):
+    changed = []
+    dispatcher = element_factory.element_dispatcher
+    style_attributes = StyleAttributes(dispatcher, changed.append)
+    style_attributes.max_size = 2
+    first, second, third = (element_factory.create(UML.Class) for _ in range(3))
+    style_attributes.lookup(first, "name")
+    style_attributes.lookup(second, "name")
+    style_attributes.lookup(first, "name")
+
+    style_attributes.lookup(third, "name")
+
+    assert list(style_attributes._values) == [(first, "name"), (third, "name")]
+    assert changed == [(second, "name")]
+    assert not any(element is second for element, _ in dispatcher._handlers)
+
+
+def test_cached_style_is_dropped_when_attribute_changes(diagram, element_factory):
+    style_sheet = element_factory.create(StyleSheet)
+    style_sheet.styleSheet = "class[visibility=private] { color: blue }"
+    class_ = element_factory.create(UML.Class)
+    classitem = diagram.create(ClassItem, subject=class_)
+    dirty_items = []
+
+    class View:
+        def request_update(self, items, removed_items=()):
+            dirty_items.extend(items)
+
+    diagram.register_view(View())
+    assert diagram.style(StyledItem(classitem))["color"] != (0, 0, 1, 1)
+
+    class_.visibility = "private"
+
+    assert classitem in dirty_items
+    assert diagram.style(StyledItem(classitem))["color"] == (0, 0, 1, 1)
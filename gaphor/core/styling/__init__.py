@@ -1,10 +1,22 @@
 from __future__ import annotations
 
-import functools
+from collections import OrderedDict
 from collections.abc import Hashable
-from typing import Callable, Iterator, Protocol, Sequence, TypedDict, Union
+from typing import (
+    Callable,
+    Iterator,
+    NamedTuple,
+    Protocol,
+    Sequence,
+    TypedDict,
+    Union,
+)
 
-from gaphor.core.styling.compiler import compile_style_sheet
+from gaphor.core.styling.compiler import (
+    IndexKey,
+    compile_indexed_style_sheet,
+    compile_style_sheet,  # noqa: F401
+)
 from gaphor.core.styling.declarations import (
     FONT_SIZE_VALUES,
     Color,
@@ -122,6 +134,25 @@ def merge_styles(*styles: Style) -> Style:
     return resolved_style
 
 
+def merge_inline_style(style: Style, inline_style: Style) -> Style:
+    """Merge the inline style of a shape with the style of its context.
+
+    Styles computed by a style sheet are never modified. Merged styles are
+    memoized by the style sheet, so the same inputs give the same style
+    object.
+    """
+    if not inline_style and "opacity" not in style:
+        return style
+    compiled_style_sheet: CompiledStyleSheet | None = style.get(
+        "-gaphor-compiled-style-sheet"
+    )  # type: ignore[assignment]
+    return (
+        compiled_style_sheet.merge_inline_style(style, inline_style)
+        if compiled_style_sheet
+        else merge_styles(style, inline_style)
+    )
+
+
 def resolve_variables(style: Style, style_layers: Sequence[Style]) -> Style:
     new_style = Style()
     for p, v in style.items():
@@ -148,35 +179,233 @@ def resolve_variables(style: Style, style_layers: Sequence[Style]) -> Style:
     return new_style
 
 
+class StyleCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    size: int
+
+
+class ChildrenOf(NamedTuple):
+    """Dependency on the child nodes of an owner of style nodes."""
+
+    owner: Hashable
+
+
 class CompiledStyleSheet:
     """A style sheet, ready to compute styles for any StyleNode.
 
+    Rules are indexed by node name, pseudo-element and state, so a node
+    is only matched against rules that can apply to it.
+
     The computed styles are cached, to speed up subsequent lookups.
+    For every cached style, the style sheet records what it was
+    computed from: the owners of the style nodes inspected by selectors
+    (``owner(node)``, the node itself by default), :class:`ChildrenOf`
+    those owners if child nodes were inspected, the parent node, and keys
+    passed to :meth:`record_dependency`. Use :meth:`invalidate` to drop
+    cached styles when one of those changes. Inline styles merged with
+    computed styles are cached too.
     """
 
+    max_cache_size = 1000
+
     def __init__(
         self,
         *css: str,
-        rules: list[tuple[Callable[[StyleNode], bool], Style]] | None = None,
+        rules: list[tuple[Callable[[StyleNode], bool], Style, IndexKey]] | None = None,
+        owner: Callable[[StyleNode], Hashable] | None = None,
     ):
-        self.rules: list[tuple[Callable[[StyleNode], bool], Style]] = rules or [
-            (selector, declarations)  # type: ignore[misc]
-            for selector, declarations in compile_style_sheet(*css)
-            if selector != "error"
-        ]
-        # Use this trick to bind a cache per instance, instead of globally.
-        self.compute_style = functools.lru_cache(maxsize=1000)(
-            self._compute_style_uncached
+        self.rules: list[tuple[Callable[[StyleNode], bool], Style, IndexKey]] = (
+            rules
+            or [
+                (selector, declarations, key)  # type: ignore[misc]
+                for selector, declarations, key in compile_indexed_style_sheet(*css)
+                if selector != "error"
+            ]
         )
+        self.owner: Callable[[StyleNode], Hashable] = owner or _self
+        self._candidates: dict[
+            tuple[str, str | None, frozenset[str]],
+            tuple[tuple[Callable[[StyleNode], bool], Style], ...],
+        ] = {}
+        self._styles: OrderedDict[StyleNode, Style] = OrderedDict()
+        self._dependencies: dict[StyleNode, set[Hashable]] = {}
+        self._dependents: dict[Hashable, set[StyleNode]] = {}
+        self._recording: list[set[Hashable]] = []
+        self._merged: dict[tuple[int, int], tuple[Style, Style, Style]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def copy(
+        self, owner: Callable[[StyleNode], Hashable] | None = None
+    ) -> CompiledStyleSheet:
+        return CompiledStyleSheet(rules=self.rules, owner=owner)
+
+    def compute_style(self, node: StyleNode) -> Style:
+        styles = self._styles
+        try:
+            style = styles[node]
+        except KeyError:
+            self.misses += 1
+            dependencies: set[Hashable] = set()
+            recording = self._recording
+            recording.append(dependencies)
+            try:
+                style = self._compute_style_uncached(node, dependencies)
+            finally:
+                recording.pop()
+            if len(styles) >= self.max_cache_size:
+                self.invalidate(next(iter(styles)))
+            self._store(node, style, dependencies)
+            return style
+        styles.move_to_end(node)
+        self.hits += 1
+        return style
+
+    def record_dependency(self, key: Hashable) -> None:
+        """Record a dependency of the style that is being computed."""
+        if recording := self._recording:
+            recording[-1].add(key)
+
+    def merge_inline_style(self, style: Style, inline_style: Style) -> Style:
+        # The styles are kept with the result, so their ids are not reused
+        key = (id(style), id(inline_style))
+        if merged := self._merged.get(key):
+            return merged[2]
+        if len(self._merged) >= self.max_cache_size:
+            self._merged.clear()
+        merged_style = merge_styles(style, inline_style)
+        self._merged[key] = (style, inline_style, merged_style)
+        return merged_style
+
+    def cache_info(self) -> StyleCacheInfo:
+        return StyleCacheInfo(self.hits, self.misses, len(self._styles))
+
+    def clear_cache(self) -> None:
+        self._styles.clear()
+        self._dependencies.clear()
+        self._dependents.clear()
+        self._merged.clear()
+
+    def invalidate(self, *keys: Hashable) -> list[StyleNode]:
+        """Drop the cached styles computed from any of the keys.
+
+        A key can be an owner, :class:`ChildrenOf` an owner, a dependency
+        recorded with :meth:`record_dependency`, or a style node.
+        Styles computed from a dropped style are dropped as well.
+
+        Returns the style nodes that have been dropped.
+        """
+        dropped: list[StyleNode] = []
+        dependents = self._dependents
+        pending = list(keys)
+        while pending:
+            key = pending.pop()
+            if key in self._styles:
+                node: StyleNode = key  # type: ignore[assignment]
+                self._discard(node)
+                dropped.append(node)
+            pending.extend(dependents.pop(key, ()))
+        return dropped
+
+    def _store(self, node: StyleNode, style: Style, dependencies: set[Hashable]):
+        self._styles[node] = style
+        self._dependencies[node] = dependencies
+        dependents = self._dependents
+        for key in dependencies:
+            if (nodes := dependents.get(key)) is None:
+                nodes = dependents[key] = set()
+            nodes.add(node)
 
-    def copy(self) -> CompiledStyleSheet:
-        return CompiledStyleSheet(rules=self.rules)
+    def _discard(self, node: StyleNode) -> None:
+        del self._styles[node]
+        dependents = self._dependents
+        for key in self._dependencies.pop(node):
+            if (nodes := dependents.get(key)) is not None:
+                nodes.discard(node)
+                if not nodes:
+                    del dependents[key]
 
-    def _compute_style_uncached(self, node: StyleNode) -> Style:
+    def candidate_rules(
+        self, node: StyleNode
+    ) -> tuple[tuple[Callable[[StyleNode], bool], Style], ...]:
+        """Rules that may match the node, in order of specificity."""
+        name = node.name()
+        state = frozenset(node.state())
+        try:
+            return self._candidates[(name, node.pseudo, state)]
+        except KeyError:
+            candidates = self._candidates[(name, node.pseudo, state)] = tuple(
+                (selector, declarations)
+                for selector, declarations, key in self.rules
+                if key.candidate(name, node.pseudo, state)
+            )
+            return candidates
+
+    def _compute_style_uncached(
+        self, node: StyleNode, dependencies: set[Hashable]
+    ) -> Style:
         parent = node.parent()
-        parent_style = self.compute_style(parent) if parent else {}
+        if parent:
+            parent_style = self.compute_style(parent)
+            dependencies.add(parent)
+        else:
+            parent_style = {}
+        owner = self.owner
+        dependencies.add(owner(node))
+        tracked_node = _TrackedNode(node, owner, dependencies)
         return merge_styles(
             {n: v for n, v in parent_style.items() if n in INHERITED_DECLARATIONS},  # type: ignore[arg-type]
-            *(declarations for selector, declarations in self.rules if selector(node)),
+            *(
+                declarations
+                for selector, declarations in self.candidate_rules(node)
+                if selector(tracked_node)
+            ),
             {"-gaphor-style-node": node, "-gaphor-compiled-style-sheet": self},
         )
+
+
+def _self(node: StyleNode) -> Hashable:
+    return node
+
+
+class _TrackedNode:
+    """A style node that records what selectors inspect.
+
+    Attributes and parents of a node depend on its owner, the child
+    nodes on :class:`ChildrenOf` the owner.
+    """
+
+    def __init__(
+        self,
+        node: StyleNode,
+        owner: Callable[[StyleNode], Hashable],
+        dependencies: set[Hashable],
+    ):
+        self._node = node
+        self._owner = owner
+        self._dependencies = dependencies
+        self.pseudo = node.pseudo
+        self.dark_mode = node.dark_mode
+
+    def _track(self, node: StyleNode) -> _TrackedNode:
+        return _TrackedNode(node, self._owner, self._dependencies)
+
+    def name(self) -> str:
+        return self._node.name()
+
+    def parent(self) -> StyleNode | None:
+        self._dependencies.add(self._owner(self._node))
+        parent = self._node.parent()
+        return self._track(parent) if parent else None
+
+    def children(self) -> Iterator[StyleNode]:
+        self._dependencies.add(ChildrenOf(self._owner(self._node)))
+        return map(self._track, self._node.children())
+
+    def attribute(self, name: str) -> str | None:
+        self._dependencies.add(self._owner(self._node))
+        return self._node.attribute(name)
+
+    def state(self) -> Sequence[str]:
+        return self._node.state()
@@ -6,7 +6,7 @@ Ayoub.
 
 import re
 from functools import singledispatch
-from typing import Callable, Dict, Iterator, Literal, Tuple, Union
+from typing import Callable, Dict, Iterator, Literal, NamedTuple, Tuple, Union
 
 import tinycss2
 
@@ -16,6 +16,9 @@ from gaphor.core.styling.declarations import parse_declarations
 # http://dev.w3.org/csswg/selectors/#whitespace
 split_whitespace = re.compile("[^ \t\r\n\f]+").findall
 
+# Pseudo-classes that match StyleNode.state()
+STATES = ("hover", "focus", "active", "drop", "disabled")
+
 
 Rule = Union[
     Tuple[Callable[[object], bool], Dict[str, object]],
@@ -23,14 +26,59 @@ Rule = Union[
 ]
 
 
+class IndexKey(NamedTuple):
+    """What a style node should have for a selector to match.
+
+    The key is derived from the right-most compound selector: the node
+    name (type), pseudo-element and pseudo-class states. ``None`` (or no
+    states) means the selector does not care.
+    """
+
+    name: str | None = None
+    pseudo: str | None = None
+    states: frozenset[str] = frozenset()
+
+    def candidate(self, name: str, pseudo: str | None, state: frozenset[str]) -> bool:
+        return (
+            (self.name is None or self.name == name)
+            and (self.pseudo is None or self.pseudo == pseudo)
+            and self.states <= state
+        )
+
+
+NO_INDEX_KEY = IndexKey()
+
+
+IndexedRule = Union[
+    Tuple[Callable[[object], bool], Dict[str, object], IndexKey],
+    Tuple[
+        Literal["error"],
+        Union[tinycss2.ast.ParseError, selectors.SelectorError],
+        IndexKey,
+    ],
+]
+
+
 def compile_style_sheet(*css: str) -> Iterator[Rule]:
+    return (
+        (selector, declarations)  # type: ignore[misc]
+        for selector, declarations, _key in compile_indexed_style_sheet(*css)
+    )
+
+
+def compile_indexed_style_sheet(*css: str) -> Iterator[IndexedRule]:
+    """Compile style sheets into rules, ordered by specificity.
+
+    Each rule has an index key, so rules can be looked up by style node
+    name, pseudo-element and state.
+    """
     return (
         compiled_rule
         for _specificity, _order, compiled_rule in sorted(
             (
-                ((-1,), order, (selspec, declarations))
+                ((-1,), order, (selspec, declarations, NO_INDEX_KEY))
                 if selspec == "error"
-                else (selspec[1], order, (selspec[0], declarations))
+                else (selspec[1], order, (selspec[0], declarations, selspec[2]))
             )
             for order, (selspec, declarations) in enumerate(
                 rule
@@ -61,7 +109,10 @@ def compile_rules(rules):
                 continue
             media_query = compile_node(media_selector)
             yield from (
-                ((_combine(media_query, selspec[0]), selspec[1]), declaration)
+                (
+                    (_combine(media_query, selspec[0]), selspec[1], selspec[2]),
+                    declaration,
+                )
                 for selspec, declaration in compile_rules(at_rules)
                 if selspec != "error"
             )
@@ -70,7 +121,10 @@ def compile_rules(rules):
             continue
 
         try:
-            selector_list = compile_selector_list(rule.prelude)
+            selector_list = [
+                (compile_node(selector), selector.specificity, index_key(selector))
+                for selector in selectors.selectors(rule.prelude)
+            ]
         except selectors.SelectorError as e:
             yield "error", e
             continue
@@ -88,6 +142,26 @@ def _combine(a, b):
     return lambda el: a(el) and b(el)
 
 
+def index_key(selector) -> IndexKey:
+    """Derive an index key from a parsed selector."""
+    while isinstance(selector, selectors.CombinedSelector):
+        selector = selector.right
+    if not isinstance(selector, selectors.CompoundSelector):
+        return NO_INDEX_KEY
+
+    name = None
+    pseudo = None
+    states: set[str] = set()
+    for sel in selector.simple_selectors:
+        if isinstance(sel, selectors.LocalNameSelector):
+            name = sel.lower_local_name
+        elif isinstance(sel, selectors.PseudoElementSelector):
+            pseudo = sel.name
+        elif isinstance(sel, selectors.PseudoClassSelector) and sel.name in STATES:
+            states.add(sel.name)
+    return IndexKey(name, pseudo, frozenset(states))
+
+
 def compile_selector_list(input):
     """Compile a (comma-separated) list of selectors.
 
@@ -134,18 +208,27 @@ def compile_media_selector(selector: selectors.MediaSelector):
 @compile_node.register
 def compile_compound_selector(selector: selectors.CompoundSelector):
     sub_expressions = [compile_node(sel) for sel in selector.simple_selectors]
-    return lambda el: all(expr(el) for expr in sub_expressions)
+    if not sub_expressions:
+        return lambda el: True
+    elif len(sub_expressions) == 1:
+        return sub_expressions[0]
+    elif len(sub_expressions) == 2:
+        first, second = sub_expressions
+        return lambda el: first(el) and second(el)
 
+    def compound_matcher(el):
+        for expr in sub_expressions:
+            if not expr(el):
+                return False
+        return True
 
-@compile_node.register
-def compile_name_selector(selector: selectors.LocalNameSelector):
-    return lambda el: el.name() == selector.lower_local_name
+    return compound_matcher
 
 
-def ancestors(el):
-    if p := el.parent():
-        yield p
-        yield from ancestors(p)
+@compile_node.register
+def compile_name_selector(selector: selectors.LocalNameSelector):
+    name = selector.lower_local_name
+    return lambda el: el.name() == name
 
 
 def descendants(el):
@@ -160,7 +243,12 @@ def compile_combined_selector(selector: selectors.CombinedSelector):
     if selector.combinator == " ":
 
         def left(el):
-            return any(left_inside(e) for e in ancestors(el))
+            p = el.parent()
+            while p:
+                if left_inside(p):
+                    return True
+                p = p.parent()
+            return False
 
     elif selector.combinator == ">":
 
@@ -211,7 +299,7 @@ def compile_pseudo_class_selector(selector: selectors.PseudoClassSelector):
         return lambda el: not next(el.children(), 0)
     elif name == "root":
         return lambda el: not el.parent()
-    elif name in ("hover", "focus", "active", "drop", "disabled"):
+    elif name in STATES:
         return lambda el: name in el.state()
     else:
         raise selectors.SelectorError("Unknown pseudo-class", name)
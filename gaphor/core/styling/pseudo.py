@@ -9,6 +9,11 @@ class PseudoStyleNode:
         self.pseudo = psuedo
         self.dark_mode = node.dark_mode
 
+    @property
+    def node(self) -> StyleNode:
+        """The node the pseudo-element belongs to."""
+        return self._node
+
     def name(self) -> str:
         return self._node.name()
 
@@ -1,6 +1,6 @@
 import pytest
 
-from gaphor.core.styling import merge_styles
+from gaphor.core.styling import merge_inline_style, merge_styles
 from gaphor.core.styling.declarations import Var
 
 
@@ -57,3 +57,21 @@ def test_color_override_with_variables():
     )
 
     assert style["color"] == (1.0, 1.0, 1.0, 0.5)
+
+
+def test_merge_without_inline_style_returns_style():
+    style = merge_styles({"color": (0, 0, 1, 1)})
+
+    assert merge_inline_style(style, {}) is style
+
+
+def test_merge_without_inline_style_applies_opacity():
+    style = {"color": (0, 0, 0, 0.8), "opacity": 0.5}
+
+    assert merge_inline_style(style, {}) == merge_styles(style)
+
+
+def test_merge_inline_style():
+    style = merge_inline_style({"font-size": 10}, {"font-size": "x-small"})
+
+    assert style["font-size"] == 7.5
@@ -1,6 +1,7 @@
 import pytest
 
 from gaphor.core.styling import compile_style_sheet
+from gaphor.core.styling.compiler import IndexKey, compile_indexed_style_sheet
 from gaphor.core.styling.selectors import SelectorError
 
 
@@ -391,3 +392,41 @@ def test_media_query(css):
 def test_invalid_media_query(css, exc_type):
     with pytest.raises(exc_type):
         next(compile_style_sheet(css))
+
+
+@pytest.mark.parametrize(
+    "css,key",
+    [
+        ["* {}", IndexKey()],
+        ["classitem {}", IndexKey("classitem")],
+        ["classitem nested {}", IndexKey("nested")],
+        ["classitem > * {}", IndexKey()],
+        ["classitem:hover {}", IndexKey("classitem", states=frozenset(["hover"]))],
+        [":focus:active {}", IndexKey(states=frozenset(["focus", "active"]))],
+        ["classitem::after {}", IndexKey("classitem", pseudo="after")],
+        ["classitem[name] {}", IndexKey("classitem")],
+        [":is(classitem, packageitem) {}", IndexKey()],
+        ["@media dark-mode { classitem {} }", IndexKey("classitem")],
+    ],
+)
+def test_index_key(css, key):
+    _selector, _declarations, index_key = next(compile_indexed_style_sheet(css))
+
+    assert index_key == key
+
+
+def test_index_key_candidate():
+    key = IndexKey("classitem", states=frozenset(["hover"]))
+
+    assert key.candidate("classitem", None, frozenset(["hover", "focus"]))
+    assert not key.candidate("classitem", None, frozenset())
+    assert not key.candidate("packageitem", None, frozenset(["hover"]))
+
+
+def test_select_compound_of_three():
+    css = "classitem:hover:focus {}"
+
+    selector, _declarations = next(compile_style_sheet(css))
+
+    assert selector(Node("classitem", state=("hover", "focus")))
+    assert not selector(Node("classitem", state=("hover",)))
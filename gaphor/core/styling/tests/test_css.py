@@ -1,8 +1,10 @@
 import pytest
 
 from gaphor.core.styling import (
+    ChildrenOf,
     CompiledStyleSheet,
     compile_style_sheet,
+    merge_inline_style,
 )
 from gaphor.core.styling.declarations import WhiteSpace
 from gaphor.core.styling.pseudo import compute_pseudo_element_style
@@ -161,6 +163,90 @@ def test_compiled_style_sheet():
     assert props.get("font-size") == 42
 
 
+def test_compiled_style_sheet_only_matches_candidate_rules():
+    css = """
+    mytype { font-family: sans }
+    other { font-family: serif }
+    mytype:hover { color: red }
+    """
+    compiled_style_sheet = CompiledStyleSheet(css)
+
+    candidates = compiled_style_sheet.candidate_rules(Node("mytype"))
+    hover_candidates = compiled_style_sheet.candidate_rules(
+        Node("mytype", state=("hover",))
+    )
+
+    assert [d for _, d in candidates] == [{"font-family": "sans"}]
+    assert len(hover_candidates) == 2
+
+
+def test_merged_inline_styles_are_memoized():
+    compiled_style_sheet = CompiledStyleSheet("mytype { font-size: 10 }")
+    style = compiled_style_sheet.compute_style(Node("mytype"))
+    inline_style = {"font-size": "x-small"}
+
+    merged = merge_inline_style(style, inline_style)
+
+    assert merged["font-size"] == 7.5
+    assert merge_inline_style(style, inline_style) is merged
+
+    compiled_style_sheet.clear_cache()
+
+    assert merge_inline_style(style, inline_style) is not merged
+
+
+def test_style_cache_drops_least_recently_used_style():
+    compiled_style_sheet = CompiledStyleSheet("mytype { font-size: 10 }")
+    compiled_style_sheet.max_cache_size = 2
+    first, second, third = Node("mytype"), Node("mytype"), Node("mytype")
+
+    compiled_style_sheet.compute_style(first)
+    compiled_style_sheet.compute_style(second)
+    compiled_style_sheet.compute_style(first)
+    compiled_style_sheet.compute_style(third)
+    compiled_style_sheet.compute_style(first)
+
+    assert compiled_style_sheet.cache_info() == (2, 3, 2)
+
+
+def test_invalidate_drops_inherited_styles():
+    compiled_style_sheet = CompiledStyleSheet("parent { font-size: 10 }")
+    parent = Node("parent")
+    child = Node("child", parent=parent)
+    other = Node("other")
+    compiled_style_sheet.compute_style(child)
+    compiled_style_sheet.compute_style(other)
+
+    dropped = compiled_style_sheet.invalidate(parent)
+
+    assert set(dropped) == {parent, child}
+    assert compiled_style_sheet.cache_info().size == 1
+
+
+def test_invalidate_styles_that_depend_on_children():
+    compiled_style_sheet = CompiledStyleSheet("parent:has(child) { font-size: 10 }")
+    child = Node("child")
+    parent = Node("parent", children=[child])
+    compiled_style_sheet.compute_style(parent)
+
+    assert compiled_style_sheet.invalidate(child) == []
+    assert compiled_style_sheet.invalidate(ChildrenOf(parent)) == [parent]
+
+
+def test_invalidate_recorded_dependency():
+    compiled_style_sheet = CompiledStyleSheet("mytype[name=a] { font-size: 10 }")
+
+    class RecordingNode(Node):
+        def attribute(self, name):
+            compiled_style_sheet.record_dependency(("key", name))
+            return super().attribute(name)
+
+    node = RecordingNode("mytype", attributes={"name": "a"})
+    compiled_style_sheet.compute_style(node)
+
+    assert compiled_style_sheet.invalidate(("key", "name")) == [node]
+
+
 @pytest.mark.parametrize(
     "font_size", ["x-small", "small", "medium", "large", "x-large"]
 )
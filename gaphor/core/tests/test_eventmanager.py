@@ -99,3 +99,150 @@ def test_priority_handler_error_in_handler_and_second_event(event_manager):
         event_manager.handle(event)
 
     assert other_events
+
+
+def create_batch_handler(event_type):
+    batches = []
+
+    @event_handler(event_type, batch=True)
+    def handler(events):
+        batches.append(events)
+
+    return handler, batches
+
+
+def test_batch_calls_handlers_directly(event_manager, subscriber):
+    event = Event()
+
+    with event_manager.batch():
+        event_manager.handle(event)
+
+        assert subscriber.events == [event]
+
+
+def test_batch_calls_priority_handlers_directly(event_manager):
+    handler, events = create_handler(Event)
+    event_manager.priority_subscribe(handler)
+    event = Event()
+
+    with event_manager.batch():
+        event_manager.handle(event)
+
+        assert events == [event]
+
+
+def test_batch_keeps_event_order(event_manager):
+    handler, events = create_handler(object)
+    batch_handler, batches = create_batch_handler(object)
+    event_manager.subscribe(handler)
+    event_manager.subscribe(batch_handler)
+    event1, other_event, event2 = Event(), OtherEvent(), Event()
+
+    with event_manager.batch():
+        event_manager.handle(event1)
+        event_manager.handle(other_event)
+        event_manager.handle(event2)
+
+    assert events == [event1, other_event, event2]
+    assert batches == [[event1, other_event, event2]]
+
+
+def test_batch_handler_receives_list_of_events(event_manager):
+    handler, batches = create_batch_handler(Event)
+    event_manager.subscribe(handler)
+    event1, event2 = Event(), Event()
+
+    with event_manager.batch():
+        event_manager.handle(event1)
+        event_manager.handle(event2)
+
+        assert not batches
+
+    event_manager.handle(event1)
+
+    assert batches == [[event1, event2], [event1]]
+
+
+def test_nested_batch_delivers_events_after_outer_batch(event_manager):
+    handler, batches = create_batch_handler(Event)
+    event_manager.subscribe(handler)
+    event = Event()
+
+    with event_manager.batch():
+        with event_manager.batch():
+            event_manager.handle(event)
+
+        assert not batches
+
+    assert batches == [[event]]
+
+
+def test_events_sent_while_delivering_batch_are_handled(event_manager):
+    @event_handler(Event, batch=True)
+    def handler(events):
+        event_manager.handle(OtherEvent())
+
+    other_handler, other_events = create_handler(OtherEvent)
+    event_manager.subscribe(handler)
+    event_manager.subscribe(other_handler)
+
+    with event_manager.batch():
+        event_manager.handle(Event())
+        event_manager.handle(Event())
+
+    assert len(other_events) == 1
+
+
+def test_error_in_handler_during_batch(event_manager):
+    s = Subscriber(exception=ValueError)
+    event_manager.subscribe(s)
+    event1, event2 = Event(), Event()
+
+    with event_manager.batch():
+        with pytest.raises(ExceptionGroup):
+            event_manager.handle(event1)
+        with pytest.raises(ExceptionGroup):
+            event_manager.handle(event2)
+
+    assert s.events == [event1, event2]
+
+
+def test_error_in_batch_handler(event_manager):
+    @event_handler(Event, batch=True)
+    def failing_handler(events):
+        raise ValueError()
+
+    handler, batches = create_batch_handler(Event)
+    event_manager.subscribe(failing_handler)
+    event_manager.subscribe(handler)
+    event = Event()
+
+    with pytest.raises(ExceptionGroup):
+        with event_manager.batch():
+            event_manager.handle(event)
+
+    event_manager.handle(OtherEvent())
+
+    assert batches == [[event]]
+
+
+def test_handler_lookup_is_updated_after_subscribe(event_manager):
+    event_manager.handle(Event())
+    handler, events = create_handler(Event)
+
+    event_manager.subscribe(handler)
+    event_manager.handle(Event())
+
+    assert len(events) == 1
+
+
+def test_keyboard_interrupt_in_batch_handler_is_not_wrapped(event_manager):
+    @event_handler(Event, batch=True)
+    def handler(events):
+        raise KeyboardInterrupt()
+
+    event_manager.subscribe(handler)
+
+    with pytest.raises(KeyboardInterrupt):
+        with event_manager.batch():
+            event_manager.handle(Event())
@@ -1,67 +1,104 @@
 """Service dedicated to exporting diagrams to a variety of file formats."""
 
+import hashlib
+import importlib.metadata
+import math
 import re
+import shutil
+import struct
+import zlib
+from collections import deque
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
 
 import cairo
 from gaphas.geometry import Rectangle
-from gaphas.painter import FreeHandPainter, PainterChain
+from gaphas.painter import FreeHandPainter
+from PIL import Image
 
+from gaphor.core.modeling import Diagram, Element
+from gaphor.core.modeling.collection import collection
 from gaphor.core.modeling.diagram import StyledDiagram
 from gaphor.diagram.painter import DiagramTypePainter, ItemPainter
 
+PNG_CHUNK_SIZE = 1 << 20
+
 
 def escape_filename(diagram_name):
     return re.sub("\\W+", "_", diagram_name)
 
 
 def render(diagram, new_surface, padding=8, write_to_png=None) -> None:
-    diagram.update_now(diagram.get_all_items())
+    w, h, draw = prepare_drawing(diagram, padding)
+
+    with new_surface(w, h) as surface:
+        cr = cairo.Context(surface)
+        draw(cr)
+        cr.show_page()
 
-    painter = new_painter(diagram)
+        if write_to_png:
+            surface.write_to_png(write_to_png)
 
-    # Update bounding boxes with a temporary Cairo Context
-    # (used for stuff like calculating font metrics)
-    bounding_box = calc_bounding_box(diagram, painter)
-    type_padding = diagram_type_height(diagram)
+
+def prepare_drawing(
+    diagram, padding=8
+) -> tuple[float, float, Callable[[cairo.Context], None]]:
+    """Record a diagram for export.
+
+    Returns the width and height of the drawing, and a function that
+    draws it on a Cairo context, with the top-left corner at the origin.
+    """
+    diagram.update_now(diagram.get_all_items())
+
+    # Items are painted once, on a recording surface. The recording
+    # provides the bounding box, and is replayed on the target surface.
+    items = record(diagram, new_item_painter(diagram))
+    type_label = (
+        record(diagram, DiagramTypePainter(diagram)) if diagram.diagramType else None
+    )
+    type_bounding_box = (
+        Rectangle(*type_label.ink_extents()) if type_label else Rectangle()
+    )
+    bounding_box = Rectangle(*items.ink_extents())
+    if not bounding_box:
+        bounding_box = type_bounding_box
+    elif type_bounding_box:
+        bounding_box += type_bounding_box
+    type_padding = type_bounding_box.height
 
     w, h = (
         bounding_box.width + 2 * padding,
         bounding_box.height + 2 * padding + type_padding,
     )
+    bg_color = diagram.style(StyledDiagram(diagram)).get("background-color")
 
-    with new_surface(w, h) as surface:
-        cr = cairo.Context(surface)
-
-        bg_color = diagram.style(StyledDiagram(diagram)).get("background-color")
+    def draw(cr):
         if bg_color and bg_color[3]:
             cr.rectangle(0, 0, w, h)
             cr.set_source_rgba(*bg_color)
             cr.fill()
 
+        cr.save()
         cr.translate(
             -bounding_box.x + padding, -bounding_box.y + padding + type_padding
         )
-        painter.paint(diagram.get_all_items(), cr)
-        cr.show_page()
-
-        if write_to_png:
-            surface.write_to_png(write_to_png)
-
-
-def diagram_type_height(diagram):
-    if not diagram.diagramType:
-        return 0
+        cr.set_source_surface(items, 0, 0)
+        cr.paint()
+        cr.restore()
 
-    bounding_box = calc_bounding_box(diagram, DiagramTypePainter(diagram))
+        if type_label:
+            cr.set_source_surface(type_label, 0, 0)
+            cr.paint()
 
-    return bounding_box.height
+    return w, h, draw
 
 
-def calc_bounding_box(diagram, painter):
+def record(diagram, painter) -> cairo.RecordingSurface:
     surface = cairo.RecordingSurface(cairo.Content.COLOR_ALPHA, None)
     cr = cairo.Context(surface)
     painter.paint(diagram.get_all_items(), cr)
-    return Rectangle(*surface.ink_extents())
+    return surface
 
 
 def save_svg(filename, diagram):
@@ -89,10 +126,189 @@ def save_eps(filename, diagram):
     render(diagram, new_surface)
 
 
-def new_painter(diagram):
+def save_tiled_png(filename, diagram, tile_size=512):
+    """Save a diagram as PNG, rendered in tiles.
+
+    The image is rendered one row of tiles at a time, and each row is
+    compressed before the next row is rendered. Memory use is bounded by
+    the width of the diagram and the tile size, instead of the size of the
+    diagram.
+    """
+    w, h, draw = prepare_drawing(diagram)
+    width, height = int(w + 1), int(h + 1)
+
+    with (
+        nullcontext(filename) if hasattr(filename, "write") else open(filename, "wb")
+    ) as f:
+        write_png(f, width, height, render_rows(draw, width, height, tile_size))
+
+
+def save_tile_pyramid(filename, diagram, tile_size=256):
+    """Save a diagram as a Deep Zoom image, for web viewers.
+
+    ``filename`` is the image descriptor (``.dzi``). Tiles are stored in a
+    ``<name>_files`` directory next to it, with a directory per zoom level.
+    Level 0 is a single pixel, the highest level is the diagram at full
+    size.
+    """
+    w, h, draw = prepare_drawing(diagram)
+    width, height = int(w + 1), int(h + 1)
+    path = Path(filename)
+    tiles_dir = path.with_name(f"{path.stem}_files")
+    if tiles_dir.exists():
+        shutil.rmtree(tiles_dir)
+
+    max_level = math.ceil(math.log2(max(width, height)))
+    for level in range(max_level + 1):
+        scale = 0.5 ** (max_level - level)
+        level_width = max(1, math.ceil(width * scale))
+        level_height = max(1, math.ceil(height * scale))
+        level_dir = tiles_dir / str(level)
+        level_dir.mkdir(parents=True)
+        for row, y in enumerate(range(0, level_height, tile_size)):
+            for column, x in enumerate(range(0, level_width, tile_size)):
+                tile = render_tile(
+                    draw,
+                    x,
+                    y,
+                    min(tile_size, level_width - x),
+                    min(tile_size, level_height - y),
+                    scale,
+                )
+                tile.save(level_dir / f"{column}_{row}.png")
+
+    path.write_text(
+        f"""<?xml version="1.0" encoding="UTF-8"?>
+<Image xmlns="http://schemas.microsoft.com/deepzoom/2008" Format="png" Overlap="0" TileSize="{tile_size}">
+  <Size Width="{width}" Height="{height}"/>
+</Image>
+""",
+        encoding="utf-8",
+    )
+
+
+def render_tile(draw, x, y, width, height, scale=1.0) -> Image.Image:
+    """Render a part of a drawing as RGBA image."""
+    surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, width, height)
+    cr = cairo.Context(surface)
+    cr.translate(-x, -y)
+    cr.scale(scale, scale)
+    draw(cr)
+    surface.flush()
+    # Cairo stores premultiplied ARGB pixels in native byte order,
+    # which is BGRA on little endian platforms
+    return Image.frombuffer(
+        "RGBA",
+        (width, height),
+        surface.get_data(),
+        "raw",
+        "BGRa",
+        surface.get_stride(),
+        1,
+    )
+
+
+def render_rows(draw, width, height, tile_size) -> Iterator[bytes]:
+    """Render a drawing in tiles, and yield its pixel rows."""
+    for y in range(0, height, tile_size):
+        rows = min(tile_size, height - y)
+        tiles = []
+        for x in range(0, width, tile_size):
+            tile_width = min(tile_size, width - x)
+            tile = render_tile(draw, x, y, tile_width, rows)
+            tiles.append((tile.tobytes(), tile_width * 4))
+        for r in range(rows):
+            yield b"".join(
+                data[r * stride : (r + 1) * stride] for data, stride in tiles
+            )
+
+
+def write_png(f, width, height, rows: Iterable[bytes]) -> None:
+    """Write an 8-bit RGBA PNG image, one pixel row at a time."""
+
+    def chunk(kind, data=b""):
+        f.write(struct.pack(">I", len(data)))
+        f.write(kind)
+        f.write(data)
+        f.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind))))
+
+    f.write(b"\x89PNG\r\n\x1a\n")
+    chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+    compressor = zlib.compressobj()
+    data = bytearray()
+    for row in rows:
+        # Each row starts with its filter type: none
+        data += compressor.compress(b"\0" + row)
+        if len(data) >= PNG_CHUNK_SIZE:
+            chunk(b"IDAT", bytes(data))
+            data.clear()
+    data += compressor.flush()
+    chunk(b"IDAT", bytes(data))
+    chunk(b"IEND")
+
+
+def new_item_painter(diagram):
     style = diagram.style(StyledDiagram(diagram))
     sloppiness = style.get("line-style", 0.0)
-    item_painter = (
-        FreeHandPainter(ItemPainter(), sloppiness) if sloppiness else ItemPainter()
+    return FreeHandPainter(ItemPainter(), sloppiness) if sloppiness else ItemPainter()
+
+
+def diagram_fingerprint(diagram: Diagram, depth: int = 3) -> str:
+    """A content hash of everything that shows on an exported diagram.
+
+    The hash covers the saved properties of the diagram, its
+    presentation items, the style sheet, and elements referenced from the
+    presentation items, up to ``depth`` references away. The Gaphor version
+    is included, since rendering may change between versions.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(importlib.metadata.version("gaphor").encode())
+
+    queue: deque[tuple[Element, int]] = deque(
+        (e, 0) for e in (diagram, diagram.styleSheet, *diagram.get_all_items()) if e
     )
-    return PainterChain().append(item_painter).append(DiagramTypePainter(diagram))
+    seen = {e for e, _ in queue}
+
+    def reference(element, level):
+        digest.update(element.id.encode())
+        if level < depth and element not in seen:
+            seen.add(element)
+            queue.append((element, level + 1))
+
+    while queue:
+        element, level = queue.popleft()
+        digest.update(f"\0{type(element).__name__}\0{element.id}".encode())
+
+        def save_func(name, value, level=level):
+            digest.update(f"\0{name}=".encode())
+            if isinstance(value, Element):
+                reference(value, level)
+            elif isinstance(value, collection):
+                for v in value:
+                    reference(v, level)
+            elif value is not None:
+                digest.update(str(value).encode())
+
+        element.save(save_func)
+
+    return digest.hexdigest()
+
+
+def fingerprint_file(filename) -> Path:
+    return Path(f"{filename}.fingerprint")
+
+
+def is_up_to_date(filename, fingerprint: str) -> bool:
+    """Check if a file has been exported from a diagram with this
+    fingerprint."""
+    try:
+        return (
+            Path(filename).exists()
+            and fingerprint_file(filename).read_text(encoding="utf-8") == fingerprint
+        )
+    except OSError:
+        return False
+
+
+def write_fingerprint(filename, fingerprint: str) -> None:
+    fingerprint_file(filename).write_text(fingerprint, encoding="utf-8")
@@ -16,7 +16,7 @@ from gaphor.core.modeling.element import Id
 from gaphor.core.modeling.event import AttributeUpdated, RevertibleEvent
 from gaphor.core.modeling.presentation import Presentation, S, literal_eval
 from gaphor.core.modeling.properties import attribute
-from gaphor.core.styling import Style, merge_styles
+from gaphor.core.styling import Style, merge_inline_style
 from gaphor.diagram.shapes import CssNode, Shape, Text, stroke, traverse_css_nodes
 from gaphor.diagram.text import TextAlign, middle_segment, text_point_at_line
 
@@ -329,7 +329,7 @@ class LinePresentation(gaphas.Line, HandlePositionUpdate, Presentation[S]):
         return min(d0, *ds) if ds else d0
 
     def draw(self, context: DrawContext):
-        style = merge_styles(context.style, self.style)
+        style = merge_inline_style(context.style, self.style)
         context = replace(context, style=style)
 
         self.update_shape_bounds(context)
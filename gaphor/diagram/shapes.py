@@ -20,11 +20,11 @@ from gaphor.core.styling import (
     TextAlign,
     VerticalAlign,
     WhiteSpace,
-    merge_styles,
+    merge_inline_style,
 )
 from gaphor.core.styling.inherit import compute_inherited_style
 from gaphor.core.styling.pseudo import compute_pseudo_element_style
-from gaphor.diagram.text import Layout
+from gaphor.diagram.text import TextKey, font_id, text_layouts
 
 
 class cairo_state:
@@ -240,7 +240,7 @@ class Box:
         return self.children[index]
 
     def size(self, context: UpdateContext, bounding_box: Rectangle | None = None):
-        style = merge_styles(context.style, self._inline_style)
+        style = merge_inline_style(context.style, self._inline_style)
         min_width = style.get("min-width", 0)
         min_height = style.get("min-height", 0)
         padding = style.get("padding", DEFAULT_PADDING)
@@ -273,7 +273,7 @@ class Box:
             self.draw_horizontal(context, bounding_box)
 
     def draw_vertical(self, context: DrawContext, bounding_box: Rectangle):
-        style = merge_styles(context.style, self._inline_style)
+        style = merge_inline_style(context.style, self._inline_style)
         new_context = replace(context, style=style)
         padding_top, padding_right, padding_bottom, padding_left = style.get(
             "padding", DEFAULT_PADDING
@@ -326,7 +326,7 @@ class Box:
                 y += h
 
     def draw_horizontal(self, context: DrawContext, bounding_box: Rectangle):
-        style = merge_styles(context.style, self._inline_style)
+        style = merge_inline_style(context.style, self._inline_style)
         new_context = replace(context, style=style)
         padding_top, padding_right, padding_bottom, padding_left = style.get(
             "padding", DEFAULT_PADDING
@@ -423,7 +423,7 @@ class IconBox:
         return iter((self.icon, *self.children))
 
     def size(self, context: UpdateContext, bounding_box: Rectangle | None = None):
-        style = merge_styles(context.style, self._inline_style)
+        style = merge_inline_style(context.style, self._inline_style)
         min_width = style.get("min-width", 0)
         min_height = style.get("min-height", 0)
         padding = style.get("padding", DEFAULT_PADDING)
@@ -473,7 +473,7 @@ class IconBox:
         )
 
     def draw(self, context: DrawContext, bounding_box: Rectangle):
-        style = merge_styles(context.style, self._inline_style)
+        style = merge_inline_style(context.style, self._inline_style)
         new_context = replace(context, style=style)
         self.icon.draw(
             new_context,
@@ -492,7 +492,7 @@ class Text:
             style = {}
         self._text = text if callable(text) else lambda: text
         self._inline_style = style
-        self._layout = Layout()
+        self._last_text = ""
 
     def __iter__(self):
         return iter(())
@@ -512,22 +512,27 @@ class Text:
         return t
 
     def size(self, context: UpdateContext, bounding_box: Rectangle | None = None):
-        style = merge_styles(context.style, self._inline_style)
+        style = merge_inline_style(context.style, self._inline_style)
         min_w = style.get("min-width", 0)
         min_h = style.get("min-height", 0)
         text_align = style.get("text-align", TextAlign.CENTER)
         white_space = style.get("white-space", WhiteSpace.NORMAL)
 
-        layout = self._layout
-        layout.set(
-            text=self.text(style),
-            font=style,
-            width=bounding_box.width
-            if bounding_box and white_space == WhiteSpace.NORMAL
-            else -1,
-            text_align=text_align,
+        text = self._last_text = self.text(style) or ""
+        width, height = (
+            text_layouts.size(
+                TextKey(
+                    text,
+                    font_id(style),
+                    bounding_box.width
+                    if bounding_box and white_space == WhiteSpace.NORMAL
+                    else -1,
+                    text_align,
+                )
+            )
+            if text
+            else (0, 0)
         )
-        width, height = layout.size()
         padding_top, padding_right, padding_bottom, padding_left = style.get(
             "padding", DEFAULT_PADDING
         )
@@ -538,9 +543,7 @@ class Text:
 
     def draw(self, context: DrawContext, bounding_box: Rectangle):
         """Draw the text, return the location and size."""
-        style = merge_styles(context.style, self._inline_style)
-        min_w = max(style.get("min-width", 0), bounding_box.width)
-        min_h = max(style.get("min-height", 0), bounding_box.height)
+        style = merge_inline_style(context.style, self._inline_style)
         text_box = rectangle_shrink(bounding_box, style.get("padding", DEFAULT_PADDING))
 
         with cairo_state(context.cairo) as cr:
@@ -549,10 +552,17 @@ class Text:
             elif color := style.get("color"):
                 cr.set_source_rgba(*color)
 
-            layout = self._layout
-            cr.move_to(text_box.x, text_box.y)
-            layout.set(font=style)
-            layout.show_layout(cr, text_box.width, default_size=(min_w, min_h))
+            if text := self._last_text:
+                cr.move_to(text_box.x, text_box.y)
+                text_layouts.show(
+                    cr,
+                    TextKey(
+                        text,
+                        font_id(style),
+                        text_box.width,
+                        style.get("text-align", TextAlign.CENTER),
+                    ),
+                )
 
 
 class CssNode:
@@ -601,6 +611,7 @@ class StyledCssNode:
         self._shape = shape
         self.pseudo: str | None = None
         self.dark_mode = self._parent.dark_mode if self._parent else None
+        self.diagram = getattr(self._parent, "diagram", None)
 
     def name(self) -> str:
         return self._shape._name
@@ -612,9 +623,11 @@ class StyledCssNode:
         return (node.style_node(self) for node in traverse_css_nodes(self._shape))
 
     def attribute(self, name: str) -> str | None:
-        if not self._shape._element:
+        if not (element := self._shape._element):
             return None
-        return lookup_attribute(self._shape._element, name)
+        if diagram := self.diagram:
+            return diagram.lookup_style_attribute(element, name)  # type: ignore[no-any-return]
+        return lookup_attribute(element, name)
 
     def state(self) -> Sequence[str]:
         return ()
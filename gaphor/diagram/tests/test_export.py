@@ -1,13 +1,25 @@
+from io import BytesIO
+
 import pytest
+from PIL import Image
 
+from gaphor import UML
+from gaphor.core.modeling import StyleSheet
 from gaphor.diagram.export import (
+    diagram_fingerprint,
     escape_filename,
+    is_up_to_date,
     save_eps,
     save_pdf,
     save_png,
     save_svg,
+    save_tile_pyramid,
+    save_tiled_png,
+    write_fingerprint,
+    write_png,
 )
 from gaphor.diagram.general import Box
+from gaphor.UML.classes import ClassItem
 
 
 @pytest.fixture
@@ -43,6 +55,44 @@ def test_export_to_pdf(diagram_with_box, tmp_path):
     assert b"%PDF" in content
 
 
+def test_export_to_tiled_png(diagram_with_box, tmp_path):
+    f = tmp_path / "test.png"
+    tiled = tmp_path / "tiled.png"
+
+    save_png(f, diagram_with_box)
+    save_tiled_png(tiled, diagram_with_box, tile_size=16)
+
+    with Image.open(f) as image, Image.open(tiled) as tiled_image:
+        assert tiled_image.mode == "RGBA"
+        assert tiled_image.size == image.size
+
+
+def test_export_to_tile_pyramid(diagram_with_box, tmp_path):
+    f = tmp_path / "test.dzi"
+
+    save_tile_pyramid(f, diagram_with_box, tile_size=16)
+    content = f.read_text(encoding="utf-8")
+    levels = sorted(int(p.name) for p in (tmp_path / "test_files").iterdir())
+
+    assert "deepzoom" in content
+    assert levels == list(range(len(levels)))
+    with Image.open(tmp_path / "test_files" / "0" / "0_0.png") as image:
+        assert image.size == (1, 1)
+
+
+def test_write_png_one_row_at_a_time():
+    rows = [bytes([r, c, 0, 255]) * 3 for r, c in ((255, 0), (0, 255))]
+    f = BytesIO()
+
+    write_png(f, 3, 2, iter(rows))
+    f.seek(0)
+
+    with Image.open(f) as image:
+        assert image.mode == "RGBA"
+        assert image.size == (3, 2)
+        assert image.tobytes() == b"".join(rows)
+
+
 def test_export_to_eps(diagram_with_box, tmp_path):
     f = tmp_path / "test.eps"
 
@@ -57,3 +107,80 @@ def test_escape_filename():
     assert escape_filename(r"foo \ bar >") == "foo_bar_"
     assert escape_filename("çëÆØ") == "çëÆØ"
     assert escape_filename("こんにちは") == "こんにちは"  # should read: "hello"
+
+
+@pytest.fixture
+def diagram_with_class(diagram, element_factory):
+    class_ = element_factory.create(UML.Class)
+    class_.name = "Foo"
+    attribute = element_factory.create(UML.Property)
+    attribute.name = "bar"
+    class_.ownedAttribute = attribute
+    diagram.create(ClassItem, subject=class_)
+    return diagram
+
+
+def test_fingerprint_is_stable(diagram_with_class):
+    assert diagram_fingerprint(diagram_with_class) == diagram_fingerprint(
+        diagram_with_class
+    )
+
+
+def test_fingerprint_changes_with_presentation(diagram_with_class):
+    fingerprint = diagram_fingerprint(diagram_with_class)
+
+    next(diagram_with_class.select(ClassItem)).matrix.translate(10, 10)
+
+    assert diagram_fingerprint(diagram_with_class) != fingerprint
+
+
+def test_fingerprint_changes_with_subject(diagram_with_class):
+    fingerprint = diagram_fingerprint(diagram_with_class)
+
+    next(diagram_with_class.select(ClassItem)).subject.name = "Baz"
+
+    assert diagram_fingerprint(diagram_with_class) != fingerprint
+
+
+def test_fingerprint_changes_with_nested_element(diagram_with_class):
+    fingerprint = diagram_fingerprint(diagram_with_class)
+
+    next(diagram_with_class.select(ClassItem)).subject.ownedAttribute[0].name = "baz"
+
+    assert diagram_fingerprint(diagram_with_class) != fingerprint
+
+
+def test_fingerprint_changes_with_style_sheet(diagram_with_class, element_factory):
+    style_sheet = element_factory.create(StyleSheet)
+    fingerprint = diagram_fingerprint(diagram_with_class)
+
+    style_sheet.styleSheet = "* { color: red }"
+
+    assert diagram_fingerprint(diagram_with_class) != fingerprint
+
+
+def test_fingerprint_ignores_unrelated_elements(diagram_with_class, element_factory):
+    fingerprint = diagram_fingerprint(diagram_with_class)
+
+    element_factory.create(UML.Class).name = "Unrelated"
+
+    assert diagram_fingerprint(diagram_with_class) == fingerprint
+
+
+def test_file_is_up_to_date(tmp_path):
+    f = tmp_path / "test.svg"
+    f.write_text("<svg/>", encoding="utf-8")
+
+    assert not is_up_to_date(f, "1234")
+
+    write_fingerprint(f, "1234")
+
+    assert is_up_to_date(f, "1234")
+    assert not is_up_to_date(f, "5678")
+
+
+def test_missing_file_is_not_up_to_date(tmp_path):
+    f = tmp_path / "test.svg"
+    write_fingerprint(f, "1234")
+
+    assert not is_up_to_date(f, "1234")
@@ -28,7 +28,7 @@ def fixed_text_size(monkeypatch):
     def text_size(*args):
         return size
 
-    monkeypatch.setattr("gaphor.diagram.text.Layout.size", text_size)
+    monkeypatch.setattr("gaphor.diagram.text.TextLayouts.size", text_size)
     return size
 
 
@@ -284,13 +284,18 @@ def test_text_with_after_pseudo_element():
     """
 
     class DummyStyleNode:
-        name = "text"
         pseudo = None
         dark_mode = False
 
+        def name(self):
+            return "text"
+
         def parent(self):
             return None
 
+        def state(self):
+            return ()
+
     style = CompiledStyleSheet(css).compute_style(DummyStyleNode())
     text = Text("some")
 
@@ -6,6 +6,9 @@ from gaphor.diagram.text import (
     Layout,
     TextAlign,
     TextDecoration,
+    TextKey,
+    TextLayouts,
+    font_id,
     text_point_at_line,
 )
 
@@ -101,3 +104,46 @@ def test_text_with_just_font_as_dict():
     w, h = Layout("Example", {"font-family": "sans", "font-size": 10}).size()
     assert w
     assert h
+
+
+FONT = {"font-family": "sans", "font-size": 10}
+
+
+def test_text_size_is_measured_once():
+    text_layouts = TextLayouts()
+    key = TextKey("Example", font_id(FONT), -1, TextAlign.CENTER)
+
+    w, h = text_layouts.size(key)
+
+    assert w
+    assert h
+    assert text_layouts.size(key) == (w, h)
+    assert text_layouts.cache_info() == (1, 1, 1, 1)
+
+
+def test_text_size_equals_layout_size():
+    text_layouts = TextLayouts()
+
+    assert (
+        text_layouts.size(TextKey("Example", font_id(FONT), -1, TextAlign.CENTER))
+        == Layout("Example", FONT).size()
+    )
+
+
+def test_text_sizes_are_evicted_least_recently_used_first():
+    text_layouts = TextLayouts(max_sizes=2, max_layouts=1)
+    a, b, c = (TextKey(t, font_id(FONT), -1, TextAlign.CENTER) for t in "abc")
+
+    text_layouts.size(a)
+    text_layouts.size(b)
+    text_layouts.size(a)
+    text_layouts.size(c)
+
+    assert list(text_layouts._sizes) == [a, c]
+    assert list(text_layouts._layouts) == [c]
+
+
+def test_font_id_includes_underline():
+    assert font_id(FONT) != font_id(
+        {**FONT, "text-decoration": TextDecoration.UNDERLINE}  # type: ignore[typeddict-item]
+    )
@@ -1,12 +1,153 @@
 """Support classes for dealing with text."""
 from __future__ import annotations
 
+from collections import OrderedDict
+from functools import lru_cache
+from typing import NamedTuple
+
 from gaphas.canvas import instant_cairo_context
 from gaphas.painter.freehand import FreeHandCairoContext
 from gi.repository import Pango, PangoCairo
 
 from gaphor.core.styling import FontStyle, FontWeight, Style, TextAlign, TextDecoration
 
+FontId = tuple[str, float | str, FontWeight | None, FontStyle | None, bool]
+
+
+def font_id(font: Style) -> FontId:
+    """A hashable representation of the font properties of a style."""
+    font_family = font.get("font-family")
+    font_size = font.get("font-size")
+    assert font_family, "Font family should be set"
+    assert font_size, "Font size should be set"
+    return (
+        font_family,
+        font_size,
+        font.get("font-weight"),
+        font.get("font-style"),
+        font.get("text-decoration", TextDecoration.NONE) == TextDecoration.UNDERLINE,
+    )
+
+
+@lru_cache(maxsize=64)
+def font_description(font: FontId) -> Pango.FontDescription:
+    font_family, font_size, font_weight, font_style, _ = font
+    fd = Pango.FontDescription.new()
+    fd.set_family(font_family)
+    fd.set_absolute_size(font_size * Pango.SCALE)
+
+    if font_weight:
+        assert isinstance(font_weight, FontWeight)
+        fd.set_weight(getattr(Pango.Weight, font_weight.name))
+    if font_style:
+        assert isinstance(font_style, FontStyle)
+        fd.set_style(getattr(Pango.Style, font_style.name))
+    return fd
+
+
+@lru_cache(maxsize=2)
+def font_attributes(underline: bool) -> Pango.AttrList:
+    attrs = Pango.AttrList.new()
+    attrs.insert(
+        Pango.attr_underline_new(
+            Pango.Underline.SINGLE if underline else Pango.Underline.NONE
+        )
+    )
+    return attrs
+
+
+def pango_width(width: float) -> int:
+    return -1 if width == -1 else min(int(width * Pango.SCALE), 2147483647)
+
+
+class TextKey(NamedTuple):
+    text: str
+    font: FontId
+    width: float
+    text_align: TextAlign
+
+
+class TextCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    sizes: int
+    layouts: int
+
+
+class TextLayouts:
+    """Shared Pango layouts and text sizes.
+
+    Text is measured once for each combination of text, font, width and
+    alignment. Sizes are kept in a least recently used cache. Laid out
+    text is kept in a small pool of layouts, so text that's drawn
+    often does not have to be laid out again.
+    """
+
+    def __init__(self, max_sizes: int = 8192, max_layouts: int = 256):
+        self.max_sizes = max_sizes
+        self.max_layouts = max_layouts
+        self._sizes: OrderedDict[TextKey, tuple[int, int]] = OrderedDict()
+        self._layouts: OrderedDict[TextKey, Pango.Layout] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def layout(self, key: TextKey) -> Pango.Layout:
+        layouts = self._layouts
+        try:
+            layouts.move_to_end(key)
+            return layouts[key]
+        except KeyError:
+            pass
+
+        if len(layouts) >= self.max_layouts:
+            # Reuse the least recently used layout
+            _, layout = layouts.popitem(last=False)
+        else:
+            layout = PangoCairo.create_layout(instant_cairo_context())
+
+        text, font, width, text_align = key
+        layout.set_font_description(font_description(font))
+        layout.set_attributes(font_attributes(font[4]))
+        layout.set_text(text, length=-1)
+        layout.set_width(pango_width(width))
+        layout.set_alignment(getattr(Pango.Alignment, text_align.name))
+        layouts[key] = layout
+        return layout
+
+    def size(self, key: TextKey) -> tuple[int, int]:
+        sizes = self._sizes
+        try:
+            size = sizes[key]
+        except KeyError:
+            self.misses += 1
+            size = sizes[key] = self.layout(key).get_pixel_size()
+            if len(sizes) > self.max_sizes:
+                sizes.popitem(last=False)
+            return size  # type: ignore[no-any-return]
+        self.hits += 1
+        sizes.move_to_end(key)
+        return size
+
+    def show(self, cr, key: TextKey) -> None:
+        layout = self.layout(key)
+        if isinstance(cr, FreeHandCairoContext):
+            PangoCairo.show_layout(cr.cr, layout)
+        else:
+            PangoCairo.show_layout(cr, layout)
+
+    def cache_info(self) -> TextCacheInfo:
+        return TextCacheInfo(
+            self.hits, self.misses, len(self._sizes), len(self._layouts)
+        )
+
+    def clear(self) -> None:
+        self._sizes.clear()
+        self._layouts.clear()
+        self.hits = self.misses = 0
+
+
+text_layouts = TextLayouts()
+
 
 class Layout:
     def __init__(
@@ -18,9 +159,7 @@ class Layout:
         default_size: tuple[int, int] = (0, 0),
     ):
         self.layout = PangoCairo.create_layout(instant_cairo_context())
-        self.font_id: (
-            tuple[str, float | str, FontWeight | None, FontStyle | None] | None
-        ) = None
+        self.font_id: FontId | None = None
         self.text = ""
         self.width = -1
         self.default_size = default_size
@@ -45,43 +184,13 @@ class Layout:
             self.set_alignment(text_align)
 
     def set_font(self, font: Style) -> None:
-        font_family = font.get("font-family")
-        font_size = font.get("font-size")
-        font_weight = font.get("font-weight")
-        font_style = font.get("font-style")
-        assert font_family, "Font family should be set"
-        assert font_size, "Font size should be set"
-
-        font_id = (font_family, font_size, font_weight, font_style)
-        if font_id == self.font_id:
+        fid = font_id(font)
+        if fid == self.font_id:
             return
 
-        self.font_id = font_id
-
-        fd = Pango.FontDescription.new()
-        fd.set_family(font_family)
-        fd.set_absolute_size(font_size * Pango.SCALE)
-
-        if font_weight:
-            assert isinstance(font_weight, FontWeight)
-            fd.set_weight(getattr(Pango.Weight, font_weight.name))
-        if font_style:
-            assert isinstance(font_style, FontStyle)
-            fd.set_style(getattr(Pango.Style, font_style.name))
-
-        self.layout.set_font_description(fd)
-
-        underline = (
-            font.get("text-decoration", TextDecoration.NONE) == TextDecoration.UNDERLINE
-        )
-
-        attrs = Pango.AttrList.new()
-        attrs.insert(
-            Pango.attr_underline_new(
-                Pango.Underline.SINGLE if underline else Pango.Underline.NONE
-            )
-        )
-        self.layout.set_attributes(attrs)
+        self.font_id = fid
+        self.layout.set_font_description(font_description(fid))
+        self.layout.set_attributes(font_attributes(fid[4]))
 
     def set_text(self, text: str) -> None:
         if text != self.text:
@@ -51,7 +51,7 @@ def on_motion(
         view.selection.dropzone_item = (
             parent
             if can_group(parent.subject, subject_class)
-            or can_connect(parent, item_class)  # type: ignore[arg-type]
+            or can_connect(parent, item_class)
             else None
         )
         model.request_update(parent)
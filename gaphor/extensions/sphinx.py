@@ -10,7 +10,13 @@ from docutils.parsers.rst.directives import images
 from sphinx.util import logging
 
 from gaphor.core.modeling import Diagram, ElementFactory
-from gaphor.diagram.export import save_pdf, save_svg
+from gaphor.diagram.export import (
+    diagram_fingerprint,
+    is_up_to_date,
+    save_pdf,
+    save_svg,
+    write_fingerprint,
+)
 from gaphor.i18n import gettext
 from gaphor.services.modelinglanguage import ModelingLanguageService
 from gaphor.storage import storage
@@ -90,9 +96,16 @@ class DiagramDirective(sphinx.util.docutils.SphinxDirective):
                 ).format(name=name, model_name=model_name, model_file=model_file)
             )
 
+        assert isinstance(diagram, Diagram)
         outfile = outdir / f"{diagram.id}"
-        save_svg(outfile.with_suffix(".svg"), diagram)
-        save_pdf(outfile.with_suffix(".pdf"), diagram)
+        fingerprint = diagram_fingerprint(diagram)
+        for filename, save in (
+            (outfile.with_suffix(".svg"), save_svg),
+            (outfile.with_suffix(".pdf"), save_pdf),
+        ):
+            if not is_up_to_date(filename, fingerprint):
+                save(filename, diagram)
+                write_fingerprint(filename, fingerprint)
 
         # Image needs a relative path. Make our outfile path relative to the doc
         outdir = outdir.relative_to(self.env.srcdir)
@@ -112,8 +125,16 @@ class DiagramDirective(sphinx.util.docutils.SphinxDirective):
         return [nodes.error("", nodes.paragraph(text=text))]
 
 
-@functools.cache
-def load_model(model_file: str) -> ElementFactory:
+def load_model(model_file: Path) -> ElementFactory:
+    """Load a model, once per build.
+
+    The model is loaded again if the model file has changed.
+    """
+    return _load_model(model_file, model_file.stat().st_mtime_ns)
+
+
+@functools.lru_cache(maxsize=16)
+def _load_model(model_file: Path, _mtime: int) -> ElementFactory:
     element_factory = ElementFactory()
 
     modeling_language = ModelingLanguageService()
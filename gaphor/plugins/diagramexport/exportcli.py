@@ -2,13 +2,28 @@
 
 import argparse
 import logging
+import multiprocessing
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
 from pathlib import Path
 from typing import List
 
 from gaphor.application import Session
 from gaphor.core.modeling import Diagram
-from gaphor.diagram.export import escape_filename, save_pdf, save_png, save_svg
+from gaphor.diagram.export import (
+    diagram_fingerprint,
+    escape_filename,
+    fingerprint_file,
+    is_up_to_date,
+    save_pdf,
+    save_png,
+    save_svg,
+    save_tile_pyramid,
+    save_tiled_png,
+    write_fingerprint,
+)
 from gaphor.storage import storage
 
 log = logging.getLogger(__name__)
@@ -42,7 +57,15 @@ def export_parser():
         metavar="format",
         help="output file format, default pdf",
         default="pdf",
-        choices=["pdf", "svg", "png"],
+        choices=["pdf", "svg", "png", "dzi"],
+    )
+    parser.add_argument(
+        "-t",
+        "--tile-size",
+        metavar="pixels",
+        type=int,
+        help="render png and dzi (Deep Zoom tile pyramid) output in tiles,"
+        " to limit memory use for large diagrams",
     )
     parser.add_argument(
         "-r",
@@ -52,14 +75,28 @@ def export_parser():
         help="process diagrams which name matches given regular expression;"
         " name includes package name; regular expressions are case insensitive",
     )
+    parser.add_argument(
+        "-i",
+        "--incremental",
+        action="store_true",
+        help="only render diagrams that changed since the last incremental export",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        metavar="N",
+        type=int,
+        default=1,
+        help="render diagrams in N worker processes, default 1",
+    )
     parser.add_argument("model", nargs="+")
     parser.set_defaults(command=export_command)
 
     return parser
 
 
-def export_command(args):
-    session = Session(
+def new_session():
+    return Session(
         services=[
             "event_manager",
             "component_registry",
@@ -68,49 +105,149 @@ def export_command(args):
             "modeling_language",
         ]
     )
+
+
+def load_model(session, model):
     factory = session.get_service("element_factory")
     modeling_language = session.get_service("modeling_language")
+    log.debug("loading model %s", model)
+    with open(model, encoding="utf-8") as file_obj:
+        storage.load(file_obj, factory, modeling_language)
+    log.debug("ready for rendering")
+    return factory
+
 
+def export_files(factory, args):
+    """Diagram ids and the files they are exported to, in model order.
+
+    If diagrams are exported to the same file, the last diagram is
+    exported, as if all diagrams were exported one after the other.
+    """
     name_re = re.compile(args.regex, re.IGNORECASE) if args.regex else None
+    outfiles: dict[str, str] = {}
+    for diagram in factory.select(Diagram):
+        odir = pkg2dir(diagram.owner)
+
+        # just diagram name
+        dname = escape_filename(diagram.name)
+        # full diagram name including package path
+        pname = f"{odir}/{dname}"
+
+        if args.underscores:
+            odir = odir.replace(" ", "_")
+            dname = dname.replace(" ", "_")
+
+        if name_re and not name_re.search(pname):
+            log.debug("skipping %s", pname)
+            continue
+
+        if args.dir:
+            odir = f"{args.dir}/{odir}"
+
+        outfilename = f"{odir}/{dname}.{args.format}"
+
+        if not Path(odir).exists():
+            log.debug("creating dir %s", odir)
+            Path(odir).mkdir(parents=True)
+
+        outfiles.pop(outfilename, None)
+        outfiles[outfilename] = diagram.id
+
+    return [(id, outfilename) for outfilename, id in outfiles.items()]
+
+
+def render_diagram(diagram, outfilename, format, tile_size=None):
+    log.debug("rendering: %s -> %s...", diagram.name, outfilename)
+
+    if format == "pdf":
+        save_pdf(outfilename, diagram)
+    elif format == "svg":
+        save_svg(outfilename, diagram)
+    elif format == "png" and tile_size:
+        save_tiled_png(outfilename, diagram, tile_size)
+    elif format == "png":
+        save_png(outfilename, diagram)
+    elif format == "dzi":
+        save_tile_pyramid(outfilename, diagram, tile_size or 256)
+    else:
+        raise RuntimeError(f"Unknown file format: {format}")
+
+
+def render_diagrams(factory, files, format, tile_size=None):
+    """Render diagrams, return the render time of each file."""
+    timings = []
+    for id, outfilename in files:
+        start = time.perf_counter()
+        render_diagram(factory.lookup(id), outfilename, format, tile_size)
+        timings.append((outfilename, time.perf_counter() - start))
+    return timings
+
+
+def render_shard(model, files, format, tile_size=None):
+    """Load a model and render some of its diagrams.
+
+    This function runs in a worker process.
+    """
+    session = new_session()
+    try:
+        factory = load_model(session, model)
+        return render_diagrams(factory, files, format, tile_size)
+    finally:
+        session.shutdown()
+
+
+def render_in_parallel(model, files, format, jobs, tile_size=None):
+    """Render diagrams in worker processes.
+
+    Each worker loads the model once and renders every ``jobs``-th
+    diagram.
+    """
+    shards = [files[n::jobs] for n in range(jobs)]
+    with ProcessPoolExecutor(
+        max_workers=jobs, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        results = [
+            executor.submit(render_shard, model, shard, format, tile_size)
+            for shard in shards
+            if shard
+        ]
+        timings = dict(chain.from_iterable(r.result() for r in results))
+    return [(outfilename, timings[outfilename]) for _, outfilename in files]
+
+
+def export_command(args):
+    session = new_session()
+    jobs = max(1, args.jobs)
+
     # we should have some gaphor files to be processed at this point
     for model in args.model:
-        log.debug("loading model %s", model)
-        with open(model, encoding="utf-8") as file_obj:
-            storage.load(file_obj, factory, modeling_language)
-        log.debug("ready for rendering")
-
-        for diagram in factory.select(Diagram):
-            odir = pkg2dir(diagram.owner)
-
-            # just diagram name
-            dname = escape_filename(diagram.name)
-            # full diagram name including package path
-            pname = f"{odir}/{dname}"
-
-            if args.underscores:
-                odir = odir.replace(" ", "_")
-                dname = dname.replace(" ", "_")
-
-            if name_re and not name_re.search(pname):
-                log.debug("skipping %s", pname)
-                continue
-
-            if args.dir:
-                odir = f"{args.dir}/{odir}"
-
-            outfilename = f"{odir}/{dname}.{args.format}"
-
-            if not Path(odir).exists():
-                log.debug("creating dir %s", odir)
-                Path(odir).mkdir(parents=True)
-
-            log.debug("rendering: %s -> %s...", pname, outfilename)
-
-            if args.format == "pdf":
-                save_pdf(outfilename, diagram)
-            elif args.format == "svg":
-                save_svg(outfilename, diagram)
-            elif args.format == "png":
-                save_png(outfilename, diagram)
-            else:
-                raise RuntimeError(f"Unknown file format: {args.format}")
+        factory = load_model(session, model)
+        files = export_files(factory, args)
+
+        if args.incremental:
+            fingerprints = {
+                outfilename: diagram_fingerprint(factory.lookup(id))
+                for id, outfilename in files
+            }
+            files = [
+                (id, outfilename)
+                for id, outfilename in files
+                if not is_up_to_date(outfilename, fingerprints[outfilename])
+            ]
+            log.info("%d diagrams changed", len(files))
+        else:
+            # Output without a fingerprint is rendered by the next incremental export
+            for _, outfilename in files:
+                fingerprint_file(outfilename).unlink(missing_ok=True)
+
+        if jobs > 1 and len(files) > 1:
+            timings = render_in_parallel(
+                model, files, args.format, jobs, args.tile_size
+            )
+        else:
+            timings = render_diagrams(factory, files, args.format, args.tile_size)
+
+        for outfilename, duration in timings:
+            log.info("rendered %s in %.3fs", outfilename, duration)
+            if args.incremental:
+                write_fingerprint(outfilename, fingerprints[outfilename])
@@ -5,7 +5,12 @@ from gaphor.core import event_handler
 from gaphor.core.modeling import Element
 from gaphor.core.modeling.event import AssociationUpdated
 from gaphor.core.modeling.properties import association, attribute, derivedunion
-from gaphor.services.undomanager import NotInTransactionException
+from gaphor.services.undomanager import (
+    NotInTransactionException,
+    UndoManager,
+    describe,
+    unlink_element,
+)
 from gaphor.tests.raises import raises_exception_group
 from gaphor.transaction import Transaction
 
@@ -458,3 +463,40 @@ def test_redo_stack(event_manager, element_factory, undo_manager):
     assert element_factory.size() == 2
 
     assert element_factory.lookup(p.id)
+
+
+def test_model_changes_are_recorded_as_entries(element_factory, undo_manager):
+    undo_manager.begin_transaction()
+    p = element_factory.create(Element)
+
+    (entry,) = undo_manager._current_transaction._actions
+
+    assert entry == (unlink_element, p.id, None, None)
+    assert describe(entry) == f"Undo create element {p.id}."
+
+
+def test_undo_stack_is_bounded_by_memory_budget(event_manager, element_factory):
+    undo_manager = UndoManager(event_manager, element_factory, memory_budget=0)
+
+    for _ in range(3):
+        with Transaction(event_manager):
+            element_factory.create(Element)
+
+    assert len(undo_manager._undo_stack) == 1
+    assert undo_manager.memory_usage() == undo_manager._undo_stack[0].size
+
+    undo_manager.undo_transaction()
+
+    assert element_factory.size() == 2
+    assert not undo_manager.can_undo()
+    assert len(undo_manager._redo_stack) == 1
+    undo_manager.shutdown()
+
+
+def test_undo_stack_within_memory_budget(event_manager, element_factory, undo_manager):
+    for _ in range(30):
+        with Transaction(event_manager):
+            element_factory.create(Element)
+
+    assert len(undo_manager._undo_stack) == 30
+    assert 0 < undo_manager.memory_usage() < undo_manager.memory_budget
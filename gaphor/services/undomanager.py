@@ -2,16 +2,21 @@
 
 Undoing and redoing actions is managed through the UndoManager.
 
-An undo action should be a callable object (called with no arguments).
+Model changes are recorded in the undo log as compact entries of the
+form ``(operation, element id, property, value)``. An operation is a
+plain function, called with the element factory and the rest of the entry.
+The docstring of an operation is a template to describe its entries.
 
-An undo action should return a callable object that acts as redo function.
-If None is returned the undo action is considered to be the redo action as well.
+Other undo actions can be added as callable objects (called with no
+arguments).
 
-NOTE: it would be nice to use actions in conjunction with functools.partial.
+The undo and redo stacks are bounded by a memory budget: the oldest
+transactions are dropped when the undo log grows too large.
 """
 
 import logging
-from typing import Callable, List
+import sys
+from typing import Callable, List, Tuple
 
 from gaphor.abc import ActionProvider, Service
 from gaphor.action import action
@@ -42,6 +47,13 @@ from gaphor.transaction import Transaction, transactional
 
 logger = logging.getLogger(__name__)
 
+# Maximum memory used by the undo and redo stacks, in bytes
+UNDO_MEMORY_BUDGET = 32 * 1024 * 1024
+
+Entry = Tuple[
+    Callable[[RepositoryProtocol, str, object, object], None], str, object, object
+]
+
 
 class ActionStack:
     """A transaction.
@@ -53,22 +65,131 @@ class ActionStack:
     will typically undo actions performed by the user.
     """
 
-    def __init__(self):
-        self._actions: List[Callable[[], None]] = []
+    def __init__(self, element_factory: RepositoryProtocol):
+        self.element_factory = element_factory
+        self._actions: List[Entry] = []
+        self.size = sys.getsizeof(self._actions)
+
+    def add(self, action: Callable[[], None]) -> None:
+        self.record(call_action, "", None, action)
 
-    def add(self, action):
-        self._actions.append(action)
+    def record(self, op, element_id, prop, value) -> None:
+        entry = (op, element_id, prop, value)
+        self._actions.append(entry)
+        self.size += entry_size(entry)
 
     def can_execute(self):
         return bool(self._actions)
 
     @transactional
     def execute(self):
-        self._actions.reverse()
+        debug = logger.isEnabledFor(logging.DEBUG)
+        for entry in reversed(self._actions):
+            if debug:
+                logger.debug(describe(entry))
+            op, element_id, prop, value = entry
+            op(self.element_factory, element_id, prop, value)
+
+
+def entry_size(entry: Entry) -> int:
+    """Estimate the memory used by an undo log entry.
+
+    Operations and properties are shared between entries and are not
+    counted.
+    """
+    _op, element_id, _prop, value = entry
+    # The entry, and its reference in the log
+    return sys.getsizeof(entry) + 8 + sys.getsizeof(element_id) + value_size(value)
+
+
+def value_size(value) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(value_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+def describe(entry: Entry) -> str:
+    """A description of an undo log entry, for logging."""
+    op, element_id, prop, value = entry
+    return (op.__doc__ or op.__name__).format(
+        element_id=element_id, prop=prop, value=value
+    )
+
+
+def lookup(element_factory: RepositoryProtocol, id: str) -> Element:
+    if element := element_factory.lookup(id):
+        return element
+    else:
+        raise ValueError(f"Element with id {id} not found in model")
+
+
+def call_action(_element_factory, _element_id, _prop, action):
+    """{value.__doc__}"""
+    action()
+
+
+def revert_event(element_factory, element_id, _prop, event):
+    """Reverse event {value.__class__.__name__} for element {element_id}."""
+    event.revert(lookup(element_factory, element_id))
 
-        for act in self._actions:
-            logger.debug(act.__doc__)
-            act()
+
+def unlink_element(element_factory, element_id, _prop, _value):
+    """Undo create element {element_id}."""
+    lookup(element_factory, element_id).unlink()
+
+
+def recreate_element(element_factory, element_id, element_type, _value):
+    """Recreate element {prop} ({element_id})."""
+    element_factory.create_as(element_type, element_id)
+
+
+def recreate_presentation(element_factory, element_id, element_type, value):
+    """Recreate element {prop} ({element_id}) on diagram {value[0]}."""
+    diagram_id, data = value
+    # If diagram is not there, for some reason, recreate it.
+    # It's probably removed in the same transaction.
+    try:
+        diagram: Diagram = lookup(element_factory, diagram_id)  # type: ignore[assignment]
+    except ValueError:
+        diagram = element_factory.create_as(Diagram, diagram_id)
+
+    element = diagram.create_as(element_type, element_id)
+    for name, ser in data:
+        for v in deserialize(ser, lambda ref: None):
+            element.load(name, v)
+
+
+def revert_attribute(element_factory, element_id, attribute, value):
+    """Revert {element_id}.{prop.name} to {value}."""
+    attribute.set(lookup(element_factory, element_id), value)
+
+
+def revert_association_set(element_factory, element_id, association, value_id):
+    """Revert {element_id}.{prop.name} to {value}."""
+    element = lookup(element_factory, element_id)
+    value = value_id and lookup(element_factory, value_id)
+    association.set(element, value, from_opposite=True)
+
+
+def revert_association_add(element_factory, element_id, association, value_id):
+    """{element_id}.{prop.name} delete {value}."""
+    element = lookup(element_factory, element_id)
+    value = lookup(element_factory, value_id)
+    association.delete(element, value, from_opposite=True)
+
+
+def revert_association_delete(element_factory, element_id, association, value):
+    """{element_id}.{prop.name} add {value[0]}."""
+    value_id, index = value
+    element = lookup(element_factory, element_id)
+    association.set(
+        element,
+        lookup(element_factory, value_id),
+        index=index,
+        from_opposite=True,
+    )
 
 
 class UndoManagerStateChanged(ServiceEvent):
@@ -88,14 +209,20 @@ class UndoManager(Service, ActionProvider):
     (e.i action()) If something is returned by an action, that is
     considered the callable to be used to undo or redo the last
     performed action.
+
+    The oldest transactions are dropped if the stacks use more than
+    ``memory_budget`` bytes. The latest transaction on each stack is
+    always kept.
     """
 
-    def __init__(self, event_manager, element_factory):
+    def __init__(
+        self, event_manager, element_factory, memory_budget=UNDO_MEMORY_BUDGET
+    ):
         self.event_manager = event_manager
         self.element_factory: RepositoryProtocol = element_factory
         self._undo_stack: List[ActionStack] = []
         self._redo_stack: List[ActionStack] = []
-        self._stack_depth = 20
+        self.memory_budget = memory_budget
         self._current_transaction = None
         self._undoing = 0
         self._rolling_back = 0
@@ -131,12 +258,20 @@ class UndoManager(Service, ActionProvider):
     def begin_transaction(self, event=None):
         """Add an action to the current transaction."""
         assert not self._current_transaction
-        self._current_transaction = ActionStack()
+        self._current_transaction = ActionStack(self.element_factory)
 
     def add_undo_action(self, action, requires_transaction=True):
         """Add an action to undo."""
+        self.record(call_action, "", None, action, requires_transaction)
+
+    def record(self, op, element_id, prop, value, requires_transaction=True):
+        """Add an entry to the undo log.
+
+        ``op(element_factory, element_id, prop, value)`` is called to
+        undo the change.
+        """
         if self._current_transaction:
-            self._current_transaction.add(action)
+            self._current_transaction.record(op, element_id, prop, value)
             self._action_executed()
         elif requires_transaction:
             undo_stack = list(self._undo_stack)
@@ -144,14 +279,15 @@ class UndoManager(Service, ActionProvider):
 
             try:
                 with Transaction(self.event_manager):
-                    action()
+                    op(self.element_factory, element_id, prop, value)
             finally:
                 # Restore stacks and act like nothing happened
                 self._redo_stack = redo_stack
                 self._undo_stack = undo_stack
 
             raise NotInTransactionException(
-                f"Updating state outside of a transaction: {action.__doc__}."
+                "Updating state outside of a transaction: "
+                f"{describe((op, element_id, prop, value))}."
             )
 
     @event_handler(TransactionCommit)
@@ -161,8 +297,7 @@ class UndoManager(Service, ActionProvider):
         if self._current_transaction.can_execute():
             self.clear_redo_stack()
             self._undo_stack.append(self._current_transaction)
-            while len(self._undo_stack) > self._stack_depth:
-                del self._undo_stack[0]
+            self._trim_stacks()
 
         self._current_transaction = None
 
@@ -231,8 +366,7 @@ class UndoManager(Service, ActionProvider):
             self._undo_stack = undo_stack
             self._undoing -= 1
 
-        while len(self._redo_stack) > self._stack_depth:
-            del self._redo_stack[0]
+        self._trim_stacks()
 
         self._action_executed()
 
@@ -271,16 +405,27 @@ class UndoManager(Service, ActionProvider):
     def can_redo(self):
         return bool(self._redo_stack)
 
+    def memory_usage(self) -> int:
+        """Estimated memory used by the undo and redo stacks, in bytes."""
+        return sum(tx.size for tx in self._undo_stack) + sum(
+            tx.size for tx in self._redo_stack
+        )
+
+    def _trim_stacks(self):
+        """Drop the oldest undo, then redo, transactions until the stacks
+        fit in the memory budget."""
+        size = self.memory_usage()
+        for stack in (self._undo_stack, self._redo_stack):
+            while size > self.memory_budget and len(stack) > 1:
+                size -= stack.pop(0).size
+
     def _action_executed(self, event=None):
         self.event_manager.handle(ActionEnabled("win.edit-undo", self.can_undo()))
         self.event_manager.handle(ActionEnabled("win.edit-redo", self.can_redo()))
         self.event_manager.handle(UndoManagerStateChanged(self))
 
     def lookup(self, id: str) -> Element:
-        if element := self.element_factory.lookup(id):
-            return element
-        else:
-            raise ValueError(f"Element with id {id} not found in model")
+        return lookup(self.element_factory, id)
 
     #
     # Undo Handlers
@@ -306,144 +451,70 @@ class UndoManager(Service, ActionProvider):
 
     @event_handler(RevertibleEvent)
     def undo_reversible_event(self, event: RevertibleEvent):
-        element_id = event.element.id
-
-        def undo_reversible_event():
-            element = self.lookup(element_id)
-            event.revert(element)
-
-        undo_reversible_event.__doc__ = (
-            f"Reverse event {event.__class__.__name__} for element {event.element}."
-        )
-
-        self.add_undo_action(
-            undo_reversible_event, requires_transaction=event.requires_transaction
+        self.record(
+            revert_event,
+            event.element.id,
+            None,
+            event,
+            requires_transaction=event.requires_transaction,
         )
 
     @event_handler(ElementCreated)
     def undo_create_element_event(self, event: ElementCreated):
-        element_id = event.element.id
-
-        def undo_create_event():
-            element = self.lookup(element_id)
-            element.unlink()
-
-        undo_create_event.__doc__ = f"Undo create element {event.element}."
-        del event
-
-        self.add_undo_action(undo_create_event)
+        self.record(unlink_element, event.element.id, None, None)
 
     @event_handler(ElementDeleted)
     def undo_delete_element_event(self, event: ElementDeleted):
-        element_type = type(event.element)
-        element_id = event.element.id
-
-        if isinstance(event.element, Presentation):
-            diagram_id = event.diagram.id
-            data = {}
+        element = event.element
+        if isinstance(element, Presentation):
+            data = []
 
             def save_func(name, value):
-                data[name] = serialize(value)
-
-            event.element.save(save_func)
-
-            def undo_delete_event():
-                # If diagram is not there, for some reason, recreate it.
-                # It's probably removed in the same transaction.
-                try:
-                    diagram: Diagram = self.lookup(diagram_id)  # type: ignore[assignment]
-                except ValueError:
-                    diagram = self.element_factory.create_as(Diagram, diagram_id)
-
-                element = diagram.create_as(element_type, element_id)
-                for name, ser in data.items():
-                    for value in deserialize(ser, lambda ref: None):
-                        element.load(name, value)
-
+                data.append((name, serialize(value)))
+
+            element.save(save_func)
+            self.record(
+                recreate_presentation,
+                element.id,
+                type(element),
+                (event.diagram.id, tuple(data)),
+            )
         else:
-
-            def undo_delete_event():
-                self.element_factory.create_as(element_type, element_id)
-
-        undo_delete_event.__doc__ = f"Recreate element {element_type} ({element_id})."
-        del event
-
-        self.add_undo_action(undo_delete_event)
+            self.record(recreate_element, element.id, type(element), None)
 
     @event_handler(AttributeUpdated)
     def undo_attribute_change_event(self, event: AttributeUpdated):
-        attribute = event.property
-        element_id = event.element.id
-        value = event.old_value
-
-        def undo_attribute_change_event():
-            element = self.lookup(element_id)
-            attribute.set(element, value)
-
-        undo_attribute_change_event.__doc__ = (
-            f"Revert {event.element}.{attribute.name} to {value}."
-        )
-        del event
-
-        self.add_undo_action(undo_attribute_change_event)
+        self.record(revert_attribute, event.element.id, event.property, event.old_value)
 
     @event_handler(AssociationSet)
     def undo_association_set_event(self, event: AssociationSet):
-        association = event.property
-        if type(association) is not association_property:
+        if type(event.property) is not association_property:
             return
-        element_id = event.element.id
-        value_id = event.old_value and event.old_value.id
-
-        def undo_association_set_event():
-            element = self.lookup(element_id)
-            value = value_id and self.lookup(value_id)
-            association.set(element, value, from_opposite=True)
-
-        undo_association_set_event.__doc__ = (
-            f"Revert {event.element}.{association.name} to {event.old_value}."
+        self.record(
+            revert_association_set,
+            event.element.id,
+            event.property,
+            event.old_value and event.old_value.id,
         )
-        del event
-
-        self.add_undo_action(undo_association_set_event)
 
     @event_handler(AssociationAdded)
     def undo_association_add_event(self, event: AssociationAdded):
-        association = event.property
-        if type(association) is not association_property:
+        if type(event.property) is not association_property:
             return
-        element_id = event.element.id
-        value_id = event.new_value.id
-
-        def undo_association_add_event():
-            element = self.lookup(element_id)
-            value = self.lookup(value_id)
-            association.delete(element, value, from_opposite=True)
-
-        undo_association_add_event.__doc__ = (
-            f"{event.element}.{association.name} delete {event.new_value}."
+        self.record(
+            revert_association_add,
+            event.element.id,
+            event.property,
+            event.new_value.id,
         )
-        del event
-
-        self.add_undo_action(undo_association_add_event)
 
     @event_handler(AssociationDeleted)
     def undo_association_delete_event(self, event: AssociationDeleted):
-        association = event.property
-        if type(association) is not association_property:
+        if type(event.property) is not association_property:
             return
-        element_id = event.element.id
-        value_id = event.old_value.id
-        index = event.index
-
-        def undo_association_delete_event():
-            element = self.lookup(element_id)
-            value = self.lookup(value_id)
-            association.set(element, value, index=index, from_opposite=True)
-
-        undo_association_delete_event.__doc__ = (
-            f"{event.element}.{association.name} add {event.old_value}."
+        self.record(
+            revert_association_delete,
+            event.element.id,
+            event.property,
+            (event.old_value.id, event.index),
         )
-        del event
-
-        self.add_undo_action(undo_association_delete_event)
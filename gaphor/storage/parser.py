@@ -17,21 +17,28 @@ referered to in the dictionary returned by parse().
 
 The generator parse_generator(filename, loader) may be used if the loading
 takes a long time. The yielded values are the percentage of the file read.
+
+Two parser backends are available: "sax" feeds the loader through the
+(defused) SAX interface, "expat" calls the loader directly from expat
+callbacks. Both forbid entity declarations and external references.
 """
 
 from __future__ import annotations
 
 import logging
 import os
+import re
 from collections import OrderedDict
+from xml.parsers import expat
 from xml.sax import SAXParseException, handler, xmlreader
 
+from defusedxml.common import EntitiesForbidden, ExternalReferenceForbidden
 from defusedxml.sax import make_parser
 
 from gaphor.core.modeling import Element
 from gaphor.storage.upgrade_canvasitem import upgrade_canvasitem
 
-__all__ = ["parse", "ParserException"]
+__all__ = ["parse", "ParserException", "PARSER_BACKENDS"]
 
 log = logging.getLogger(__name__)
 
@@ -101,6 +108,8 @@ class MergeConflictDetected(Exception):
 
 State = int
 
+PARSER_BACKENDS = ("sax", "expat")
+
 
 class GaphorLoader(handler.ContentHandler):
     """Create a list of elements.
@@ -148,16 +157,19 @@ class GaphorLoader(handler.ContentHandler):
         self.elements: dict[str, element] = OrderedDict()
         self._stack: list[tuple[element | canvas, State]] = []
         self.text = ""
-        self._start_element_handlers = (
-            self.start_element,
-            self.start_canvas,
-            self.start_canvas_item,
-            self.start_attribute,
-            self.start_reference,
-            self.start_attribute_value,
-            self.start_root,
-            self.invalid_tag,
-        )
+        # Only the handlers that apply to a state are tried, in this order
+        self._start_element_handlers = {
+            ROOT: (self.start_root, self.invalid_tag),
+            GAPHOR: (self.start_element, self.invalid_tag),
+            ELEMENT: (self.start_attribute, self.invalid_tag),
+            DIAGRAM: (self.start_canvas, self.start_attribute, self.invalid_tag),
+            CANVAS: (self.start_canvas_item, self.start_attribute, self.invalid_tag),
+            ITEM: (self.start_canvas_item, self.start_attribute, self.invalid_tag),
+            ATTR: (self.start_reference, self.start_attribute_value, self.invalid_tag),
+            VAL: (self.invalid_tag,),
+            REFLIST: (self.start_reference, self.invalid_tag),
+            REF: (self.invalid_tag,),
+        }
 
     def endDocument(self):
         if len(self._stack) != 0:
@@ -168,7 +180,7 @@ class GaphorLoader(handler.ContentHandler):
 
         state = self.state()
 
-        for h in self._start_element_handlers:
+        for h in self._start_element_handlers[state]:
             if h(state, name, attrs):
                 break
 
@@ -295,11 +307,11 @@ class GaphorLoader(handler.ContentHandler):
         self.text = self.text + content
 
 
-def parse(filename) -> dict[str, element]:
+def parse(filename, backend="sax") -> dict[str, element]:
     """Parse a file and return a dictionary ID:element."""
     loader = GaphorLoader()
 
-    for _ in parse_generator(filename, loader):
+    for _ in parse_generator(filename, loader, backend):
         pass
     return loader.elements
 
@@ -315,15 +327,23 @@ class ErrorHandler(handler.ErrorHandler):
         log.warning(exception)
 
 
-def parse_generator(file_obj, loader):
+def parse_generator(file_obj, loader, backend="sax"):
     """The generator based version of parse().
 
     parses the file and load it with ContentHandler loader. Returns a
     progress percentage.
+
+    The backend is either "sax" or "expat".
     """
     assert file_obj.seekable()
     assert isinstance(loader, GaphorLoader), "loader should be a GaphorLoader"
 
+    if backend == "expat":
+        yield from expat_parse_generator(file_obj, loader)
+        return
+    if backend != "sax":
+        raise ValueError(f"Unknown parser backend {backend!r}")
+
     parser = new_parser(loader)
     file_size = get_file_size(file_obj)
     count = 0
@@ -354,3 +374,91 @@ def get_file_size(file_obj):
     file_size = file_obj.seek(0, os.SEEK_END)
     file_obj.seek(orig_pos)
     return file_size
+
+
+EXPAT_CHUNK_SIZE = 2**16
+
+MERGE_CONFLICT_MARKER = re.compile(r"^<<<<<", re.MULTILINE)
+
+
+def expat_parse_generator(file_obj, loader):
+    """Parse the file with expat, calling the loader directly.
+
+    This avoids the SAX layer: no attribute objects and namespace tuples
+    are created for every tag, and the file is read in large chunks.
+    Entity declarations and external references are forbidden, as in the
+    defused SAX parser.
+    """
+    parser = new_expat_parser(loader)
+    file_size = get_file_size(file_obj)
+    count = 0
+    previous = ""
+
+    loader.startDocument()
+    while chunk := file_obj.read(EXPAT_CHUNK_SIZE):
+        try:
+            parser.Parse(chunk, False)
+        except expat.ExpatError as e:
+            if MERGE_CONFLICT_MARKER.search(previous + chunk):
+                raise MergeConflictDetected from e
+            raise SAXParseException(
+                expat.ErrorString(e.code), e, ExpatLocator(parser)
+            ) from e
+        previous = chunk
+        count += len(chunk)
+        yield (count * 100) / file_size
+
+
+def new_expat_parser(loader):
+    parser = expat.ParserCreate(namespace_separator=" ")
+    parser.buffer_text = True
+
+    start_element = loader.startElement
+    end_element = loader.endElement
+
+    def start(name, attrs):
+        uri, _, name = name.rpartition(" ")
+        if not uri or uri == XMLNS:
+            if any(" " in key for key in attrs):
+                attrs = {key.rpartition(" ")[2]: val for key, val in attrs.items()}
+            start_element(name, attrs)
+
+    def end(name):
+        uri, _, name = name.rpartition(" ")
+        if not uri or uri == XMLNS:
+            end_element(name)
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = loader.characters
+    parser.EntityDeclHandler = forbid_entity_decl
+    parser.UnparsedEntityDeclHandler = forbid_unparsed_entity_decl
+    parser.ExternalEntityRefHandler = forbid_external_entity_ref
+    return parser
+
+
+def forbid_entity_decl(
+    name, is_parameter_entity, value, base, sysid, pubid, notation_name
+):
+    raise EntitiesForbidden(name, value, base, sysid, pubid, notation_name)
+
+
+def forbid_unparsed_entity_decl(name, base, sysid, pubid, notation_name):
+    raise EntitiesForbidden(name, None, base, sysid, pubid, notation_name)
+
+
+def forbid_external_entity_ref(context, base, sysid, pubid):
+    raise ExternalReferenceForbidden(context, base, sysid, pubid)
+
+
+class ExpatLocator(xmlreader.Locator):
+    """Error location, so expat errors can be raised as SAXParseException."""
+
+    def __init__(self, parser):
+        self._parser = parser
+
+    def getColumnNumber(self):
+        return self._parser.ErrorColumnNumber
+
+    def getLineNumber(self):
+        return self._parser.ErrorLineNumber
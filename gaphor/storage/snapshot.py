@@ -0,0 +1,242 @@
+"""Binary snapshots of loaded models.
+
+Loading a model from XML means parsing the file and, for older files,
+upgrading the parsed elements. A snapshot stores the loaded model in a
+compact form: a type table, a name table, an id table, and for each element
+its attribute values and references as indexes in the id table. Loading a
+snapshot skips both XML parsing and upgrades.
+
+A snapshot records a hash of the model file's content. If the file has changed
+since the snapshot was written, the snapshot is ignored and rewritten.
+
+Only the ``MAX_SNAPSHOTS`` most recently used snapshots are kept.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import marshal
+from pathlib import Path
+from typing import Iterable
+
+from gaphor import application
+from gaphor.core.modeling import Element, ElementFactory, Presentation
+from gaphor.core.modeling.collection import collection
+from gaphor.core.modeling.modelinglanguage import ModelingLanguage
+from gaphor.storage import storage
+
+SNAPSHOT_VERSION = 1
+MAX_SNAPSHOTS = 10
+
+log = logging.getLogger(__name__)
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=24).hexdigest()
+
+
+def load_generator(
+    filename: Path,
+    snapshot_filename: Path,
+    element_factory: ElementFactory,
+    modeling_language: ModelingLanguage,
+) -> Iterable[float]:
+    """Load a model file, using a snapshot if one is available.
+
+    If there's no valid snapshot for the file, or the snapshot can not be
+    loaded, the model is loaded from the file and a new snapshot is written.
+
+    This function is a generator. It will yield values from 0 to 100 (%)
+    to indicate its progression.
+    """
+    data = filename.read_bytes()
+    digest = content_hash(data)
+
+    if snapshot := read_snapshot(snapshot_filename, digest):
+        log.info(f"Loading model {filename} from snapshot {snapshot_filename}")
+        try:
+            yield from load_snapshot_generator(
+                snapshot, element_factory, modeling_language
+            )
+            return
+        except Exception:
+            log.warning(
+                f"Could not load model snapshot {snapshot_filename}", exc_info=True
+            )
+            snapshot_filename.unlink(missing_ok=True)
+            element_factory.flush()
+
+    with io.TextIOWrapper(
+        io.BytesIO(data), encoding="utf-8", errors="replace"
+    ) as file_obj:
+        yield from storage.load_generator(file_obj, element_factory, modeling_language)
+
+    write_snapshot(snapshot_filename, digest, element_factory)
+
+
+def header(digest: str) -> tuple:
+    return (
+        SNAPSHOT_VERSION,
+        marshal.version,
+        application.distribution().version,
+        digest,
+    )
+
+
+def read_snapshot(snapshot_filename: Path, digest: str) -> tuple | None:
+    """Read a snapshot, if it's valid for a model file with this content
+    hash."""
+    try:
+        with snapshot_filename.open("rb") as f:
+            if marshal.load(f) != header(digest):
+                return None
+            snapshot: tuple = marshal.load(f)
+        # Mark the snapshot as recently used
+        snapshot_filename.touch()
+        return snapshot
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, ValueError, TypeError):
+        log.warning(f"Invalid model snapshot {snapshot_filename}", exc_info=True)
+        return None
+
+
+def write_snapshot(
+    snapshot_filename: Path, digest: str, element_factory: ElementFactory
+) -> None:
+    snapshot = create_snapshot(element_factory)
+    tmp_filename = snapshot_filename.with_suffix(".tmp")
+    try:
+        with tmp_filename.open("wb") as f:
+            marshal.dump(header(digest), f)
+            marshal.dump(snapshot, f)
+        tmp_filename.replace(snapshot_filename)
+    except OSError:
+        log.warning(
+            f"Could not write model snapshot {snapshot_filename}", exc_info=True
+        )
+    prune_snapshots(snapshot_filename.parent)
+
+
+def prune_snapshots(snapshot_dir: Path, keep: int = MAX_SNAPSHOTS) -> None:
+    """Remove all but the ``keep`` most recently used snapshots."""
+
+    def mtime(path):
+        try:
+            return path.stat().st_mtime
+        except OSError:
+            return 0.0
+
+    snapshots = sorted(snapshot_dir.glob("*.snapshot"), key=mtime, reverse=True)
+    for path in snapshots[keep:]:
+        path.unlink(missing_ok=True)
+
+
+def create_snapshot(element_factory: ElementFactory) -> tuple:
+    """Create a snapshot of the model.
+
+    The snapshot contains the same data as a saved model, in the
+    same order.
+    """
+    ids = [e.id for e in element_factory.values()]
+    index = {id: n for n, id in enumerate(ids)}
+    types: dict[str, int] = {}
+    names: dict[str, int] = {}
+    elements = []
+
+    for e in element_factory.values():
+        values: list[tuple[int, str]] = []
+        references: list[tuple[int, int | list[int]]] = []
+
+        def save_func(name, value, values=values, references=references):
+            if isinstance(value, Element):
+                if (n := index.get(value.id)) is not None:
+                    references.append((names.setdefault(name, len(names)), n))
+            elif isinstance(value, collection):
+                if value:
+                    references.append(
+                        (
+                            names.setdefault(name, len(names)),
+                            [index[v.id] for v in value if v.id in index],
+                        )
+                    )
+            elif value is not None:
+                values.append(
+                    (
+                        names.setdefault(name, len(names)),
+                        str(int(value)) if isinstance(value, bool) else str(value),
+                    )
+                )
+
+        e.save(save_func)
+        diagram = (
+            index.get(e.diagram.id, -1)
+            if isinstance(e, Presentation) and e.diagram
+            else -1
+        )
+        elements.append(
+            (
+                types.setdefault(type(e).__name__, len(types)),
+                diagram,
+                tuple(values),
+                tuple(references),
+            )
+        )
+
+    return (list(types), list(names), ids, elements)
+
+
+def load_snapshot_generator(
+    snapshot: tuple,
+    element_factory: ElementFactory,
+    modeling_language: ModelingLanguage,
+) -> Iterable[float]:
+    types, names, ids, elements = snapshot
+    size = len(elements) * 3
+    created: list[Element | None] = [None] * len(elements)
+
+    def create(n):
+        if created[n] is not None:
+            return
+        type_index, diagram, _, _ = elements[n]
+        if not (cls := modeling_language.lookup_element(types[type_index])):
+            raise storage.UnknownModelElementError(
+                f"Type {types[type_index]} cannot be loaded: no such element"
+            )
+        if diagram >= 0:
+            create(diagram)
+            created[n] = element_factory.create_as(cls, ids[n], created[diagram])
+        else:
+            created[n] = element_factory.create_as(cls, ids[n])
+
+    element_factory.flush()
+    with element_factory.block_events():
+        for n in range(len(elements)):
+            create(n)
+            if n % 30 == 0:
+                yield (n * 100) / size
+
+        for n, (_, _, values, references) in enumerate(elements):
+            e = created[n]
+            assert e
+            for name, value in values:
+                e.load(names[name], value)
+            for name, refs in references:
+                if isinstance(refs, list):
+                    for ref in refs:
+                        e.load(names[name], created[ref])
+                else:
+                    e.load(names[name], created[refs])
+            if n % 30 == 0:
+                yield ((len(elements) + n) * 100) / size
+
+        for n, e in enumerate(created):
+            assert e
+            e.postload()
+            if n % 30 == 0:
+                yield ((len(elements) * 2 + n) * 100) / size
+
+    yield 100
+    element_factory.model_ready()
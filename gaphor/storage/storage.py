@@ -8,16 +8,27 @@ __all__ = ["load", "save"]
 
 import io
 import logging
-from functools import partial
-from typing import Callable, Iterable
+from collections import deque
+from typing import Callable, Iterable, NamedTuple
+from xml.sax.saxutils import escape, quoteattr
 
 from gaphor import application
 from gaphor.core.modeling import Diagram, Element, ElementFactory, Presentation
 from gaphor.core.modeling.collection import collection
+from gaphor.core.modeling.element import Id
 from gaphor.core.modeling.modelinglanguage import ModelingLanguage
 from gaphor.core.modeling.stylesheet import StyleSheet
-from gaphor.storage.parser import GaphorLoader, element, parse_generator
-from gaphor.storage.xmlwriter import XMLWriter
+from gaphor.storage.parser import (
+    ATTR,
+    ELEMENT,
+    GAPHOR,
+    REF,
+    REFLIST,
+    VAL,
+    GaphorLoader,
+    element,
+    parse_generator,
+)
 
 FILE_FORMAT_VERSION = "3.0"
 NAMESPACE_MODEL = "http://gaphor.sourceforge.net/model"
@@ -32,96 +43,85 @@ def save(out=None, element_factory=None, status_queue=None):
 
 
 def save_generator(out, element_factory):
-    """Save the current model using @writer, which is a
-    gaphor.storage.xmlwriter.XMLWriter instance."""
-
-    writer = XMLWriter(out)
-    writer.startDocument()
-    writer.startPrefixMapping("", NAMESPACE_MODEL)
-    writer.startElementNS(
-        (NAMESPACE_MODEL, "gaphor"),
-        None,
-        {
-            (NAMESPACE_MODEL, "version"): FILE_FORMAT_VERSION,
-            (NAMESPACE_MODEL, "gaphor-version"): application.distribution().version,
-        },
-    )
+    """Save the current model to ``out``, in Gaphor's XML format.
+
+    The XML is collected in a list of chunks, which is written out
+    every 25 elements.
+    """
+    # Quoted ids of all elements that can be referenced
+    refids = {e: quoteattr(str(e.id)) for e in element_factory.values()}
+    version = application.distribution().version
+    chunks = [
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        f'<gaphor xmlns="{NAMESPACE_MODEL}" version={quoteattr(FILE_FORMAT_VERSION)}'
+        f" gaphor-version={quoteattr(version)}"
+    ]
+    if not refids:
+        chunks.append("/>")
+    else:
+        chunks.append(">")
 
     size = element_factory.size()
-    save_func = partial(save_element, element_factory=element_factory, writer=writer)
     for n, e in enumerate(element_factory.values(), start=1):
-        clazz = e.__class__.__name__
         assert e.id
-        writer.startElement(clazz, {"id": str(e.id)})
-        e.save(save_func)
-        writer.endElement(clazz)
+        save_element(e, refids, chunks)
 
         if n % 25 == 0:
+            out.write("".join(chunks))
+            chunks.clear()
             yield (n * 100) / size
 
-    writer.endElementNS((NAMESPACE_MODEL, "gaphor"), None)
-    writer.endPrefixMapping("")
-    writer.endDocument()
+    if refids:
+        chunks.append("\n</gaphor>")
+    out.write("".join(chunks))
 
 
-def save_element(name, value, element_factory, writer):
-    """Save attributes and references from items in the gaphor.UML module.
+def save_element(element, refids, chunks):
+    """Save attributes and references of an element.
 
     A value may be a primitive (string, int), a
     gaphor.core.modeling.collection (which contains a list of references
     to other UML elements) or a Diagram (which contains diagram items).
     """
+    body: list[str] = []
 
-    def resolvable(value):
-        if value.id and value in element_factory:
-            return True
+    def resolve(value):
+        if refid := refids.get(value):
+            return refid
         log.warning(
             f"Model has unknown reference {value.id}. Reference will be skipped."
         )
-        return False
-
-    def save_reference(name, value):
-        """Save a value as a reference to another element in the model.
-
-        This applies to both UML and canvas items.
-        """
-        if resolvable(value):
-            writer.startElement(name, {})
-            writer.startElement("ref", {"refid": value.id})
-            writer.endElement("ref")
-            writer.endElement(name)
-
-    def save_collection(name, value):
-        """Save a list of references."""
-        if value:
-            writer.startElement(name, {})
-            writer.startElement("reflist", {})
-            for v in value:
-                if resolvable(v):
-                    writer.startElement("ref", {"refid": v.id})
-                    writer.endElement("ref")
-            writer.endElement("reflist")
-            writer.endElement(name)
-
-    def save_value(name, value):
-        """Save a value (attribute)."""
-        if value is not None:
-            writer.startElement(name, {})
-            writer.startElement("val", {})
-            if isinstance(value, bool):
-                # Write booleans as 0/1.
-                writer.characters(str(int(value)))
-            else:
-                writer.characters(str(value))
-            writer.endElement("val")
-            writer.endElement(name)
-
-    if isinstance(value, Element):
-        save_reference(name, value)
-    elif isinstance(value, collection):
-        save_collection(name, value)
+        return None
+
+    def save_func(name, value):
+        if isinstance(value, Element):
+            if refid := resolve(value):
+                body.append(f"\n<{name}>\n<ref refid={refid}/>\n</{name}>")
+        elif isinstance(value, collection):
+            if value:
+                refs = [
+                    f"\n<ref refid={refid}/>" for v in value if (refid := resolve(v))
+                ]
+                if refs:
+                    body.append(f"\n<{name}>\n<reflist>")
+                    body.extend(refs)
+                    body.append(f"\n</reflist>\n</{name}>")
+                else:
+                    body.append(f"\n<{name}>\n<reflist/>\n</{name}>")
+        elif value is not None:
+            # Write booleans as 0/1.
+            text = str(int(value)) if isinstance(value, bool) else str(value)
+            body.append(f"\n<{name}>\n<val>{escape(text)}</val>\n</{name}>")
+
+    element.save(save_func)
+
+    clazz = element.__class__.__name__
+    if body:
+        chunks.append(f"\n<{clazz} id={refids[element]}>")
+        chunks.extend(body)
+        chunks.append(f"\n</{clazz}>")
     else:
-        save_value(name, value)
+        chunks.append(f"\n<{clazz} id={refids[element]}/>")
 
 
 def load_elements(elements, element_factory, modeling_language, gaphor_version="1.0.0"):
@@ -179,27 +179,13 @@ def _load_elements_and_canvasitems(
     gaphor_version: str,
     update_status_queue: Callable[[], Iterable[float]],
 ):
+    upgrade = UpgradePlan(gaphor_version)
+
     def create_element(elem):
         if elem.element:
             return
-        if version_lower_than(gaphor_version, (2, 1, 0)):
-            elem = upgrade_element_owned_comment_to_comment(elem)
-        if version_lower_than(gaphor_version, (2, 3, 0)):
-            elem = upgrade_package_owned_classifier_to_owned_type(elem)
-            elem = upgrade_implementation_to_interface_realization(elem)
-            elem = upgrade_feature_parameters_to_owned_parameter(elem)
-            elem = upgrade_parameter_owner_formal_param(elem)
-        if version_lower_than(gaphor_version, (2, 5, 0)):
-            elem = upgrade_diagram_element(elem)
-        if version_lower_than(gaphor_version, (2, 6, 0)):
-            elem = upgrade_generalization_arrow_direction(elem)
-        if version_lower_than(gaphor_version, (2, 9, 0)):
-            elem = upgrade_flow_item_to_control_flow_item(elem, elements)
-        if version_lower_than(gaphor_version, (2, 19, 0)):
-            elem = upgrade_delete_property_information_flow(elem)
-            elem = upgrade_decision_node_item_show_type(elem)
-        if version_lower_than(gaphor_version, (2, 20, 0)):
-            elem = upgrade_note_on_model_element_only(elem, elements)
+        if upgrade:
+            elem = upgrade(elem, elements)
         if not (cls := modeling_language.lookup_element(elem.type)):
             raise UnknownModelElementError(
                 f"Type {elem.type} cannot be loaded: no such element"
@@ -261,14 +247,25 @@ def _load_attributes_and_references(elements, update_status_queue):
 
 
 def load(
-    file_obj: io.TextIOBase, element_factory, modeling_language, status_queue=None
+    file_obj: io.TextIOBase,
+    element_factory,
+    modeling_language,
+    status_queue=None,
+    streaming=False,
+    parser_backend="sax",
 ):
     """Load a file and create a model if possible.
 
     Optionally, a status queue function can be given, to which the
     progress is written (as status_queue(progress)).
+
+    With ``streaming``, elements are created while the file is parsed
+    (see :class:`StreamingLoader`). The ``parser_backend`` is one of
+    ``gaphor.storage.parser.PARSER_BACKENDS``.
     """
-    for status in load_generator(file_obj, element_factory, modeling_language):
+    for status in load_generator(
+        file_obj, element_factory, modeling_language, streaming, parser_backend
+    ):
         if status_queue:
             status_queue(status)
 
@@ -277,6 +274,8 @@ def load_generator(
     file_obj: io.TextIOBase,
     element_factory: ElementFactory,
     modeling_language: ModelingLanguage,
+    streaming: bool = False,
+    parser_backend: str = "sax",
 ) -> Iterable[int]:
     """Load a file and create a model if possible.
 
@@ -285,9 +284,18 @@ def load_generator(
     """
     assert isinstance(file_obj, io.TextIOBase)
 
+    if streaming:
+        try:
+            yield from load_streaming_generator(
+                file_obj, element_factory, modeling_language, parser_backend
+            )
+            return
+        except UpgradeRequired:
+            file_obj.seek(0)
+
     # Use the incremental parser and yield the percentage of the file.
     loader = GaphorLoader()
-    for percentage in parse_generator(file_obj, loader):
+    for percentage in parse_generator(file_obj, loader, parser_backend):
         if percentage:
             yield percentage / 2
         else:
@@ -317,6 +325,254 @@ def load_generator(
     element_factory.model_ready()
 
 
+def load_streaming_generator(
+    file_obj: io.TextIOBase,
+    element_factory: ElementFactory,
+    modeling_language: ModelingLanguage,
+    parser_backend: str = "sax",
+) -> Iterable[int]:
+    """Load a file, creating elements while the file is parsed.
+
+    Raises :class:`UpgradeRequired` if the model should be upgraded
+    first. If loading fails, the element factory is left empty.
+    """
+    loader = StreamingLoader(element_factory, modeling_language)
+
+    element_factory.flush()
+    with element_factory.block_events():
+        try:
+            yield from parse_generator(file_obj, loader, parser_backend)
+            loader.finish()
+        except Exception:
+            # Do not leave a partially loaded model behind
+            element_factory.flush()
+            raise
+
+        upgrade_ensure_style_sheet_is_present(element_factory)
+
+        for e in loader.loaded:
+            e.postload()
+
+    yield 100
+    element_factory.model_ready()
+
+
+class _PendingReferences:
+    """References for a property of an element, that can not be loaded yet.
+
+    The references are loaded in order, once the referenced elements are
+    created.
+    """
+
+    __slots__ = ("element", "name", "refids", "order", "start")
+
+    def __init__(self, element: Element, name: str, refid: Id):
+        self.element = element
+        self.name = name
+        self.refids = deque((refid,))
+        # For collections: the ids in file order, and the amount of items
+        # already in the collection when the first reference got queued
+        self.order: list[Id] | None = None
+        self.start = 0
+
+
+class _PendingPresentation:
+    """A presentation element, waiting for its diagram to be created.
+
+    Properties read in the mean time are loaded once the element is
+    created.
+    """
+
+    __slots__ = ("id", "type", "diagram_id", "element", "properties")
+
+    def __init__(self, id: Id, type: type[Presentation]):
+        self.id = id
+        self.type = type
+        self.diagram_id: Id | None = None
+        self.element: Presentation | None = None
+        self.properties: list[tuple[str, str, bool]] = []
+
+
+class StreamingLoader(GaphorLoader):
+    """Create model elements while the file is being parsed.
+
+    Elements are created as soon as their tag is read, and attribute values
+    and references are loaded right away. Only references to elements that
+    have not been read yet are kept, until the referenced element is created.
+
+    Models that require upgrading can not be loaded this way.
+    """
+
+    def __init__(
+        self, element_factory: ElementFactory, modeling_language: ModelingLanguage
+    ):
+        self.element_factory = element_factory
+        self.modeling_language = modeling_language
+        super().__init__()
+
+    def startDocument(self):
+        super().startDocument()
+        self.loaded: list[Element] = []
+        # Referenced id -> references waiting for that element
+        self._pending: dict[Id, list[_PendingReferences]] = {}
+        self._queued: dict[tuple[Id, str], _PendingReferences] = {}
+        self._collections: list[_PendingReferences] = []
+        # Diagram id -> presentation elements waiting for that diagram
+        self._waiting: dict[Id, list[_PendingPresentation]] = {}
+
+    def finish(self):
+        """Wrap up after the whole file has been parsed."""
+        for queue in self._collections:
+            self._restore_order(queue)
+        for presentations in self._waiting.values():
+            for p in presentations:
+                log.warning(
+                    "Removing element %s of type %s without diagram", p.id, p.type
+                )
+        for refid, queues in self._pending.items():
+            for queue in queues:
+                log.error(
+                    f"Invalid ID for reference ({refid}) for element {type(queue.element).__name__}.{queue.name}"
+                )
+
+    def start_root(self, state, name, attrs):
+        if super().start_root(state, name, attrs):
+            if version_lower_than(self.gaphor_version, UPGRADE_VERSION):
+                raise UpgradeRequired(self.gaphor_version)
+            return True
+
+    def start_element(self, state, name, attrs):
+        if state == GAPHOR:
+            id = attrs["id"]
+            if not (cls := self.modeling_language.lookup_element(name)):
+                raise UnknownModelElementError(
+                    f"Type {name} cannot be loaded: no such element"
+                )
+            if issubclass(cls, Presentation):
+                self.push(_PendingPresentation(id, cls), ELEMENT)
+            else:
+                self.push(self._create(cls, id), ELEMENT)
+            return True
+
+    def start_reference(self, state, name, attrs):
+        if state == ATTR and name == "reflist":
+            self.push(self.peek(), REFLIST)
+            return True
+        elif state == ATTR and name == "ref":
+            self._load_reference(self.peek(2), self.peek(), attrs["refid"])
+            self.push(None, REF)
+            return True
+        elif state == REFLIST and name == "ref":
+            self._load_reference(self.peek(3), self.peek(), attrs["refid"])
+            self.push(None, REF)
+            return True
+
+    def endElement(self, name):
+        state = self.state()
+        if state == VAL:
+            self._load_value(self.peek(3), self.peek(2), self.text)
+        elif state == ELEMENT:
+            e = self.peek()
+            if isinstance(e, _PendingPresentation) and e.diagram_id is None:
+                log.warning(
+                    "Removing element %s of type %s without diagram", e.id, e.type
+                )
+        self.pop()
+
+    def _create(self, cls, id, diagram=None):
+        e = self.element_factory.create_as(cls, id, diagram)
+        self.loaded.append(e)
+        for queue in self._pending.pop(id, ()):
+            self._resolve(queue)
+        if isinstance(e, Diagram):
+            for presentation in self._waiting.pop(id, ()):
+                self._create_presentation(presentation, e)
+        return e
+
+    def _create_presentation(self, pending, diagram):
+        pending.element = self._create(pending.type, pending.id, diagram)
+        properties, pending.properties = pending.properties, []
+        for name, value, is_reference in properties:
+            if is_reference:
+                self._load_reference(pending.element, name, value)
+            else:
+                self._load_value(pending.element, name, value)
+
+    def _load_value(self, target, name, value):
+        if isinstance(target, _PendingPresentation):
+            if not target.element:
+                target.properties.append((name, value, False))
+                return
+            target = target.element
+        try:
+            target.load(name, value)
+        except AttributeError:
+            log.exception(f"Invalid attribute name {type(target).__name__}.{name}")
+
+    def _load_reference(self, target, name, refid):
+        if isinstance(target, _PendingPresentation):
+            if not target.element:
+                target.properties.append((name, refid, True))
+                if name == "diagram":
+                    self._diagram_for(target, refid)
+                return
+            target = target.element
+        elif name == "ownedPresentation" and isinstance(target, Diagram):
+            # Presentation elements are added to their diagram on creation
+            return
+
+        key = (target.id, name)
+        if queue := self._queued.get(key):
+            # Keep references in order
+            queue.refids.append(refid)
+            if queue.order is not None:
+                queue.order.append(refid)
+        elif ref := self.element_factory.lookup(refid):
+            target.load(name, ref)
+        else:
+            queue = _PendingReferences(target, name, refid)
+            prop = getattr(type(target), name, None)
+            if prop is not None and getattr(prop, "upper", 1) != 1:
+                queue.order = [refid]
+                queue.start = len(prop.get(target))
+                self._collections.append(queue)
+            self._queued[key] = queue
+            self._pending.setdefault(refid, []).append(queue)
+
+    def _resolve(self, queue):
+        refids = queue.refids
+        while refids:
+            if not (ref := self.element_factory.lookup(refids[0])):
+                self._pending.setdefault(refids[0], []).append(queue)
+                return
+            refids.popleft()
+            queue.element.load(queue.name, ref)
+        del self._queued[(queue.element.id, queue.name)]
+
+    def _restore_order(self, queue):
+        """Opposite ends of queued references may have been loaded first.
+
+        Restore the order of the collection, as it was read from file.
+        """
+        assert queue.order is not None
+        items = getattr(type(queue.element), queue.name).get(queue.element)
+        position = {e: n for n, e in enumerate(items)}
+        rank = {id: n for n, id in enumerate(queue.order)}
+        start = queue.start
+        items.order(
+            lambda e: (0, position[e], 0)
+            if position[e] < start
+            else (1, rank.get(e.id, len(rank)), position[e])
+        )
+
+    def _diagram_for(self, pending, diagram_id):
+        pending.diagram_id = diagram_id
+        if isinstance(diagram := self.element_factory.lookup(diagram_id), Diagram):
+            self._create_presentation(pending, diagram)
+        else:
+            self._waiting.setdefault(diagram_id, []).append(pending)
+
+
 def version_lower_than(gaphor_version, version):
     """Only major and minor versions are checked.
 
@@ -332,6 +588,11 @@ class UnknownModelElementError(Exception):
     pass
 
 
+class UpgradeRequired(Exception):
+    """The model was saved by an older version of Gaphor, and requires
+    upgrading before it can be loaded."""
+
+
 # since 2.2.0
 def upgrade_ensure_style_sheet_is_present(factory):
     style_sheet = next(factory.select(StyleSheet), None)
@@ -341,21 +602,15 @@ def upgrade_ensure_style_sheet_is_present(factory):
 
 # since 2.1.0
 def upgrade_element_owned_comment_to_comment(elem):
-    for name, refids in dict(elem.references).items():
-        if name == "ownedComment":
-            elem.references["comment"] = refids
-            del elem.references["ownedComment"]
-            break
+    if "ownedComment" in elem.references:
+        elem.references["comment"] = elem.references.pop("ownedComment")
     return elem
 
 
 # since 2.3.0
 def upgrade_package_owned_classifier_to_owned_type(elem):
-    for name, refids in dict(elem.references).items():
-        if name == "ownedClassifier":
-            elem.references["ownedType"] = refids
-            del elem.references["ownedClassifier"]
-            break
+    if "ownedClassifier" in elem.references:
+        elem.references["ownedType"] = elem.references.pop("ownedClassifier")
     return elem
 
 
@@ -368,49 +623,31 @@ def upgrade_implementation_to_interface_realization(elem):
 
 # since 2.3.0
 def upgrade_feature_parameters_to_owned_parameter(elem):
-    formal_params = []
-    return_results = []
-    for name, refids in dict(elem.references).items():
-        if name == "formalParameter":
-            formal_params = refids
-            del elem.references["formalParameter"]
-        elif name == "returnResult":
-            return_results = refids
-            del elem.references["returnResult"]
+    formal_params = elem.references.pop("formalParameter", [])
+    return_results = elem.references.pop("returnResult", [])
     elem.references["ownedParameter"] = formal_params + return_results
     return elem
 
 
 # since 2.3.0
 def upgrade_parameter_owner_formal_param(elem):
-    for name, refids in dict(elem.references).items():
-        if name == "ownerReturnParam":
-            elem.references["ownerFormalParam"] = refids
-            del elem.references["ownerReturnParam"]
-            break
+    if "ownerReturnParam" in elem.references:
+        elem.references["ownerFormalParam"] = elem.references.pop("ownerReturnParam")
     return elem
 
 
 # since 2.5.0
 def upgrade_diagram_element(elem):
-    if elem.type == "Diagram":
-        for name, refids in dict(elem.references).items():
-            if name == "package":
-                elem.references["element"] = refids
-                del elem.references["package"]
-                break
+    if elem.type == "Diagram" and "package" in elem.references:
+        elem.references["element"] = elem.references.pop("package")
     return elem
 
 
 # since 2.6.0
 def upgrade_generalization_arrow_direction(elem):
     if elem.type == "GeneralizationItem":
-        head_ids, tail_ids = 0, 0
-        for name, refids in dict(elem.references).items():
-            if name == "head-connection":
-                head_ids = refids
-            elif name == "tail-connection":
-                tail_ids = refids
+        head_ids = elem.references.get("head-connection")
+        tail_ids = elem.references.get("tail-connection")
         if head_ids and tail_ids:
             elem.references["head-connection"], elem.references["tail-connection"] = (
                 tail_ids,
@@ -462,3 +699,100 @@ def upgrade_note_on_model_element_only(
                 subject.values["note"] = elem.values["note"]
             del elem.values["note"]
     return elem
+
+
+class Upgrade(NamedTuple):
+    version: tuple[int, int, int]
+    # Element types the upgrade applies to, None for all types
+    types: tuple[str, ...] | None
+    upgrade: Callable[[element, dict[str, element]], element]
+
+
+def _element_only(upgrade: Callable[[element], element]):
+    def upgrade_element(elem, _elements):
+        return upgrade(elem)
+
+    return upgrade_element
+
+
+# Upgrades of parsed elements, in the order they are applied
+ELEMENT_UPGRADES = [
+    Upgrade((2, 1, 0), None, _element_only(upgrade_element_owned_comment_to_comment)),
+    Upgrade(
+        (2, 3, 0), None, _element_only(upgrade_package_owned_classifier_to_owned_type)
+    ),
+    Upgrade(
+        (2, 3, 0),
+        ("Implementation",),
+        _element_only(upgrade_implementation_to_interface_realization),
+    ),
+    Upgrade(
+        (2, 3, 0), None, _element_only(upgrade_feature_parameters_to_owned_parameter)
+    ),
+    Upgrade((2, 3, 0), None, _element_only(upgrade_parameter_owner_formal_param)),
+    Upgrade((2, 5, 0), ("Diagram",), _element_only(upgrade_diagram_element)),
+    Upgrade(
+        (2, 6, 0),
+        ("GeneralizationItem",),
+        _element_only(upgrade_generalization_arrow_direction),
+    ),
+    Upgrade((2, 9, 0), ("FlowItem",), upgrade_flow_item_to_control_flow_item),
+    Upgrade(
+        (2, 19, 0),
+        ("Property", "Port", "ProxyPort"),
+        _element_only(upgrade_delete_property_information_flow),
+    ),
+    Upgrade(
+        (2, 19, 0),
+        ("DecisionNodeItem",),
+        _element_only(upgrade_decision_node_item_show_type),
+    ),
+    Upgrade((2, 20, 0), None, upgrade_note_on_model_element_only),
+]
+
+# Models saved by versions lower than this one need to be upgraded.
+UPGRADE_VERSION = ELEMENT_UPGRADES[-1].version
+
+
+class UpgradePlan:
+    """The upgrades required for a model saved by a specific Gaphor version.
+
+    The plan is empty (false) for models in the current format. Upgrades
+    are looked up by element type, so elements only pass through the
+    upgrades that apply to them.
+    """
+
+    def __init__(self, gaphor_version: str):
+        self.upgrades = [
+            (n, u)
+            for n, u in enumerate(ELEMENT_UPGRADES)
+            if version_lower_than(gaphor_version, u.version)
+        ]
+        self._by_type: dict[str, list[tuple[int, Upgrade]]] = {}
+
+    def __bool__(self):
+        return bool(self.upgrades)
+
+    def __call__(self, elem: element, elements: dict[str, element]) -> element:
+        type = elem.type
+        upgrades = self.for_type(type)
+        i = 0
+        while i < len(upgrades):
+            n, u = upgrades[i]
+            elem = u.upgrade(elem, elements)
+            i += 1
+            if elem.type != type:
+                # Continue with the upgrades for the new type
+                type = elem.type
+                upgrades = [(m, v) for m, v in self.for_type(type) if m > n]
+                i = 0
+        return elem
+
+    def for_type(self, type: str) -> list[tuple[int, Upgrade]]:
+        try:
+            return self._by_type[type]
+        except KeyError:
+            upgrades = self._by_type[type] = [
+                (n, u) for n, u in self.upgrades if u.types is None or type in u.types
+            ]
+            return upgrades
@@ -5,7 +5,11 @@ from xml.sax import SAXParseException
 import pytest
 
 from gaphor.storage import storage
-from gaphor.storage.parser import MergeConflictDetected, ParserException
+from gaphor.storage.parser import (
+    PARSER_BACKENDS,
+    MergeConflictDetected,
+    ParserException,
+)
 
 
 def buffer(text):
@@ -15,7 +19,8 @@ def buffer(text):
     return file
 
 
-def test_load_model(element_factory, modeling_language):
+@pytest.mark.parametrize("parser_backend", PARSER_BACKENDS)
+def test_load_model(element_factory, modeling_language, parser_backend):
     file = buffer(
         """\
         <?xml version="1.0" encoding="utf-8"?>
@@ -30,16 +35,24 @@ def test_load_model(element_factory, modeling_language):
         """
     )
 
-    storage.load(file, element_factory, modeling_language)
+    storage.load(
+        file, element_factory, modeling_language, parser_backend=parser_backend
+    )
 
     assert element_factory.lselect()
 
 
-def test_load_model_with_unknown_element(element_factory, modeling_language):
+@pytest.mark.parametrize(
+    "streaming, gaphor_version", [(False, "2.12.1"), (True, "2.22.1")]
+)
+def test_load_model_with_unknown_element(
+    element_factory, modeling_language, streaming, gaphor_version
+):
+    # Streaming only applies to files that need no upgrade
     file = buffer(
-        """\
+        f"""\
         <?xml version="1.0" encoding="utf-8"?>
-        <gaphor xmlns="http://gaphor.sourceforge.net/model" version="3.0" gaphor-version="2.12.1">
+        <gaphor xmlns="http://gaphor.sourceforge.net/model" version="3.0" gaphor-version="{gaphor_version}">
           <StyleSheet id="58d6989a-66f8-11ec-b4c8-0456e5e540ed" />
           <FooBar id="58d6989a-66f8-11ec-b4c8-0456e5e540ed" />
         </gaphor>
@@ -47,12 +60,14 @@ def test_load_model_with_unknown_element(element_factory, modeling_language):
     )
 
     with pytest.raises(storage.UnknownModelElementError):
-        storage.load(file, element_factory, modeling_language)
+        storage.load(file, element_factory, modeling_language, streaming=streaming)
 
     assert not element_factory.lselect()
 
 
-def test_plain_text(element_factory, modeling_language):
+@pytest.mark.parametrize("streaming", [False, True])
+@pytest.mark.parametrize("parser_backend", PARSER_BACKENDS)
+def test_plain_text(element_factory, modeling_language, parser_backend, streaming):
     file = buffer(
         """\
         Hello world
@@ -60,12 +75,20 @@ def test_plain_text(element_factory, modeling_language):
     )
 
     with pytest.raises(SAXParseException):
-        storage.load(file, element_factory, modeling_language)
+        storage.load(
+            file,
+            element_factory,
+            modeling_language,
+            streaming=streaming,
+            parser_backend=parser_backend,
+        )
 
     assert not element_factory.lselect()
 
 
-def test_wrong_tag(element_factory, modeling_language):
+@pytest.mark.parametrize("streaming", [False, True])
+@pytest.mark.parametrize("parser_backend", PARSER_BACKENDS)
+def test_wrong_tag(element_factory, modeling_language, parser_backend, streaming):
     file = buffer(
         """\
         <?xml version="1.0" encoding="utf-8"?>
@@ -76,12 +99,20 @@ def test_wrong_tag(element_factory, modeling_language):
     )
 
     with pytest.raises(ParserException):
-        storage.load(file, element_factory, modeling_language)
+        storage.load(
+            file,
+            element_factory,
+            modeling_language,
+            streaming=streaming,
+            parser_backend=parser_backend,
+        )
 
     assert not element_factory.lselect()
 
 
-def test_xml_not_gaphor(element_factory, modeling_language):
+@pytest.mark.parametrize("streaming", [False, True])
+@pytest.mark.parametrize("parser_backend", PARSER_BACKENDS)
+def test_xml_not_gaphor(element_factory, modeling_language, parser_backend, streaming):
     file = buffer(
         """\
         <?xml version="1.0" encoding="utf-8"?>
@@ -92,16 +123,28 @@ def test_xml_not_gaphor(element_factory, modeling_language):
     )
 
     with pytest.raises(ParserException):
-        storage.load(file, element_factory, modeling_language)
+        storage.load(
+            file,
+            element_factory,
+            modeling_language,
+            streaming=streaming,
+            parser_backend=parser_backend,
+        )
 
     assert not element_factory.lselect()
 
 
-def test_detect_merge_conflict(element_factory, modeling_language):
+@pytest.mark.parametrize(
+    "streaming, gaphor_version", [(False, "2.12.1"), (True, "2.22.1")]
+)
+@pytest.mark.parametrize("parser_backend", PARSER_BACKENDS)
+def test_detect_merge_conflict(
+    element_factory, modeling_language, parser_backend, streaming, gaphor_version
+):
     file = buffer(
-        """\
+        f"""\
         <?xml version="1.0" encoding="utf-8"?>
-        <gaphor xmlns="http://gaphor.sourceforge.net/model" version="3.0" gaphor-version="2.12.1">
+        <gaphor xmlns="http://gaphor.sourceforge.net/model" version="3.0" gaphor-version="{gaphor_version}">
         <StyleSheet id="58d6989a-66f8-11ec-b4c8-0456e5e540ed" />
         <Diagram id="58d6c536-66f8-11ec-b4c8-0456e5e540ed">
           <name>
@@ -118,6 +161,86 @@ def test_detect_merge_conflict(element_factory, modeling_language):
     )
 
     with pytest.raises(MergeConflictDetected):
-        storage.load(file, element_factory, modeling_language)
+        storage.load(
+            file,
+            element_factory,
+            modeling_language,
+            streaming=streaming,
+            parser_backend=parser_backend,
+        )
 
     assert not element_factory.lselect()
+
+
+def test_streaming_load_keeps_reference_order(element_factory, modeling_language):
+    file = buffer(
+        """\
+        <?xml version="1.0" encoding="utf-8"?>
+        <gaphor xmlns="http://gaphor.sourceforge.net/model" version="3.0" gaphor-version="2.22.1">
+          <Class id="c1" />
+          <Package id="p">
+            <ownedType>
+              <reflist>
+                <ref refid="c2" />
+                <ref refid="c1" />
+                <ref refid="c3" />
+              </reflist>
+            </ownedType>
+          </Package>
+          <Class id="c3" />
+          <Class id="c2" />
+        </gaphor>
+        """
+    )
+
+    storage.load(file, element_factory, modeling_language, streaming=True)
+
+    package = element_factory["p"]
+    assert [c.id for c in package.ownedType] == ["c2", "c1", "c3"]
+
+
+def test_streaming_load_of_presentation_before_diagram(
+    element_factory, modeling_language
+):
+    file = buffer(
+        """\
+        <?xml version="1.0" encoding="utf-8"?>
+        <gaphor xmlns="http://gaphor.sourceforge.net/model" version="3.0" gaphor-version="2.22.1">
+          <ClassItem id="ci">
+            <diagram>
+              <ref refid="d" />
+            </diagram>
+            <subject>
+              <ref refid="c" />
+            </subject>
+          </ClassItem>
+          <Class id="c" />
+          <Diagram id="d" />
+        </gaphor>
+        """
+    )
+
+    storage.load(file, element_factory, modeling_language, streaming=True)
+
+    item = element_factory["ci"]
+    assert item.diagram is element_factory["d"]
+    assert item.subject is element_factory["c"]
+
+
+def test_streaming_load_skips_presentation_without_diagram(
+    element_factory, modeling_language, caplog
+):
+    file = buffer(
+        """\
+        <?xml version="1.0" encoding="utf-8"?>
+        <gaphor xmlns="http://gaphor.sourceforge.net/model" version="3.0" gaphor-version="2.22.1">
+          <ClassItem id="ci" />
+          <Diagram id="d" />
+        </gaphor>
+        """
+    )
+
+    storage.load(file, element_factory, modeling_language, streaming=True)
+
+    assert not element_factory.lookup("ci")
+    assert "without diagram" in caplog.text
@@ -3,12 +3,13 @@ from io import StringIO
 import pytest
 from defusedxml import EntitiesForbidden
 
-from gaphor.storage.parser import parse
+from gaphor.storage.parser import PARSER_BACKENDS, parse
 
 
-def test_parsing_v2_1_model_with_grouped_item(test_models):
+@pytest.mark.parametrize("backend", PARSER_BACKENDS)
+def test_parsing_v2_1_model_with_grouped_item(test_models, backend):
     with open(test_models / "node-component-v2.1.gaphor", encoding="utf-8") as f:
-        elements = parse(f)
+        elements = parse(f, backend)
 
     diagram = next(e for e in elements.values() if e.type == "Diagram")
     component_item = next(e for e in elements.values() if e.type == "ComponentItem")
@@ -20,14 +21,16 @@ def test_parsing_v2_1_model_with_grouped_item(test_models):
     assert node_item.references["diagram"] == diagram.id
 
 
-def test_parsing_of_open_file(test_models):
+@pytest.mark.parametrize("backend", PARSER_BACKENDS)
+def test_parsing_of_open_file(test_models, backend):
     with (test_models / "test-model.gaphor").open(encoding="utf-8") as model:
-        elements = parse(model)
+        elements = parse(model, backend)
 
     assert elements
 
 
-def test_parsing_of_xml_entities():
+@pytest.mark.parametrize("backend", PARSER_BACKENDS)
+def test_parsing_of_xml_entities(backend):
     model = StringIO(
         """<?xml version="1.0" encoding="utf-8"?>
         <!DOCTYPE gaphor [
@@ -42,10 +45,11 @@ def test_parsing_of_xml_entities():
     )
 
     with pytest.raises(EntitiesForbidden):
-        parse(model)
+        parse(model, backend)
 
 
-def test_parsing_of_xml_external_entities_should_fail():
+@pytest.mark.parametrize("backend", PARSER_BACKENDS)
+def test_parsing_of_xml_external_entities_should_fail(backend):
     model = StringIO(
         """<?xml version="1.0" encoding="utf-8"?>
         <!DOCTYPE gaphor [
@@ -60,4 +64,31 @@ def test_parsing_of_xml_external_entities_should_fail():
     )
 
     with pytest.raises(EntitiesForbidden):
-        parse(model)
+        parse(model, backend)
+
+
+def parsed(elements):
+    return [(e.id, e.type, e.values, e.references) for e in elements.values()]
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        "test-model.gaphor",
+        "all-elements.gaphor",
+        "all-elements-v2.5.gaphor",
+        "node-component-v2.1.gaphor",
+    ],
+)
+def test_expat_backend_parses_same_elements_as_sax(test_models, model):
+    with (test_models / model).open(encoding="utf-8") as f:
+        sax_elements = parse(f, "sax")
+    with (test_models / model).open(encoding="utf-8") as f:
+        expat_elements = parse(f, "expat")
+
+    assert parsed(expat_elements) == parsed(sax_elements)
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        parse(StringIO(""), "foo")
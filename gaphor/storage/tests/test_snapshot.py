@@ -0,0 +1,152 @@
+import marshal
+import os
+from io import StringIO
+
+import pytest
+
+from gaphor.storage import snapshot, storage
+
+
+def save(element_factory):
+    out = StringIO()
+    storage.save(out, element_factory=element_factory)
+    return out.getvalue()
+
+
+def load(filename, snapshot_filename, element_factory, modeling_language):
+    for _ in snapshot.load_generator(
+        filename, snapshot_filename, element_factory, modeling_language
+    ):
+        pass
+
+
+@pytest.mark.parametrize(
+    "model", ["all-elements.gaphor", "all-elements-v2.5.gaphor", "simple-items.gaphor"]
+)
+def test_load_model_from_snapshot(
+    element_factory, modeling_language, test_models, tmp_path, model
+):
+    snapshot_filename = tmp_path / "model.snapshot"
+
+    load(test_models / model, snapshot_filename, element_factory, modeling_language)
+    expected = save(element_factory)
+    load(test_models / model, snapshot_filename, element_factory, modeling_language)
+
+    assert snapshot_filename.exists()
+    assert save(element_factory) == expected
+
+
+def test_load_from_snapshot_skips_parsing(
+    element_factory, modeling_language, test_models, tmp_path, monkeypatch
+):
+    snapshot_filename = tmp_path / "model.snapshot"
+    load(
+        test_models / "simple-items.gaphor",
+        snapshot_filename,
+        element_factory,
+        modeling_language,
+    )
+
+    def load_generator(*args):
+        raise AssertionError("Model should be loaded from snapshot")
+
+    monkeypatch.setattr(storage, "load_generator", load_generator)
+    load(
+        test_models / "simple-items.gaphor",
+        snapshot_filename,
+        element_factory,
+        modeling_language,
+    )
+
+    assert element_factory.lselect()
+
+
+def test_snapshot_is_invalidated_when_file_changes(
+    element_factory, modeling_language, test_models, tmp_path
+):
+    filename = tmp_path / "model.gaphor"
+    snapshot_filename = tmp_path / "model.snapshot"
+    filename.write_bytes((test_models / "simple-items.gaphor").read_bytes())
+    load(filename, snapshot_filename, element_factory, modeling_language)
+
+    filename.write_bytes((test_models / "all-elements.gaphor").read_bytes())
+    load(filename, snapshot_filename, element_factory, modeling_language)
+    loaded = save(element_factory)
+
+    with (test_models / "all-elements.gaphor").open(encoding="utf-8") as file_obj:
+        storage.load(file_obj, element_factory, modeling_language)
+
+    assert loaded == save(element_factory)
+
+
+def test_invalid_snapshot_is_ignored(
+    element_factory, modeling_language, test_models, tmp_path
+):
+    snapshot_filename = tmp_path / "model.snapshot"
+    snapshot_filename.write_bytes(b"invalid content")
+
+    load(
+        test_models / "simple-items.gaphor",
+        snapshot_filename,
+        element_factory,
+        modeling_language,
+    )
+
+    assert element_factory.lselect()
+    assert snapshot.read_snapshot(
+        snapshot_filename,
+        snapshot.content_hash((test_models / "simple-items.gaphor").read_bytes()),
+    )
+
+
+def test_incompatible_snapshot_falls_back_to_model_file(
+    element_factory, modeling_language, test_models, tmp_path
+):
+    filename = test_models / "simple-items.gaphor"
+    snapshot_filename = tmp_path / "model.snapshot"
+    digest = snapshot.content_hash(filename.read_bytes())
+    with snapshot_filename.open("wb") as f:
+        marshal.dump(snapshot.header(digest), f)
+        marshal.dump((["NoSuchElement"], [], ["id"], [(0, -1, (), ())]), f)
+
+    load(filename, snapshot_filename, element_factory, modeling_language)
+    loaded = save(element_factory)
+
+    with filename.open(encoding="utf-8") as file_obj:
+        storage.load(file_obj, element_factory, modeling_language)
+
+    assert loaded == save(element_factory)
+    assert "NoSuchElement" not in snapshot.read_snapshot(snapshot_filename, digest)[0]
+
+
+def test_prune_snapshots_keeps_most_recently_used(tmp_path):
+    for n in range(5):
+        path = tmp_path / f"{n}.snapshot"
+        path.write_bytes(b"")
+        os.utime(path, (n, n))
+
+    snapshot.prune_snapshots(tmp_path, keep=2)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["3.snapshot", "4.snapshot"]
+
+
+def test_read_snapshot_marks_it_as_used(
+    element_factory, modeling_language, test_models, tmp_path
+):
+    snapshot_filename = tmp_path / "model.snapshot"
+    load(
+        test_models / "simple-items.gaphor",
+        snapshot_filename,
+        element_factory,
+        modeling_language,
+    )
+    os.utime(snapshot_filename, (0, 0))
+
+    load(
+        test_models / "simple-items.gaphor",
+        snapshot_filename,
+        element_factory,
+        modeling_language,
+    )
+
+    assert snapshot_filename.stat().st_mtime > 0
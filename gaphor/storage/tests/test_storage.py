@@ -58,6 +58,52 @@ def test_save_uml(element_factory):
     assert "<Class " in out.data
 
 
+def test_save_element_format(element_factory):
+    package = element_factory.create_as(UML.Package, "1")
+    package.name = "<a & b>"
+    cls = element_factory.create_as(UML.Class, "2")
+    cls.package = package
+    cls.isAbstract = True
+    element_factory.create_as(StyleSheet, "3")
+
+    out = PseudoFile()
+    storage.save(out, element_factory=element_factory)
+    out.close()
+
+    assert out.data.endswith(
+        """
+<Package id="1">
+<name>
+<val>&lt;a &amp; b&gt;</val>
+</name>
+<ownedType>
+<reflist>
+<ref refid="2"/>
+</reflist>
+</ownedType>
+</Package>
+<Class id="2">
+<isAbstract>
+<val>1</val>
+</isAbstract>
+<package>
+<ref refid="1"/>
+</package>
+</Class>
+<StyleSheet id="3"/>
+</gaphor>"""
+    )
+
+
+def test_save_empty_model(element_factory):
+    out = PseudoFile()
+    storage.save(out, element_factory=element_factory)
+    out.close()
+
+    assert out.data.startswith('<?xml version="1.0" encoding="utf-8"?>\n<gaphor ')
+    assert out.data.endswith("/>")
+
+
 def test_save_item(diagram, element_factory):
     """Save a diagram item too."""
     diagram = element_factory.create(Diagram)
@@ -249,6 +295,48 @@ def test_load_and_save_of_a_model(element_factory, modeling_language, test_model
     assert copy == orig, "Saved model does not match copy"
 
 
+@pytest.mark.parametrize(
+    "model", ["simple-items.gaphor", "all-elements.gaphor", "stereotypes.gaphor"]
+)
+def test_streaming_load_and_save_of_a_model(
+    element_factory, modeling_language, test_models, model
+):
+    def load_and_save(file_obj, streaming):
+        storage.load(
+            file_obj,
+            element_factory=element_factory,
+            modeling_language=modeling_language,
+            streaming=streaming,
+        )
+        pf = PseudoFile()
+        storage.save(pf, element_factory=element_factory)
+        return pf.data
+
+    # Upgrade the model first, so it can be streamed
+    with open(test_models / model, encoding="utf-8") as ifile:
+        orig = load_and_save(ifile, streaming=False)
+
+    copy = load_and_save(StringIO(orig), streaming=True)
+
+    assert copy == orig
+
+
+def test_streaming_load_of_a_model_that_requires_upgrading(
+    element_factory, modeling_language, test_models
+):
+    path = test_models / "all-elements-v2.5.gaphor"
+
+    with open(path, encoding="utf-8") as ifile:
+        storage.load(
+            ifile,
+            element_factory=element_factory,
+            modeling_language=modeling_language,
+            streaming=True,
+        )
+
+    assert element_factory.lselect(Diagram)
+
+
 def test_can_not_load_models_older_that_0_17_0(
     element_factory, modeling_language, test_models
 ):
@@ -1,7 +1,7 @@
 import pytest
 
 from gaphor.storage.parser import element
-from gaphor.storage.storage import load_elements
+from gaphor.storage.storage import UpgradePlan, load_elements
 from gaphor.storage.upgrade_canvasitem import upgrade_canvasitem
 from gaphor.UML import diagramitems
 
@@ -161,3 +161,34 @@ def test_upgrade_append_notes_on_model_element(loader, element_factory):
     assert not cls_item1.note
     assert not cls_item2.note
     assert cls.note == "my note\n\nanother note"
+
+
+def test_upgrade_plan_for_current_model_is_empty():
+    assert not UpgradePlan("2.20.0")
+
+
+def test_upgrade_plan_contains_only_newer_upgrades():
+    plan = UpgradePlan("2.9.0")
+
+    assert plan
+    assert all(u.version >= (2, 19, 0) for _, u in plan.upgrades)
+
+
+def test_upgrade_plan_selects_upgrades_by_type():
+    plan = UpgradePlan("2.18.0")
+
+    assert len(plan.for_type("DecisionNodeItem")) == 2
+    assert len(plan.for_type("Class")) == 1
+
+
+def test_upgrade_plan_continues_after_type_change():
+    plan = UpgradePlan("2.8.0")
+    flow = element(id="2", type="ObjectFlow")
+    item = element(id="3", type="FlowItem")
+    item.references["subject"] = flow.id
+    item.values["note"] = "my note"
+
+    item = plan(item, {e.id: e for e in (flow, item)})
+
+    assert item.type == "ObjectFlowItem"
+    assert flow.values["note"] == "my note"
@@ -79,7 +79,7 @@ class CopyService(Service, ActionProvider):
                     return
                 raise
 
-            with Transaction(self.event_manager):
+            with Transaction(self.event_manager), self.event_manager.batch():
                 # Create new id's that have to be used to create the items:
                 new_items = paster(copy_buffer.buffer, diagram)
 
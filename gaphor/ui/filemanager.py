@@ -23,7 +23,8 @@ from gaphor.event import (
     SessionShutdown,
     SessionShutdownRequested,
 )
-from gaphor.storage import storage
+from gaphor.services.properties import file_hash, get_cache_dir
+from gaphor.storage import snapshot, storage
 from gaphor.storage.mergeconflict import split_ours_and_theirs
 from gaphor.storage.parser import MergeConflictDetected
 from gaphor.ui.errorhandler import error_handler
@@ -110,13 +111,21 @@ class FileManager(Service, ActionProvider):
         storage.load(template, self.element_factory, self.modeling_language)
         self.event_manager.handle(ModelLoaded(self))
 
-    def load(self, filename: Path, on_load_done: Callable[[], None] | None = None):
+    def load(
+        self,
+        filename: Path,
+        on_load_done: Callable[[], None] | None = None,
+        use_snapshot: bool = True,
+    ):
         """Load the Gaphor model from the supplied file name.
 
         A status window displays the loading progress. The load
         generator updates the progress queue.  The loader is passed to a
         GIdleThread which executes the load generator. If loading is
         successful, the filename is set.
+
+        If ``use_snapshot`` is set, the model is loaded from a snapshot in
+        the user's cache directory, if the file has not changed since.
         """
         # First claim file name, so any other files will be opened in a different session
         self.filename = filename
@@ -134,7 +143,9 @@ class FileManager(Service, ActionProvider):
             else:
                 self.event_manager.handle(ModelLoaded(self, filename))
 
-        for _ in self._load_async(filename, status_window.progress, done):
+        for _ in self._load_async(
+            filename, status_window.progress, done, use_snapshot=use_snapshot
+        ):
             pass
 
     def merge(
@@ -207,17 +218,15 @@ class FileManager(Service, ActionProvider):
         progress: Callable[[int], None] | None = None,
         done=None,
         element_factory=None,
+        use_snapshot=False,
     ):
         try:
-            with filename.open(encoding="utf-8", errors="replace") as file_obj:
-                for percentage in storage.load_generator(
-                    file_obj,
-                    element_factory or self.element_factory,
-                    self.modeling_language,
-                ):
-                    if progress:
-                        progress(percentage)
-                    yield percentage
+            for percentage in self._load_generator(
+                filename, element_factory or self.element_factory, use_snapshot
+            ):
+                if progress:
+                    progress(int(percentage))
+                yield percentage
         except MergeConflictDetected:
             self.filename = None
             self.resolve_merge_conflict(filename)
@@ -237,6 +246,21 @@ class FileManager(Service, ActionProvider):
             if done:
                 done()
 
+    def _load_generator(self, filename: Path, element_factory, use_snapshot: bool):
+        if use_snapshot:
+            yield from snapshot.load_generator(
+                filename,
+                get_cache_dir() / f"{file_hash(filename.resolve())}.snapshot",
+                element_factory,
+                self.modeling_language,
+            )
+            return
+
+        with filename.open(encoding="utf-8", errors="replace") as file_obj:
+            yield from storage.load_generator(
+                file_obj, element_factory, self.modeling_language
+            )
+
     def resolve_merge_conflict(self, filename: Path):
         temp_dir = tempfile.TemporaryDirectory()
         ancestor_filename = Path(temp_dir.name) / f"ancestor-{filename.name}"
@@ -261,9 +285,9 @@ class FileManager(Service, ActionProvider):
             if answer == "cancel":
                 self.event_manager.handle(SessionShutdown(self))
             elif answer == "current":
-                self.load(current_filename, on_load_done=done)
+                self.load(current_filename, on_load_done=done, use_snapshot=False)
             elif answer == "incoming":
-                self.load(incoming_filename, on_load_done=done)
+                self.load(incoming_filename, on_load_done=done, use_snapshot=False)
             elif answer == "manual":
                 self.merge(
                     ancestor_filename,
@@ -23,6 +23,7 @@ from gaphor.diagram.diagramtoolbox import DiagramType
 from gaphor.diagram.event import DiagramOpened
 from gaphor.diagram.group import change_owner
 from gaphor.diagram.tools.dnd import ElementDragData
+from gaphor.event import TransactionCommit, TransactionRollback
 from gaphor.i18n import gettext, translated_ui_string
 from gaphor.transaction import Transaction
 from gaphor.ui.abc import UIComponent
@@ -35,7 +36,7 @@ from gaphor.ui.treemodel import (
     tree_item_sort,
     visible,
 )
-from gaphor.ui.treesearch import search, sorted_tree_walker
+from gaphor.ui.treesearch import SearchIndex
 
 START_EDIT_DELAY = 100  # ms
 
@@ -46,7 +47,11 @@ class ModelBrowser(UIComponent, ActionProvider):
         self.element_factory = element_factory
         self.modeling_language = modeling_language
         self.model = TreeModel()
+        self.search_index = SearchIndex(element_factory)
         self.search_bar = None
+        self._changed_elements: dict[Element, None] = {}
+        self._changed_child_models: dict[Element, None] = {}
+        self._refresh_id = 0
 
     def open(self):
         self.event_manager.subscribe(self.on_element_created)
@@ -56,6 +61,7 @@ class ModelBrowser(UIComponent, ActionProvider):
         self.event_manager.subscribe(self.on_attribute_changed)
         self.event_manager.subscribe(self.on_model_ready)
         self.event_manager.subscribe(self.on_diagram_selection_changed)
+        self.event_manager.subscribe(self.on_transaction_end)
 
         tree_model = Gtk.TreeListModel.new(
             self.model.root,
@@ -102,7 +108,9 @@ class ModelBrowser(UIComponent, ActionProvider):
             )
         )
 
-        self.search_bar = create_search_bar(SearchEngine(self.model, self.tree_view))
+        self.search_bar = create_search_bar(
+            SearchEngine(self.search_index, self.tree_view)
+        )
 
         self.search_bar.set_key_capture_widget(self.tree_view)
 
@@ -122,8 +130,13 @@ class ModelBrowser(UIComponent, ActionProvider):
         self.event_manager.unsubscribe(self.on_attribute_changed)
         self.event_manager.unsubscribe(self.on_model_ready)
         self.event_manager.unsubscribe(self.on_diagram_selection_changed)
+        self.event_manager.unsubscribe(self.on_transaction_end)
+        if self._refresh_id:
+            GLib.source_remove(self._refresh_id)
+            self._refresh_id = 0
 
     def select_element(self, element: Element) -> int | None:
+        self.refresh()
         return select_element(self.tree_view, element)
 
     def get_selected_elements(self) -> list[Element]:
@@ -227,16 +240,19 @@ class ModelBrowser(UIComponent, ActionProvider):
     @event_handler(ElementCreated)
     def on_element_created(self, event: ElementCreated):
         self.model.add_element(event.element)
+        self.search_index.changed(event.element)
 
     @event_handler(ElementDeleted)
     def on_element_deleted(self, event: ElementDeleted):
         self.model.remove_element(event.element)
+        self.search_index.removed(event.element)
 
     @event_handler(DerivedAdded, DerivedDeleted)
     def on_owned_element_changed(self, event):
         """Ensure we update the node once owned elements change."""
         if event.property in (Element.ownedElement, UML.Namespace.member):
-            self.model.notify_child_model(event.element)
+            self._changed_child_models[event.element] = None
+            self.schedule_refresh()
 
     @event_handler(DerivedSet)
     def on_owner_changed(self, event: DerivedSet):
@@ -249,15 +265,59 @@ class ModelBrowser(UIComponent, ActionProvider):
         element = event.element
         self.model.remove_element(element, former_owner=event.old_value)
         self.model.add_element(element)
-        self.select_element(element)
-
-    @event_handler(ElementUpdated)
-    def on_attribute_changed(self, event: ElementUpdated):
-        self.model.sync(event.element)
-        self.sorter.changed(Gtk.SorterChange.DIFFERENT)
+        select_element(self.tree_view, element)
+
+    @event_handler(ElementUpdated, batch=True)
+    def on_attribute_changed(self, events: list[ElementUpdated]):
+        changed = {event.element: None for event in events if visible(event.element)}
+        if changed:
+            self._changed_elements.update(changed)
+            for element in changed:
+                self.search_index.changed(element)
+            self.schedule_refresh()
+
+    @event_handler(TransactionCommit, TransactionRollback)
+    def on_transaction_end(self, _event):
+        self.refresh()
+
+    def schedule_refresh(self):
+        if not self._refresh_id:
+            self._refresh_id = GLib.idle_add(self._refresh_on_idle)
+
+    def _refresh_on_idle(self):
+        self._refresh_id = 0
+        self.refresh()
+        return GLib.SOURCE_REMOVE
+
+    def refresh(self):
+        """Update the tree for changed elements.
+
+        Changes are collected, and applied when the outermost transaction
+        ends, or when the application is idle. The tree is sorted once for
+        all changes.
+        """
+        if self._refresh_id:
+            GLib.source_remove(self._refresh_id)
+            self._refresh_id = 0
+
+        changed_elements = self._changed_elements
+        changed_child_models = self._changed_child_models
+        self._changed_elements = {}
+        self._changed_child_models = {}
+
+        if changed_child_models:
+            self.model.notify_child_model(*changed_child_models)
+
+        if changed_elements:
+            for element in changed_elements:
+                self.model.sync(element)
+            self.sorter.changed(Gtk.SorterChange.DIFFERENT)
 
     @event_handler(ModelReady, ModelFlushed)
     def on_model_ready(self, event=None):
+        self._changed_elements.clear()
+        self._changed_child_models.clear()
+        self.search_index.clear()
         model = self.model
         model.clear()
 
@@ -275,34 +335,25 @@ class ModelBrowser(UIComponent, ActionProvider):
 
 
 class SearchEngine:
-    def __init__(self, model, tree_view):
-        self.model = model
+    def __init__(self, search_index, tree_view):
+        self.search_index = search_index
         self.tree_view = tree_view
         self.selection = self.tree_view.get_model()
 
     def text_changed(self, search_text):
-        selected_item = get_first_selected_item(self.selection)
-        if next_item := search(
-            search_text,
-            sorted_tree_walker(
-                self.model,
-                start_tree_item=selected_item and selected_item.get_item(),
-                from_current=True,
-            ),
-        ):
-            select_element(self.tree_view, next_item.element)
+        self._search(search_text, from_current=True)
 
     def search_next(self, search_text):
+        self._search(search_text, from_current=False)
+
+    def _search(self, search_text, from_current):
         selected_item = get_first_selected_item(self.selection)
-        if next_item := search(
+        if element := self.search_index.search(
             search_text,
-            sorted_tree_walker(
-                self.model,
-                start_tree_item=selected_item and selected_item.get_item(),
-                from_current=False,
-            ),
+            start=selected_item and selected_item.get_item().element,
+            from_current=from_current,
         ):
-            select_element(self.tree_view, next_item.element)
+            select_element(self.tree_view, element)
 
 
 def get_selected_elements(selection: Gtk.SelectionModel) -> list[Element]:
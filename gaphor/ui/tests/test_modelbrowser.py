@@ -2,6 +2,7 @@ import pytest
 
 from gaphor import UML
 from gaphor.core.modeling import Diagram
+from gaphor.transaction import Transaction
 from gaphor.ui.modelbrowser import (
     ElementDragData,
     ModelBrowser,
@@ -127,6 +128,7 @@ def test_element_name_changed(model_browser, element_factory):
     tree_item = model_browser.model.tree_item_for_element(class_)
 
     class_.name = "foo"
+    model_browser.refresh()
 
     weight, style = tree_item.attributes.get_attributes()
 
@@ -149,12 +151,45 @@ def test_element_style_changed(model_browser, element_factory):
     tree_item = model_browser.model.tree_item_for_element(class_)
 
     class_.isAbstract = True
+    model_browser.refresh()
     weight, style = tree_item.attributes.get_attributes()
 
     assert weight.as_int().value == 400
     assert style.as_int().value == 2
 
 
+def test_element_changes_are_applied_on_commit(
+    model_browser, element_factory, event_manager
+):
+    with Transaction(event_manager):
+        class_ = element_factory.create(UML.Class)
+        tree_item = model_browser.model.tree_item_for_element(class_)
+        class_.name = "foo"
+
+        assert tree_item.readonly_text != "foo"
+
+    assert tree_item.readonly_text == "foo"
+
+
+def test_bulk_change_invalidates_sorter_once(
+    model_browser, element_factory, event_manager
+):
+    invalidations = []
+    model_browser.sorter.connect(
+        "changed", lambda _sorter, change: invalidations.append(change)
+    )
+
+    with Transaction(event_manager):
+        package = element_factory.create(UML.Package)
+        for n in range(100):
+            class_ = element_factory.create(UML.Class)
+            class_.name = f"Class{n}"
+            class_.isAbstract = True
+            class_.package = package
+
+    assert len(invalidations) == 1
+
+
 def test_model_browser_model_ready(event_manager, element_factory, modeling_language):
     class_ = element_factory.create(UML.Class)
     package = element_factory.create(UML.Package)
@@ -227,7 +262,7 @@ def test_search_next(model_browser, element_factory):
     class_b = element_factory.create(UML.Class)
     class_b.name = "b"
 
-    search_engine = SearchEngine(model_browser.model, model_browser.tree_view)
+    search_engine = SearchEngine(model_browser.search_index, model_browser.tree_view)
     model_browser.select_element(class_a)
     assert model_browser.get_selected_element() is class_a
 
@@ -242,7 +277,7 @@ def test_search_text_changed(model_browser, element_factory):
     class_b = element_factory.create(UML.Class)
     class_b.name = "b"
 
-    search_engine = SearchEngine(model_browser.model, model_browser.tree_view)
+    search_engine = SearchEngine(model_browser.search_index, model_browser.tree_view)
     model_browser.select_element(class_a)
     assert model_browser.get_selected_element() is class_a
 
@@ -259,6 +294,7 @@ def test_generalization_text(model_browser, element_factory):
     generalization = element_factory.create(UML.Generalization)
     generalization.specific = specific
     generalization.general = general
+    model_browser.refresh()
 
     model = model_browser.model
     tree_item = model.tree_item_for_element(specific)
@@ -56,6 +56,36 @@ def test_branch_add_relationship(element_factory):
     assert branch.relationships[0].element is element
 
 
+def test_branch_remove_last_relationship(element_factory):
+    branch = Branch()
+    element = element_factory.create(UML.Class)
+    relationship = element_factory.create(UML.Association)
+    branch.append(element)
+    branch.append(relationship)
+
+    branch.remove(relationship)
+
+    assert len(branch) == 1
+    assert branch[0].element is element
+    assert branch.relationship_item is None
+    assert list(branch.tree_items) == [element]
+
+
+def test_branch_changed_reports_adjacent_rows_at_once(element_factory):
+    branch = Branch()
+    elements = [element_factory.create(UML.Class) for _ in range(4)]
+    for element in elements:
+        branch.append(element)
+    items_changed = ItemChangedHandler()
+    branch.elements.connect("items-changed", items_changed)
+
+    branch.changed(elements[3], elements[0], elements[1])
+
+    assert items_changed.positions == [0, 3]
+    assert items_changed.added == 3
+    assert items_changed.removed == 3
+
+
 def test_tree_model_add_element(element_factory):
     tree_model = TreeModel()
     element = element_factory.create(UML.Class)
@@ -124,6 +154,7 @@ def test_tree_model_remove_nested_element(element_factory):
 
     assert len(tree_model.branches) == 1
     assert None in tree_model.branches
+    assert not tree_model.owner_branches
     assert tree_model.tree_item_for_element(package) is not None
     assert tree_model.tree_item_for_element(class_) is None
 
@@ -256,6 +287,19 @@ def test_tree_model_sort_relationship_item_first(element_factory):
     assert tree_item_sort(b, a) == 1
 
 
+def test_tree_item_sort_key_is_normalized(element_factory):
+    class_ = element_factory.create(UML.Class)
+    class_.name = "Cafe\u0301"
+    tree_item = TreeItem(class_)
+
+    assert tree_item.sort_key == "caf\u00e9"
+
+    class_.name = "B"
+    tree_item.sync()
+
+    assert tree_item.sort_key == "b"
+
+
 def test_element_with_member_and_no_owner(element_factory):
     tree_model = TreeModel()
     property = element_factory.create(UML.Property)
@@ -2,7 +2,7 @@ import pytest
 
 from gaphor import UML
 from gaphor.ui.treemodel import TreeModel
-from gaphor.ui.treesearch import search, sorted_tree_walker
+from gaphor.ui.treesearch import SearchIndex, search, sorted_tree_walker
 
 
 @pytest.fixture
@@ -80,3 +80,131 @@ def test_search_from_current_with_start_tree_item(tree_model, create):
     )
 
     assert found.element is abb
+
+
+@pytest.fixture
+def search_index(element_factory):
+    return SearchIndex(element_factory)
+
+
+def test_search_index(search_index, create):
+    create("aaa")
+    bbb = create("bbb")
+
+    assert search_index.search("b") is bbb
+    assert search_index.search("z") is None
+
+
+def test_search_index_with_trigrams(search_index, create):
+    create("Hello")
+    world = create("World")
+
+    assert search_index.search("WORL") is world
+    assert search_index.search("worlds") is None
+
+
+def test_search_index_in_tree_order(search_index, create):
+    bbb = create("bbb")
+    create("abc", parent=bbb)
+    aab = create("aab")
+
+    assert search_index.search("b") is aab
+    assert search_index.search("b", start=aab) is bbb
+
+
+def test_search_index_with_start(search_index, create):
+    create("aab")
+    abb = create("abb")
+    bbb = create("bbb")
+
+    assert search_index.search("b", start=abb) is bbb
+    assert search_index.search("b", start=abb, from_current=True) is abb
+
+
+def test_search_index_wraps_around(search_index, create):
+    aab = create("aab")
+    bbb = create("bbb")
+
+    assert search_index.search("b", start=bbb) is aab
+
+
+def test_search_index_skips_relationships_node(search_index, element_factory, create):
+    bbb = create("bbb")
+    generalization = element_factory.create(UML.Generalization)
+    generalization.specific = bbb
+    generalization.general = create("aaa")
+    search_index.changed(generalization)
+
+    assert search_index.search("general", start=bbb) is generalization
+
+
+def test_search_index_update(search_index, create):
+    aaa = create("aaa")
+    search_index.search("a")
+
+    aaa.name = "bbb"
+    search_index.changed(aaa)
+
+    assert search_index.search("a") is None
+    assert search_index.search("bbb") is aaa
+
+
+def test_search_index_remove(search_index, create):
+    aaa = create("aaa")
+    search_index.search("a")
+
+    aaa.unlink()
+    search_index.removed(aaa)
+
+    assert search_index.search("a") is None
+
+
+def test_search_index_walks_nested_elements_in_tree_order(search_index, create):
+    aaa = create("aaa")
+    abc = create("abc", parent=aaa)
+    bbb = create("bbb")
+    bcd = create("bcd", parent=bbb)
+
+    assert search_index.search("b", start=abc) is bbb
+    assert search_index.search("b", start=bbb) is bcd
+    assert search_index.search("b", start=bcd) is abc
+    assert search_index.search("bcd", start=bcd) is bcd
+
+
+def test_search_index_keeps_paths_of_unchanged_elements(search_index, create):
+    aaa = create("aaa")
+    abc = create("abc", parent=aaa)
+    search_index.search("abc")
+    path = search_index.path(abc)
+
+    aaa.note = "note"
+    search_index.changed(aaa)
+
+    assert search_index.path(abc) is path
+
+
+def test_search_index_keeps_paths_of_other_branches(search_index, create):
+    aaa = create("aaa")
+    abc = create("abc", parent=aaa)
+    bbb = create("bbb")
+    search_index.search("a", start=bbb)
+    path = search_index.path(abc)
+
+    bbb.name = "ccc"
+    search_index.changed(bbb)
+
+    assert search_index.path(abc) is path
+    assert search_index.path(bbb) > path
+
+
+def test_search_index_updates_paths_of_children(search_index, create):
+    aaa = create("aaa")
+    abc = create("abc", parent=aaa)
+    bbb = create("bbb")
+    assert search_index.search("abc", start=bbb) is abc
+
+    aaa.name = "ddd"
+    search_index.changed(aaa)
+
+    assert search_index.search("b", start=bbb) is abc
+    assert search_index.search("abc", start=abc) is abc
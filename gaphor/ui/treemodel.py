@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from typing import Iterator
 from unicodedata import normalize
 
 from gi.repository import Gio, GObject, Pango
@@ -16,6 +17,8 @@ _no_value = object()
 class TreeItem(GObject.Object):
     def __init__(self, element: Element | None):
         super().__init__()
+        self._readonly_text = ""
+        self.sort_key = ""
         self.element = element
         if element:
             self.sync()
@@ -23,7 +26,16 @@ class TreeItem(GObject.Object):
     icon = GObject.Property(type=str)
     icon_visible = GObject.Property(type=bool, default=False)
 
-    readonly_text = GObject.Property(type=str)
+    @GObject.Property(type=str)
+    def readonly_text(self):
+        return self._readonly_text
+
+    @readonly_text.setter  # type: ignore[no-redef]
+    def readonly_text(self, text):
+        self._readonly_text = text or ""
+        # Items are sorted and searched by normalized text
+        self.sort_key = normalized(self._readonly_text)
+
     attributes = GObject.Property(type=Pango.AttrList)
     editing = GObject.Property(type=bool, default=False)
     can_edit = GObject.Property(type=bool, default=True)
@@ -42,7 +54,7 @@ class TreeItem(GObject.Object):
 
     def sync(self) -> None:
         if element := self.element:
-            self.readonly_text = format(element) or gettext("<None>")
+            self.readonly_text = tree_item_text(element)  # type: ignore[method-assign]
             self.notify("editable-text")
             self.icon = icon_name(element)
             self.icon_visible = bool(
@@ -61,61 +73,80 @@ class RelationshipItem(TreeItem):
     def __init__(self, child_model):
         super().__init__(None)
         self.child_model = child_model
-        self.readonly_text = gettext("<Relationships>")
+        self.readonly_text = gettext("<Relationships>")  # type: ignore[method-assign]
         self.can_edit = False
 
 
 class Branch:
-    def __init__(self):
+    def __init__(self, tree_item: TreeItem | None = None):
+        self.tree_item = tree_item
         self.elements = Gio.ListStore.new(TreeItem.__gtype__)
         self.relationships = Gio.ListStore.new(TreeItem.__gtype__)
+        self.relationship_item: RelationshipItem | None = None
+        self.tree_items: dict[Element, TreeItem] = {}
 
     def append(self, element: Element):
+        tree_item = TreeItem(element)
         if isinstance(element, UML.Relationship):
-            if self.relationships.get_n_items() == 0:
-                self.elements.insert(0, RelationshipItem(self.relationships))
-            self.relationships.append(TreeItem(element))
+            if self.relationship_item is None:
+                self.relationship_item = RelationshipItem(self.relationships)
+                self.elements.insert(0, self.relationship_item)
+            self.relationships.append(tree_item)
         else:
-            self.elements.append(TreeItem(element))
+            self.elements.append(tree_item)
+        self.tree_items[element] = tree_item
 
     def remove(self, element):
+        if (tree_item := self.tree_items.pop(element, None)) is None:
+            return
+
         list_store = (
             self.relationships
             if isinstance(element, UML.Relationship)
             else self.elements
         )
-        if (
-            index := next(
-                (i for i, ti in enumerate(list_store) if ti.element is element),
-                None,
-            )
-        ) is not None:
+        found, index = list_store.find(tree_item)
+        if found:
             list_store.remove(index)
 
         # Clean up empty relationships node
-        if list_store is self.relationships and self.relationships.get_n_items() == 0:
-            for i, e in enumerate(self.elements):
-                if isinstance(e, RelationshipItem):
-                    self.elements.remove(i)
-                    break
+        if (
+            list_store is self.relationships
+            and self.relationships.get_n_items() == 0
+            and self.relationship_item
+        ):
+            found, index = self.elements.find(self.relationship_item)
+            if found:
+                self.elements.remove(index)
+            self.relationship_item = None
 
     def remove_all(self):
         self.relationships.remove_all()
         self.elements.remove_all()
+        self.relationship_item = None
+        self.tree_items.clear()
+
+    def changed(self, *elements: Element):
+        """Notify that the rows of elements have changed.
+
+        Adjacent rows are reported in one ``items-changed`` signal.
+        """
+        positions: dict[Gio.ListStore, list[int]] = {}
+        for element in elements:
+            if not (tree_item := self.tree_items.get(element)):
+                continue
+            list_store = (
+                self.relationships
+                if isinstance(element, UML.Relationship)
+                else self.elements
+            )
+            found, index = list_store.find(tree_item)
+            if found:
+                positions.setdefault(list_store, []).append(index)
 
-    def changed(self, element: Element):
-        list_store = (
-            self.relationships
-            if isinstance(element, UML.Relationship)
-            else self.elements
-        )
-        if not (
-            tree_item := next((ti for ti in list_store if ti.element is element), None)
-        ):
-            return
-        found, index = list_store.find(tree_item)
-        if found:
-            list_store.items_changed(index, 1, 1)
+        for list_store, indexes in positions.items():
+            for start, count in _ranges(indexes):
+                list_store.items_changed(start, count, count)
 
     def __len__(self):
         return self.elements.get_n_items()
@@ -128,6 +159,31 @@ class Branch:
         yield from self.relationships
 
 
+def tree_item_text(element: Element) -> str:
+    return format(element) or gettext("<None>")
+
+
+def tree_owner(element: Element) -> Element | None:
+    """The element an element is shown under in the tree."""
+    return element.owner or (
+        element.memberNamespace if isinstance(element, UML.NamedElement) else None
+    )
+
+
+def _ranges(indexes: list[int]) -> Iterator[tuple[int, int]]:
+    """Group indexes in (start, count) ranges of adjacent indexes."""
+    start = count = 0
+    for index in sorted(set(indexes)):
+        if count and index == start + count:
+            count += 1
+            continue
+        if count:
+            yield start, count
+        start, count = index, 1
+    if count:
+        yield start, count
+
+
 def visible(element):
     return isinstance(
         element, (UML.Relationship, UML.NamedElement, Diagram)
@@ -136,20 +192,30 @@ def visible(element):
     )
 
 
+def normalized(text: str) -> str:
+    return normalize("NFC", text).casefold()
+
+
 def tree_item_sort(a, b, _user_data=None):
     if isinstance(a, RelationshipItem):
         return -1
     if isinstance(b, RelationshipItem):
         return 1
-    na = normalize("NFC", a.readonly_text).casefold()
-    nb = normalize("NFC", b.readonly_text).casefold()
+    na = a.sort_key
+    nb = b.sort_key
     return (na > nb) - (na < nb)
 
 
+def tree_item_sort_key(tree_item: TreeItem) -> tuple[bool, str]:
+    """Sort key for tree items, in the same order as ``tree_item_sort``."""
+    return (not isinstance(tree_item, RelationshipItem), tree_item.sort_key)
+
+
 class TreeModel:
     def __init__(self):
         super().__init__()
         self.branches: dict[TreeItem | None, Branch] = {None: Branch()}
+        self.owner_branches: dict[Element, Branch] = {}
 
     @property
     def root(self) -> Gio.ListStore:
@@ -181,8 +247,9 @@ class TreeModel:
             if isinstance(item.element, UML.Namespace)
             else []
         ):
-            new_branch = Branch()
+            new_branch = Branch(item)
             self.branches[item] = new_branch
+            self.owner_branches[item.element] = new_branch
             for e in owned_elements:
                 new_branch.append(e)
             return new_branch.elements
@@ -192,29 +259,17 @@ class TreeModel:
         self, element: Element, former_owner=_no_value
     ) -> Branch | None:
         if (
-            owner := (
-                element.owner
-                or (
-                    element.memberNamespace
-                    if isinstance(element, UML.NamedElement)
-                    else None
-                )
-            )
-            if former_owner is _no_value
-            else former_owner
+            owner := tree_owner(element) if former_owner is _no_value else former_owner
         ) is None:
             return self.branches[None]
 
-        return next(
-            (m for ti, m in self.branches.items() if ti and ti.element is owner),
-            None,
-        )
+        return self.owner_branches.get(owner)
 
     def tree_item_for_element(self, element: Element | None) -> TreeItem | None:
         if element is None:
             return None
         if owner_branch := self.owner_branch_for_element(element):
-            return next((ti for ti in owner_branch if ti.element is element), None)
+            return owner_branch.tree_items.get(element)
         return None
 
     def add_element(self, element: Element) -> None:
@@ -266,36 +321,39 @@ class TreeModel:
                 self.remove_branch(owner_branch)
 
     def remove_branch(self, branch: Branch) -> None:
-        tree_item = next(ti for ti, b in self.branches.items() if b is branch)
+        tree_item = branch.tree_item
         if tree_item is None:
             # Do never remove the root branch
             return
 
         del self.branches[tree_item]
+        element = tree_item.element
+        assert element
+        if self.owner_branches.get(element) is branch:
+            del self.owner_branches[element]
 
-        self.notify_child_model(tree_item.element)
+        self.notify_child_model(element)
 
-    def notify_child_model(self, element):
+    def notify_child_model(self, *elements: Element) -> None:
         # Only notify the change, the branch is created in child_model()
-        owner_tree_item = self.tree_item_for_element(
-            element.owner
-            or (
-                element.memberNamespace
-                if isinstance(element, UML.NamedElement)
-                else None
-            )
-        )
-        if (
-            not self.branches.get(self.tree_item_for_element(element))
-            and (owner_branch := self.branches.get(owner_tree_item)) is not None
-        ):
-            owner_branch.changed(element)
+        changed: dict[Branch, list[Element]] = {}
+        for element in elements:
+            owner_tree_item = self.tree_item_for_element(tree_owner(element))
+            if (
+                not self.branches.get(self.tree_item_for_element(element))
+                and (owner_branch := self.branches.get(owner_tree_item)) is not None
+            ):
+                changed.setdefault(owner_branch, []).append(element)
+
+        for branch, changed_elements in changed.items():
+            branch.changed(*changed_elements)
 
     def clear(self) -> None:
         root = self.branches[None]
         root.remove_all()
         self.branches.clear()
         self.branches[None] = root
+        self.owner_branches.clear()
 
 
 def pango_attributes(element):
@@ -1,8 +1,19 @@
-import functools
-from typing import Iterable
-from unicodedata import normalize
+from __future__ import annotations
 
-from gaphor.ui.treemodel import TreeItem, tree_item_sort
+from bisect import bisect_right
+from itertools import islice
+from typing import Iterable, Iterator
+
+from gaphor import UML
+from gaphor.core.modeling import Element
+from gaphor.ui.treemodel import (
+    TreeItem,
+    normalized,
+    tree_item_sort_key,
+    tree_item_text,
+    tree_owner,
+    visible,
+)
 
 """
 Inputs:
@@ -22,11 +33,10 @@ Inputs:
 
 
 def search(search_text, tree_walker: Iterable[TreeItem]):
-    search_text = normalize("NFC", search_text).casefold()
+    search_text = normalized(search_text)
 
     for tree_item in tree_walker:
-        text = normalize("NFC", tree_item.readonly_text).casefold()
-        if tree_item.element and search_text in text:
+        if tree_item.element and search_text in tree_item.sort_key:
             return tree_item
 
 
@@ -61,7 +71,253 @@ def sorted_tree_walker(
 
 
 def sorted_tree_items(branch):
-    return sorted(
-        branch,
-        key=functools.cmp_to_key(tree_item_sort),
-    )
+    return sorted(branch, key=tree_item_sort_key)
+
+
+def trigrams(text: str) -> set[str]:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    """Normalized texts of the elements in the tree, for incremental search.
+
+    Matches are ordered as in the (sorted) tree, based on the model, so no
+    tree branches need to be created.
+
+    If a search text matches few elements, the matches are found with a
+    trigram index and compared by their path in the tree. If it matches
+    many elements, or is shorter than a trigram, the tree is walked from
+    the start element until the next match. A short search text that
+    matches nothing walks the whole tree.
+
+    The index is built on the first search. Changes are applied on the
+    next search.
+    """
+
+    def __init__(self, element_factory):
+        self.element_factory = element_factory
+        self._texts: dict[Element, str] | None = None
+        self._trigrams: dict[str, set[Element]] = {}
+        self._changed: set[Element] = set()
+        self._owners: dict[Element, Element | None] = {}
+        self._children: dict[Element | None, set[Element]] | None = None
+        self._sorted_children: dict[Element | None, list[Element]] = {}
+        self._paths: dict[Element, tuple | None] = {}
+
+    def changed(self, element: Element) -> None:
+        """Text or position of an element in the tree has changed."""
+        if self._texts is not None:
+            self._changed.add(element)
+
+    def removed(self, element: Element) -> None:
+        if self._texts is not None:
+            self._changed.discard(element)
+            self._remove(element)
+
+    def clear(self) -> None:
+        self._texts = None
+        self._trigrams.clear()
+        self._changed.clear()
+        self._owners.clear()
+        self._children = None
+        self._sorted_children.clear()
+        self._paths.clear()
+
+    def search(
+        self, search_text: str, start: Element | None = None, from_current=False
+    ) -> Element | None:
+        """Find the first element after ``start`` that matches the search
+        text.
+
+        If ``from_current`` is set, ``start`` itself can match. The search
+        wraps around at the end of the tree.
+        """
+        search_text = normalized(search_text)
+        texts = self._update()
+
+        matches: list[Element] | None = None
+        if len(search_text) >= 3:
+            candidates = sorted(
+                (self._trigrams.get(t, set()) for t in trigrams(search_text)), key=len
+            )
+            matches = [
+                e
+                for e in candidates[0].intersection(*candidates[1:])
+                if search_text in texts[e]
+            ]
+
+        # Walking the tree visits about len(texts) / len(matches) elements
+        # until the next match, comparing paths visits all matches
+        if matches is None or len(matches) ** 2 > len(texts):
+            return next(
+                (
+                    element
+                    for element in self._tree_order(start, from_current)
+                    if search_text in texts[element]
+                ),
+                None,
+            )
+
+        start_path = self._path(start) if start else None
+        first = next_match = None
+        for element in matches:
+            if (path := self._path(element)) is None:
+                continue
+            if first is None or path < first[0]:
+                first = (path, element)
+            if (
+                start_path is not None
+                and (path > start_path or (from_current and path == start_path))
+                and (next_match is None or path < next_match[0])
+            ):
+                next_match = (path, element)
+
+        found = next_match or first
+        return found[1] if found else None
+
+    def path(self, element: Element) -> tuple | None:
+        """Sort keys of an element and its owners, from the tree root.
+
+        Paths sort in the same order as the elements in the tree. If the
+        element is not in the tree, ``None`` is returned.
+        """
+        self._update()
+        return self._path(element)
+
+    def _path(self, element: Element) -> tuple | None:
+        try:
+            return self._paths[element]
+        except KeyError:
+            pass
+
+        path: tuple | None = None
+        if self._texts and element in self._texts:
+            owner = self._owner(element)
+            owner_path = self._path(owner) if owner else ()
+            if owner_path is not None:
+                path = owner_path + self._sort_key(element)
+        self._paths[element] = path
+        return path
+
+    def _sort_key(self, element: Element) -> tuple:
+        assert self._texts is not None
+        key = (1, self._texts[element], element.id)
+        # Relationships are grouped in a node that goes first
+        return ((0, ""), key) if isinstance(element, UML.Relationship) else (key,)
+
+    def _owner(self, element: Element) -> Element | None:
+        try:
+            return self._owners[element]
+        except KeyError:
+            owner = self._owners[element] = tree_owner(element)
+            return owner
+
+    def _sorted(self, owner: Element | None) -> list[Element]:
+        try:
+            return self._sorted_children[owner]
+        except KeyError:
+            pass
+
+        if (tree := self._children) is None:
+            assert self._texts is not None
+            tree = self._children = {}
+            for element in self._texts:
+                tree.setdefault(self._owner(element), set()).add(element)
+
+        children = self._sorted_children[owner] = sorted(
+            tree.get(owner, ()), key=self._sort_key
+        )
+        return children
+
+    def _walk(self, owner: Element | None) -> Iterator[Element]:
+        for child in self._sorted(owner):
+            yield child
+            yield from self._walk(child)
+
+    def _tree_order(
+        self, start: Element | None, from_current: bool
+    ) -> Iterator[Element]:
+        """All elements in the tree, starting after ``start``.
+
+        Elements are visited in tree order, wrapping around at the end of
+        the tree.
+        """
+        if start is None or self._path(start) is None:
+            yield from self._walk(None)
+            return
+
+        if from_current:
+            yield start
+        yield from self._walk(start)
+
+        element: Element | None = start
+        while element is not None:
+            owner = self._owners[element]
+            siblings = self._sorted(owner)
+            index = bisect_right(siblings, self._sort_key(element), key=self._sort_key)
+            for sibling in islice(siblings, index, None):
+                yield sibling
+                yield from self._walk(sibling)
+            element = owner
+
+        for element in self._walk(None):
+            yield element
+            if element is start:
+                return
+
+    def _update(self) -> dict[Element, str]:
+        if self._texts is None:
+            self._texts = {}
+            for element in self.element_factory.select(visible):
+                self._add(element, normalized(tree_item_text(element)))
+        elif self._changed:
+            changed, self._changed = self._changed, set()
+            for element in changed:
+                if not (visible(element) and self.element_factory.lookup(element.id)):
+                    self._remove(element)
+                    continue
+                text = normalized(tree_item_text(element))
+                # Only owners of elements with a path, or in a walked tree, are known
+                if self._texts.get(element) != text or (
+                    element in self._owners
+                    and self._owners[element] is not tree_owner(element)
+                ):
+                    self._remove(element)
+                    self._add(element, text)
+        return self._texts
+
+    def _add(self, element: Element, text: str) -> None:
+        assert self._texts is not None
+        self._texts[element] = text
+        for trigram in trigrams(text):
+            self._trigrams.setdefault(trigram, set()).add(element)
+        if self._children is not None:
+            owner = self._owner(element)
+            self._children.setdefault(owner, set()).add(element)
+            self._sorted_children.pop(owner, None)
+
+    def _remove(self, element: Element) -> None:
+        assert self._texts is not None
+        if (text := self._texts.pop(element, None)) is None:
+            return
+        for trigram in trigrams(text):
+            elements = self._trigrams[trigram]
+            elements.discard(element)
+            if not elements:
+                del self._trigrams[trigram]
+        self._drop_paths(element)
+        if element in self._owners:
+            owner = self._owners.pop(element)
+            if self._children is not None:
+                self._children[owner].discard(element)
+                self._sorted_children.pop(owner, None)
+
+    def _drop_paths(self, element: Element) -> None:
+        """Drop the cached paths of an element and its children."""
+        if self._children is None:
+            # Children are not known until the tree is walked
+            self._paths.clear()
+        elif element in self._paths:
+            del self._paths[element]
+            for child in self._children.get(element, ()):
+                self._drop_paths(child)
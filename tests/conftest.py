@@ -1,5 +1,9 @@
 # ruff: noqa: F401
 
+import math
+import time
+
+import pytest
 from hypothesis import settings
 
 from gaphor.conftest import (
@@ -14,3 +18,25 @@ settings.register_profile(
 )
 settings.register_profile("ci", max_examples=2500)
 settings.load_profile("test")
+
+
+@pytest.fixture
+def record_time(record_property):
+    """Time a function and record the time as a property in the test report.
+
+    The function is called ``number`` times per run, for ``repeat`` runs.
+    The fastest time per call is recorded. The result of the last call is
+    returned.
+    """
+
+    def _record_time(name, func, number=1, repeat=1):
+        best = math.inf
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                result = func()
+            best = min(best, (time.perf_counter() - start) / number)
+        record_property(name, best)
+        return result
+
+    return _record_time
@@ -0,0 +1,75 @@
+"""Measure the work done for dragging one item on a diagram with 5000 items.
+
+For each step, the dragged item is updated, and the items in the visible
+region are sorted for drawing. Items are sorted with an index of the
+diagram's item order, instead of walking all items of the diagram. The
+time per step, with and without the index, is recorded as a property in
+the test report, as well as the time to drop the item in another item.
+"""
+
+import pytest
+
+from gaphor.core.modeling import Diagram
+from gaphor.diagram.general import Box, Line
+
+ITEMS = 5000
+STEPS = 50
+
+
+def linear_sort(diagram, items):
+    items_set = set(items)
+    return [n for n in diagram.get_all_items() if n in items_set]
+
+
+@pytest.fixture
+def large_diagram(element_factory):
+    diagram = element_factory.create(Diagram)
+    with element_factory.block_events():
+        for n in range(ITEMS):
+            item = diagram.create(Line if n % 5 == 0 else Box)
+            item.matrix.translate(n % 100 * 120, n // 100 * 120)
+    diagram.postload()
+    element_factory.model_ready()
+    diagram.update_now(list(diagram.get_all_items()))
+    return diagram
+
+
+def drag(diagram, sort):
+    items = list(diagram.get_all_items())
+    dragged = items[len(items) // 2]
+    visible = items[: len(items) // 20]
+
+    def step():
+        dragged.matrix.translate(1, 1)
+        diagram.update_now([dragged])
+        list(sort(visible))
+
+    return step
+
+
+@pytest.mark.benchmark
+def test_drag_item(large_diagram, record_time):
+    record_time("drag_step_time", drag(large_diagram, large_diagram.sort), STEPS)
+    record_time(
+        "linear_sort_drag_step_time",
+        drag(large_diagram, lambda items: linear_sort(large_diagram, items)),
+        STEPS,
+    )
+
+    visible = list(large_diagram.get_all_items())[::7]
+    assert list(large_diagram.sort(visible)) == linear_sort(large_diagram, visible)
+
+
+@pytest.mark.benchmark
+def test_drop_item_in_other_item(large_diagram, record_time):
+    items = list(large_diagram.get_all_items())
+    dragged, container = items[len(items) // 2], items[0]
+
+    def drop():
+        dragged.parent = container
+
+    record_time("drop_time", drop)
+
+    assert list(large_diagram.get_all_items()).index(dragged) == (
+        list(large_diagram.get_all_items()).index(container) + 1
+    )
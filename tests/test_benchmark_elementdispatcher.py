@@ -0,0 +1,48 @@
+"""Measure model load time with compiled element dispatcher paths.
+
+Every presentation item subscribes its watch paths while a model is
+loaded. Load time and the number of compiled paths are recorded as
+properties in the test report.
+"""
+
+from io import StringIO
+from pathlib import Path
+
+import pytest
+
+from gaphor.core.eventmanager import EventManager
+from gaphor.core.modeling import ElementFactory
+from gaphor.core.modeling.elementdispatcher import ElementDispatcher
+from gaphor.storage.storage import load
+
+MODEL = Path(__file__).parent.parent / "models" / "UML.gaphor"
+
+
+class UncompiledElementDispatcher(ElementDispatcher):
+    def _path_to_properties(self, element, path):
+        return self._compile_path(type(element), path)
+
+
+@pytest.mark.benchmark
+def test_load_with_compiled_paths(modeling_language, record_time, record_property):
+    def measure_load(name, dispatcher_class):
+        event_manager = EventManager()
+        dispatcher = dispatcher_class(event_manager, modeling_language)
+        element_factory = ElementFactory(event_manager, dispatcher)
+        data = MODEL.read_text(encoding="utf-8")
+        record_time(
+            name, lambda: load(StringIO(data), element_factory, modeling_language)
+        )
+        return dispatcher
+
+    uncompiled = measure_load("uncompiled_load_time", UncompiledElementDispatcher)
+    compiled = measure_load("compiled_load_time", ElementDispatcher)
+
+    record_property("compiled_paths", len(compiled._paths))
+
+    assert compiled._paths
+    assert handler_keys(compiled) == handler_keys(uncompiled)
+
+
+def handler_keys(dispatcher):
+    return {(element.id, prop.name) for element, prop in dispatcher._handlers}
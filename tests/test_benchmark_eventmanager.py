@@ -0,0 +1,72 @@
+"""Measure event throughput, for single events and for batches.
+
+The time to handle all events is recorded as properties in the test report.
+"""
+
+import pytest
+
+from gaphor.core.eventmanager import EventManager, event_handler
+from gaphor.core.modeling.event import AssociationSet, ElementUpdated
+
+EVENTS = 10_000
+
+
+class Element:
+    pass
+
+
+def create_events():
+    element = Element()
+    return [AssociationSet(element, None, None, None) for _ in range(EVENTS)]
+
+
+@pytest.mark.benchmark
+def test_event_throughput(record_time, record_property):
+    event_manager = EventManager()
+    count = 0
+
+    @event_handler(ElementUpdated)
+    def handler(event):
+        nonlocal count
+        count += 1
+
+    event_manager.subscribe(handler)
+    events = create_events()
+
+    def handle():
+        for event in events:
+            event_manager.handle(event)
+
+    def handle_batch():
+        with event_manager.batch():
+            for event in events:
+                event_manager.handle(event)
+
+    record_property("events", EVENTS)
+    record_time("handle_time", handle, repeat=3)
+    record_time("batched_handle_time", handle_batch, repeat=3)
+
+    assert count == EVENTS * 6
+
+
+@pytest.mark.benchmark
+def test_batch_handler_throughput(record_time):
+    event_manager = EventManager()
+    calls = 0
+
+    @event_handler(ElementUpdated, batch=True)
+    def handler(events):
+        nonlocal calls
+        calls += 1
+
+    event_manager.subscribe(handler)
+    events = create_events()
+
+    def handle_batch():
+        with event_manager.batch():
+            for event in events:
+                event_manager.handle(event)
+
+    record_time("batch_handler_time", handle_batch)
+
+    assert calls == 1
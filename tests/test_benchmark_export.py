@@ -0,0 +1,54 @@
+"""Measure export of a diagram with 1000 items to SVG.
+
+Items are painted once, on a recording surface. The recording is used
+to determine the size of the drawing, and is replayed on the SVG surface.
+The number of items painted and the export time are recorded as properties
+in the test report.
+"""
+
+import pytest
+
+from gaphor import UML
+from gaphor.core.modeling import Diagram
+from gaphor.diagram.export import save_svg
+from gaphor.diagram.painter import ItemPainter
+from gaphor.UML.classes import ClassItem
+
+ITEMS = 1000
+
+
+@pytest.fixture
+def large_diagram(element_factory):
+    diagram = element_factory.create(Diagram)
+    diagram.diagramType = "class"
+    with element_factory.block_events():
+        for n in range(ITEMS):
+            class_ = element_factory.create(UML.Class)
+            class_.name = f"Class{n}"
+            item = diagram.create(ClassItem, subject=class_)
+            item.matrix.translate((n % 40) * 150, (n // 40) * 100)
+    diagram.postload()
+    element_factory.model_ready()
+    return diagram
+
+
+@pytest.mark.benchmark
+def test_export_paints_items_once(
+    large_diagram, tmp_path, monkeypatch, record_time, record_property
+):
+    painted = 0
+    paint_item = ItemPainter.paint_item
+
+    def counting_paint_item(self, item, cr):
+        nonlocal painted
+        painted += 1
+        paint_item(self, item, cr)
+
+    monkeypatch.setattr(ItemPainter, "paint_item", counting_paint_item)
+
+    record_time("export_time", lambda: save_svg(tmp_path / "large.svg", large_diagram))
+
+    record_property("items", ITEMS)
+    record_property("items_painted", painted)
+
+    assert painted == ITEMS
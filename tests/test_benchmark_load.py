@@ -0,0 +1,117 @@
+"""Compare the regular and streaming model loaders.
+
+Each model is loaded in a separate process, so the peak resident set
+size (RSS) of a load can be measured. Load time and peak RSS growth are
+recorded as properties in the test report. Memory is read from /proc,
+so the benchmark only runs on Linux.
+"""
+
+import subprocess
+import sys
+import textwrap
+from io import StringIO
+from pathlib import Path
+
+import pytest
+
+from gaphor.core.modeling.modelinglanguage import (
+    CoreModelingLanguage,
+    MockModelingLanguage,
+)
+from gaphor.RAAML.modelinglanguage import RAAMLModelingLanguage
+from gaphor.storage import storage
+from gaphor.SysML.modelinglanguage import SysMLModelingLanguage
+from gaphor.UML.modelinglanguage import UMLModelingLanguage
+
+MODELS = Path(__file__).parent.parent / "models"
+
+LOAD_SCRIPT = textwrap.dedent(
+    """\
+    import sys
+    import time
+
+    from gaphor.core.eventmanager import EventManager
+    from gaphor.core.modeling import ElementFactory
+    from gaphor.core.modeling.modelinglanguage import (
+        CoreModelingLanguage,
+        MockModelingLanguage,
+    )
+    from gaphor.RAAML.modelinglanguage import RAAMLModelingLanguage
+    from gaphor.storage import storage
+    from gaphor.SysML.modelinglanguage import SysMLModelingLanguage
+    from gaphor.UML.modelinglanguage import UMLModelingLanguage
+
+    def memory_status(name):
+        with open("/proc/self/status", encoding="utf-8") as status:
+            for line in status:
+                if line.startswith(name):
+                    return int(line.split()[1])
+
+
+    path, streaming = sys.argv[1], sys.argv[2] == "True"
+    modeling_language = MockModelingLanguage(
+        CoreModelingLanguage(),
+        UMLModelingLanguage(),
+        SysMLModelingLanguage(),
+        RAAMLModelingLanguage(),
+    )
+    element_factory = ElementFactory(EventManager())
+    with open(path, encoding="utf-8") as file_obj:
+        rss_before = memory_status("VmRSS:")
+        start = time.perf_counter()
+        storage.load(file_obj, element_factory, modeling_language, streaming=streaming)
+        duration = time.perf_counter() - start
+        peak_rss = memory_status("VmHWM:")
+    print(duration, peak_rss - rss_before, len(element_factory.lselect()))
+    """
+)
+
+
+@pytest.fixture
+def modeling_language():
+    return MockModelingLanguage(
+        CoreModelingLanguage(),
+        UMLModelingLanguage(),
+        SysMLModelingLanguage(),
+        RAAMLModelingLanguage(),
+    )
+
+
+def measure_load(path, streaming):
+    result = subprocess.run(
+        [sys.executable, "-c", LOAD_SCRIPT, str(path), str(streaming)],
+        capture_output=True,
+        check=True,
+        encoding="utf-8",
+    )
+    duration, peak_rss_growth, elements = result.stdout.split()
+    return float(duration), int(peak_rss_growth), int(elements)
+
+
+@pytest.mark.benchmark
+@pytest.mark.skipif(
+    not Path("/proc/self/status").exists(), reason="Memory is read from /proc"
+)
+@pytest.mark.parametrize("model", ["UML.gaphor", "RAAML_full.gaphor"])
+def test_streaming_load_compared_to_regular_load(
+    element_factory, modeling_language, model, tmp_path, record_property
+):
+    # Models are saved first, so they're in the current file format
+    with (MODELS / model).open(encoding="utf-8") as file_obj:
+        storage.load(file_obj, element_factory, modeling_language)
+    path = tmp_path / model
+    out = StringIO()
+    storage.save(out, element_factory=element_factory)
+    path.write_text(out.getvalue(), encoding="utf-8")
+
+    regular_time, regular_rss, regular_elements = measure_load(path, streaming=False)
+    streaming_time, streaming_rss, streaming_elements = measure_load(
+        path, streaming=True
+    )
+
+    record_property("regular_load_time", regular_time)
+    record_property("regular_peak_rss_growth_kb", regular_rss)
+    record_property("streaming_load_time", streaming_time)
+    record_property("streaming_peak_rss_growth_kb", streaming_rss)
+
+    assert streaming_elements == regular_elements == len(element_factory.lselect())
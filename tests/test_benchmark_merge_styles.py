@@ -0,0 +1,86 @@
+"""Measure style handling while drawing all diagrams in a model.
+
+Inline styles of shapes are merged with the style of the item once, and
+the merged style is reused for later frames. The number of merged styles
+created for a frame and the peak memory of drawing a frame are recorded
+as properties in the test report, for drawing with memoized merged styles
+and for drawing with a fresh merge on every call.
+"""
+
+import tracemalloc
+from pathlib import Path
+
+import cairo
+import pytest
+
+from gaphor.core import styling
+from gaphor.core.modeling import Diagram
+from gaphor.diagram.painter import ItemPainter
+from gaphor.storage.storage import load
+
+MODEL = Path(__file__).parent.parent / "examples" / "coffee-machine.gaphor"
+
+MERGE_INLINE_STYLE_USERS = (
+    "gaphor.diagram.shapes",
+    "gaphor.diagram.presentation",
+    "gaphor.UML.classes.association",
+)
+
+
+@pytest.fixture
+def diagrams(element_factory, modeling_language):
+    with MODEL.open(encoding="utf-8") as file_obj:
+        load(file_obj, element_factory, modeling_language)
+    diagrams = element_factory.lselect(Diagram)
+    for diagram in diagrams:
+        diagram.update_now(list(diagram.get_all_items()))
+    return diagrams
+
+
+def draw_frame(diagrams):
+    painter = ItemPainter()
+    surface = cairo.RecordingSurface(cairo.Content.COLOR_ALPHA, None)
+    cr = cairo.Context(surface)
+    for diagram in diagrams:
+        painter.paint(diagram.get_all_items(), cr)
+
+
+def measure_frame(diagrams, monkeypatch):
+    merges = 0
+    merge_styles = styling.merge_styles
+
+    def counting_merge_styles(*styles):
+        nonlocal merges
+        merges += 1
+        return merge_styles(*styles)
+
+    with monkeypatch.context() as m:
+        m.setattr("gaphor.core.styling.merge_styles", counting_merge_styles)
+        draw_frame(diagrams)
+        merges = 0
+        tracemalloc.start()
+        try:
+            draw_frame(diagrams)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return merges, peak
+
+
+@pytest.mark.benchmark
+def test_merged_styles_per_frame(diagrams, monkeypatch, record_property):
+    memoized_merges, memoized_peak = measure_frame(diagrams, monkeypatch)
+
+    for module in MERGE_INLINE_STYLE_USERS:
+        monkeypatch.setattr(
+            f"{module}.merge_inline_style",
+            lambda style, inline_style: styling.merge_styles(style, inline_style),
+        )
+    merges, peak = measure_frame(diagrams, monkeypatch)
+
+    record_property("merged_styles_per_frame", memoized_merges)
+    record_property("frame_peak_memory", memoized_peak)
+    record_property("unmemoized_merged_styles_per_frame", merges)
+    record_property("unmemoized_frame_peak_memory", peak)
+
+    assert memoized_merges < merges
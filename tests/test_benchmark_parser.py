@@ -0,0 +1,33 @@
+"""Compare the SAX and expat parser backends.
+
+The parse time and the number of parsed elements are recorded as
+properties in the test report.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from gaphor.storage.parser import GaphorLoader, parse_generator
+
+MODEL = Path(__file__).parent.parent / "models" / "UML.gaphor"
+
+
+def parse(backend):
+    loader = GaphorLoader()
+    with MODEL.open(encoding="utf-8") as file_obj:
+        for _ in parse_generator(file_obj, loader, backend):
+            pass
+    return loader.elements
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("backend", ["sax", "expat"])
+def test_parse_time(backend, record_time, record_property):
+    elements = record_time("parse_time", lambda: parse(backend), repeat=3)
+
+    record_property("elements", len(elements))
+
+
+def test_backends_parse_same_elements():
+    assert parse("expat").keys() == parse("sax").keys()
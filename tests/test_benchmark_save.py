@@ -0,0 +1,94 @@
+"""Compare saving with the chunked serializer to saving through XMLWriter.
+
+Save times are recorded as properties in the test report.
+"""
+
+from io import StringIO
+from pathlib import Path
+
+import pytest
+
+from gaphor import application
+from gaphor.core.modeling import Element
+from gaphor.core.modeling.collection import collection
+from gaphor.storage import storage
+from gaphor.storage.xmlwriter import XMLWriter
+
+MODEL = Path(__file__).parent.parent / "models" / "UML.gaphor"
+
+
+def xmlwriter_save(out, element_factory):
+    """Save a model the way it was done before, event by event."""
+    ns = storage.NAMESPACE_MODEL
+    writer = XMLWriter(out)
+    writer.startDocument()
+    writer.startPrefixMapping("", ns)
+    writer.startElementNS(
+        (ns, "gaphor"),
+        None,
+        {
+            (ns, "version"): storage.FILE_FORMAT_VERSION,
+            (ns, "gaphor-version"): application.distribution().version,
+        },
+    )
+
+    def save_func(name, value):
+        if isinstance(value, Element):
+            if value in element_factory:
+                writer.startElement(name, {})
+                writer.startElement("ref", {"refid": value.id})
+                writer.endElement("ref")
+                writer.endElement(name)
+        elif isinstance(value, collection):
+            if value:
+                writer.startElement(name, {})
+                writer.startElement("reflist", {})
+                for v in value:
+                    if v in element_factory:
+                        writer.startElement("ref", {"refid": v.id})
+                        writer.endElement("ref")
+                writer.endElement("reflist")
+                writer.endElement(name)
+        elif value is not None:
+            writer.startElement(name, {})
+            writer.startElement("val", {})
+            writer.characters(
+                str(int(value)) if isinstance(value, bool) else str(value)
+            )
+            writer.endElement("val")
+            writer.endElement(name)
+
+    for e in element_factory.values():
+        clazz = e.__class__.__name__
+        writer.startElement(clazz, {"id": str(e.id)})
+        e.save(save_func)
+        writer.endElement(clazz)
+
+    writer.endElementNS((ns, "gaphor"), None)
+    writer.endPrefixMapping("")
+    writer.endDocument()
+
+
+def save(element_factory, save_func=storage.save):
+    out = StringIO()
+    save_func(out, element_factory=element_factory)
+    return out.getvalue()
+
+
+@pytest.fixture
+def uml_model(element_factory, modeling_language):
+    with MODEL.open(encoding="utf-8") as file_obj:
+        storage.load(file_obj, element_factory, modeling_language)
+    return element_factory
+
+
+def test_save_is_compatible_with_xmlwriter(uml_model):
+    assert save(uml_model) == save(uml_model, xmlwriter_save)
+
+
+@pytest.mark.benchmark
+def test_save_time(uml_model, record_time):
+    record_time("save_time", lambda: save(uml_model), repeat=3)
+    record_time(
+        "xmlwriter_save_time", lambda: save(uml_model, xmlwriter_save), repeat=3
+    )
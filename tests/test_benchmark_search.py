@@ -0,0 +1,55 @@
+"""Measure model browser search on a model with 100k elements.
+
+The search index is built on the first search. The time to build the
+index, and the time of searches with the index in place are recorded as
+properties in the test report. Short and dense search texts walk the tree
+from the start element instead of the index. The first walk collects the
+owners of all elements.
+"""
+
+import pytest
+
+from gaphor import UML
+from gaphor.ui.treesearch import SearchIndex
+
+ELEMENTS = 100_000
+PACKAGES = 100
+CLASSES = 99
+
+
+@pytest.fixture
+def large_model(element_factory):
+    # Setting owners takes most of the time, so most classes are top-level
+    with element_factory.block_events():
+        for p in range(PACKAGES):
+            package = element_factory.create(UML.Package)
+            package.name = f"Package{p}"
+            for c in range(CLASSES):
+                class_ = element_factory.create(UML.Class)
+                class_.name = f"Class{p}x{c}"
+                class_.package = package
+        for n in range(ELEMENTS - PACKAGES * (CLASSES + 1)):
+            class_ = element_factory.create(UML.Class)
+            class_.name = f"TopLevel{n}"
+    element_factory.model_ready()
+    return element_factory
+
+
+@pytest.mark.benchmark
+def test_search_large_model(large_model, record_time, record_property):
+    search_index = SearchIndex(large_model)
+
+    def search(name, search_text, start=None):
+        return record_time(name, lambda: search_index.search(search_text, start))
+
+    record_property("elements", ELEMENTS)
+    found = search("first_search_time", "class50x5")
+    search("search_time", "class50x50")
+    next_found = search("search_next_time", "class50x5", start=found)
+    search("first_walk_time", "c", start=found)
+    short_found = search("short_search_time", "c", start=found)
+    search("dense_search_time", "class", start=found)
+
+    assert found.name == "Class50x5"
+    assert next_found.name == "Class50x50"
+    assert short_found.name == "Class50x50"
@@ -0,0 +1,43 @@
+"""Compare type based selection with a linear scan over all elements.
+
+Selection times are recorded as properties in the test report.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from gaphor import UML
+from gaphor.core.modeling import Diagram, Element, Presentation
+from gaphor.storage.storage import load
+
+MODEL = Path(__file__).parent.parent / "models" / "UML.gaphor"
+
+
+def linear_select(element_factory, type):
+    return [e for e in element_factory.values() if isinstance(e, type)]
+
+
+@pytest.fixture
+def uml_model(element_factory, modeling_language):
+    with MODEL.open(encoding="utf-8") as file_obj:
+        load(file_obj, element_factory, modeling_language)
+    return element_factory
+
+
+@pytest.mark.parametrize(
+    "type",
+    [Element, Presentation, Diagram, UML.Class, UML.Association, UML.Stereotype],
+)
+def test_select_by_type_equals_linear_scan(uml_model, type):
+    assert uml_model.lselect(type) == linear_select(uml_model, type)
+
+
+@pytest.mark.benchmark
+def test_select_time(uml_model, record_time):
+    record_time("select_time", lambda: uml_model.lselect(UML.Stereotype), number=50)
+    record_time(
+        "linear_select_time",
+        lambda: linear_select(uml_model, UML.Stereotype),
+        number=50,
+    )
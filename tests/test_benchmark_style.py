@@ -0,0 +1,97 @@
+"""Count selector calls and style recomputations for updates of diagrams in
+a model.
+
+Rules are indexed, so a style node is only matched against rules that
+can apply to it. The number of selector calls, and the number of calls
+if every rule were tested against every style node, are recorded as
+properties in the test report, as well as the number of styles recomputed
+when one item per diagram is updated.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from gaphor.core.modeling import Diagram, StyleSheet
+from gaphor.core.styling import CompiledStyleSheet
+from gaphor.storage.storage import load
+
+MODEL = Path(__file__).parent.parent / "examples" / "coffee-machine.gaphor"
+
+
+class Counter:
+    def __init__(self):
+        self.count = 0
+
+    def wrap(self, func):
+        def counting(*args):
+            self.count += 1
+            return func(*args)
+
+        return counting
+
+
+@pytest.fixture
+def coffee_machine(element_factory, modeling_language):
+    with MODEL.open(encoding="utf-8") as file_obj:
+        load(file_obj, element_factory, modeling_language)
+    return element_factory
+
+
+@pytest.mark.benchmark
+def test_selector_calls_per_diagram_update(
+    coffee_machine, monkeypatch, record_property
+):
+    style_sheet = next(coffee_machine.select(StyleSheet))
+    # Diagrams start with a new copy, without cached styles
+    style_sheet.compile_style_sheet()
+    compiled_style_sheet = style_sheet.compiled_style_sheet
+
+    selector_calls = Counter()
+    compiled_style_sheet.rules = [
+        (selector_calls.wrap(selector), declarations, key)
+        for selector, declarations, key in compiled_style_sheet.rules
+    ]
+    computed_styles = Counter()
+    monkeypatch.setattr(
+        CompiledStyleSheet,
+        "_compute_style_uncached",
+        computed_styles.wrap(CompiledStyleSheet._compute_style_uncached),
+    )
+
+    for diagram in coffee_machine.select(Diagram):
+        diagram.update_now(list(diagram.get_all_items()))
+
+    linear_calls = computed_styles.count * len(compiled_style_sheet.rules)
+    record_property("selector_calls", selector_calls.count)
+    record_property("linear_selector_calls", linear_calls)
+
+    assert computed_styles.count
+    assert selector_calls.count < linear_calls
+
+
+@pytest.mark.benchmark
+def test_style_recomputations_per_item_update(
+    coffee_machine, monkeypatch, record_property
+):
+    diagrams = coffee_machine.lselect(Diagram)
+    for diagram in diagrams:
+        diagram.update_now(list(diagram.get_all_items()))
+    cached_styles = sum(
+        diagram.compiled_style_sheet().cache_info().size for diagram in diagrams
+    )
+
+    computed_styles = Counter()
+    monkeypatch.setattr(
+        CompiledStyleSheet,
+        "_compute_style_uncached",
+        computed_styles.wrap(CompiledStyleSheet._compute_style_uncached),
+    )
+    for diagram in diagrams:
+        if items := list(diagram.get_all_items()):
+            diagram.update_now(items[:1])
+
+    record_property("cached_styles", cached_styles)
+    record_property("item_update_recomputations", computed_styles.count)
+
+    assert 0 < computed_styles.count < cached_styles
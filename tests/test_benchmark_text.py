@@ -0,0 +1,80 @@
+"""Measure text layout for a full update of a diagram with 2000 items.
+
+Text shapes share a pool of Pango layouts, and text sizes are cached. The
+number of layouts created, the number of text shapes (each shape used to
+own a layout), and the time and peak memory of a first and a second
+update are recorded as properties in the test report.
+"""
+
+import gc
+import tracemalloc
+
+import pytest
+from gi.repository import PangoCairo
+
+from gaphor import UML
+from gaphor.core.modeling import Diagram
+from gaphor.diagram import text
+from gaphor.diagram.shapes import Text
+from gaphor.UML.classes import ClassItem
+
+ITEMS = 2000
+
+
+@pytest.fixture
+def large_diagram(element_factory):
+    diagram = element_factory.create(Diagram)
+    # Create items like the model loader does: ordering items on each
+    # change would take most of the time
+    with element_factory.block_events():
+        for n in range(ITEMS):
+            class_ = element_factory.create(UML.Class)
+            class_.name = f"Class{n}"
+            for a in range(3):
+                attribute = element_factory.create(UML.Property)
+                attribute.name = f"attribute{a}"
+                attribute.typeValue = "int"
+                class_.ownedAttribute = attribute
+            diagram.create(ClassItem, subject=class_)
+    diagram.postload()
+    return diagram
+
+
+@pytest.mark.benchmark
+def test_text_layouts_are_shared(
+    large_diagram, monkeypatch, record_time, record_property
+):
+    layouts_created = 0
+    create_layout = PangoCairo.create_layout
+
+    def counting_create_layout(*args):
+        nonlocal layouts_created
+        layouts_created += 1
+        return create_layout(*args)
+
+    monkeypatch.setattr(PangoCairo, "create_layout", counting_create_layout)
+    monkeypatch.setattr(text, "text_layouts", text.TextLayouts())
+    monkeypatch.setattr("gaphor.diagram.shapes.text_layouts", text.text_layouts)
+
+    def measure_update(name):
+        items = list(large_diagram.get_all_items())
+        tracemalloc.start()
+        try:
+            record_time(f"{name}_time", lambda: large_diagram.update_now(items))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        record_property(f"{name}_peak_memory", peak)
+
+    measure_update("first_update")
+    measure_update("second_update")
+
+    shapes = sum(isinstance(o, Text) for o in gc.get_objects())
+    cache_info = text.text_layouts.cache_info()
+    record_property("text_shapes", shapes)
+    record_property("layouts_created", layouts_created)
+    record_property("text_size_hits", cache_info.hits)
+    record_property("text_size_misses", cache_info.misses)
+
+    assert layouts_created <= text.text_layouts.max_layouts < shapes
+    assert cache_info.hits > cache_info.misses
@@ -0,0 +1,54 @@
+"""Measure sorting a package with 10k elements in the model browser.
+
+Tree items keep a normalized sort key, so comparisons do not normalize
+text. Sort times with the tree item comparison function (as used by the
+GTK sorter), the sort key function (as used by tree search), and a
+comparison that normalizes text on every call are recorded as properties
+in the test report.
+"""
+
+import functools
+import random
+from unicodedata import normalize
+
+import pytest
+
+from gaphor import UML
+from gaphor.ui.treemodel import Branch, tree_item_sort, tree_item_sort_key
+
+ELEMENTS = 10_000
+
+
+@pytest.fixture
+def large_branch(element_factory):
+    names = [f"Élément {n}" for n in range(ELEMENTS)]
+    random.Random(0).shuffle(names)
+    branch = Branch()
+    with element_factory.block_events():
+        for name in names:
+            class_ = element_factory.create(UML.Class)
+            class_.name = name
+            branch.append(class_)
+    return list(branch)
+
+
+def normalizing_sort(a, b):
+    na = normalize("NFC", a.readonly_text).casefold()
+    nb = normalize("NFC", b.readonly_text).casefold()
+    return (na > nb) - (na < nb)
+
+
+@pytest.mark.benchmark
+def test_sort_large_branch(large_branch, record_time, record_property):
+    def measure_sort(name, key):
+        return record_time(name, lambda: sorted(large_branch, key=key))
+
+    record_property("elements", ELEMENTS)
+    normalizing = measure_sort(
+        "normalizing_sort_time", functools.cmp_to_key(normalizing_sort)
+    )
+    compared = measure_sort("sort_time", functools.cmp_to_key(tree_item_sort))
+    keyed = measure_sort("sort_key_time", tree_item_sort_key)
+
+    assert compared == normalizing
+    assert keyed == normalizing
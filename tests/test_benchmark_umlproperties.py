@@ -0,0 +1,49 @@
+"""Compare the cached property table with scanning a class for properties.
+
+Lookup times are recorded as properties in the test report.
+"""
+
+import pytest
+
+from gaphor import UML
+from gaphor.core.modeling import Element
+from gaphor.core.modeling.element import property_table
+from gaphor.core.modeling.properties import umlproperty
+from gaphor.RAAML import raaml
+from gaphor.SysML import sysml
+from gaphor.UML.classes import ClassItem
+
+
+def scan_umlproperties(cls):
+    for propname in dir(cls):
+        if not propname.startswith("_"):
+            prop = getattr(cls, propname)
+            if isinstance(prop, umlproperty):
+                yield prop
+
+
+def all_element_classes():
+    for module in (UML.uml, sysml, raaml):
+        for name in dir(module):
+            cls = getattr(module, name)
+            if isinstance(cls, type) and issubclass(cls, Element):
+                yield cls
+
+
+@pytest.mark.parametrize("cls", list(all_element_classes()) + [ClassItem])
+def test_property_table_equals_scan(cls):
+    assert property_table(cls).all == tuple(scan_umlproperties(cls))
+
+
+@pytest.mark.benchmark
+def test_umlproperties_time(record_time):
+    record_time(
+        "cached_umlproperties_time",
+        lambda: list(UML.Class.umlproperties()),
+        number=1000,
+    )
+    record_time(
+        "scan_umlproperties_time",
+        lambda: list(scan_umlproperties(UML.Class)),
+        number=1000,
+    )
@@ -0,0 +1,57 @@
+"""Measure the memory used by the undo log for a large transaction.
+
+A transaction creates 10k classes and names them. The memory allocated
+by the undo manager while recording, as traced by tracemalloc, and the
+memory estimated by the undo manager are recorded per event as
+properties in the test report.
+"""
+
+import tracemalloc
+
+import pytest
+
+from gaphor import UML
+from gaphor.services import undomanager
+from gaphor.services.undomanager import UndoManager
+from gaphor.transaction import Transaction
+
+CLASSES = 10_000
+
+
+@pytest.fixture
+def undo_manager(event_manager, element_factory):
+    undo_manager = UndoManager(event_manager, element_factory)
+    yield undo_manager
+    undo_manager.shutdown()
+
+
+@pytest.mark.benchmark
+def test_undo_log_memory(
+    event_manager, element_factory, undo_manager, record_time, record_property
+):
+    tracemalloc.start()
+    try:
+        with Transaction(event_manager):
+            for n in range(CLASSES):
+                element_factory.create(UML.Class).name = f"Class{n}"
+            snapshot = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+
+    traced = sum(
+        stat.size
+        for stat in snapshot.filter_traces(
+            [tracemalloc.Filter(True, undomanager.__file__)]
+        ).statistics("filename")
+    )
+    transaction = undo_manager._undo_stack[-1]
+    events = len(transaction._actions)
+
+    record_time("undo_time", undo_manager.undo_transaction)
+
+    record_property("events", events)
+    record_property("traced_bytes_per_event", traced / events)
+    record_property("estimated_bytes_per_event", transaction.size / events)
+
+    assert element_factory.size() == 0
+    assert traced < transaction.size
@@ -0,0 +1,46 @@
+"""Compare loading a model that requires upgrading with loading the same
+model in the current file format.
+
+Load times are recorded as properties in the test report.
+"""
+
+from io import StringIO
+from pathlib import Path
+
+import pytest
+
+from gaphor.storage import storage
+
+MODEL = Path(__file__).parent.parent / "test-models" / "all-elements-v2.5.gaphor"
+
+
+def load(data, element_factory, modeling_language):
+    storage.load(StringIO(data), element_factory, modeling_language)
+
+
+def save(element_factory):
+    out = StringIO()
+    storage.save(out, element_factory=element_factory)
+    return out.getvalue()
+
+
+@pytest.mark.benchmark
+def test_load_upgraded_and_current_model(
+    element_factory, modeling_language, record_time
+):
+    old_data = MODEL.read_text(encoding="utf-8")
+    load(old_data, element_factory, modeling_language)
+    current_data = save(element_factory)
+
+    record_time(
+        "upgrade_load_time",
+        lambda: load(old_data, element_factory, modeling_language),
+        repeat=3,
+    )
+    record_time(
+        "current_load_time",
+        lambda: load(current_data, element_factory, modeling_language),
+        repeat=3,
+    )
+
+    assert save(element_factory) == current_data
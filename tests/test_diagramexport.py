@@ -1,8 +1,17 @@
 import importlib
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
+from gaphor import UML
+from gaphor.core.modeling import Diagram
 from gaphor.main import main
+from gaphor.plugins.diagramexport import exportcli
+from gaphor.plugins.diagramexport.exportcli import (
+    export_files,
+    export_parser,
+    render_in_parallel,
+)
 
 
 def test_help_output(capsys):
@@ -16,6 +25,9 @@ def test_help_output(capsys):
     assert "--dir directory" in captured.out
     assert "--format format" in captured.out
     assert "--regex regex" in captured.out
+    assert "--jobs N" in captured.out
+    assert "--incremental" in captured.out
+    assert "--tile-size pixels" in captured.out
 
 
 @pytest.fixture
@@ -48,3 +60,83 @@ def test_export_svg(tmp_path, model):
 
     assert model_path.exists()
     assert (model_path / "main.svg").exists()
+
+
+def test_export_svg_in_parallel(tmp_path, model):
+    main(["gaphor", "export", "-j", "2", "-f", "svg", "-o", str(tmp_path), str(model)])
+
+    model_path = tmp_path / "New model"
+
+    assert model_path.exists()
+    assert (model_path / "main.svg").exists()
+
+
+def test_incremental_export_skips_unchanged_diagrams(tmp_path, model):
+    main(["gaphor", "export", "-i", "-f", "svg", "-o", str(tmp_path), str(model)])
+    outfile = tmp_path / "New model" / "main.svg"
+    outfile.write_text("unchanged", encoding="utf-8")
+
+    main(["gaphor", "export", "-i", "-f", "svg", "-o", str(tmp_path), str(model)])
+
+    assert outfile.read_text(encoding="utf-8") == "unchanged"
+    assert (tmp_path / "New model" / "main.svg.fingerprint").exists()
+
+
+def test_export_removes_fingerprints(tmp_path, model):
+    main(["gaphor", "export", "-i", "-f", "svg", "-o", str(tmp_path), str(model)])
+    main(["gaphor", "export", "-f", "svg", "-o", str(tmp_path), str(model)])
+
+    assert not (tmp_path / "New model" / "main.svg.fingerprint").exists()
+
+
+def test_export_files_in_model_order(tmp_path, element_factory):
+    package = element_factory.create(UML.Package)
+    package.name = "pkg"
+    diagrams = [element_factory.create(Diagram) for _ in range(3)]
+    for n, diagram in enumerate(diagrams):
+        diagram.name = f"d{n}"
+        diagram.element = package
+    args = export_parser().parse_args(["-o", str(tmp_path), "model.gaphor"])
+
+    files = export_files(element_factory, args)
+
+    assert files == [
+        (diagram.id, f"{tmp_path}/pkg/d{n}.pdf") for n, diagram in enumerate(diagrams)
+    ]
+
+
+def test_export_files_to_same_file_exports_last_diagram(tmp_path, element_factory):
+    package = element_factory.create(UML.Package)
+    package.name = "pkg"
+    first = element_factory.create(Diagram)
+    first.name = "d"
+    first.element = package
+    last = element_factory.create(Diagram)
+    last.name = "d"
+    last.element = package
+    args = export_parser().parse_args(["-o", str(tmp_path), "model.gaphor"])
+
+    files = export_files(element_factory, args)
+
+    assert files == [(last.id, f"{tmp_path}/pkg/d.pdf")]
+
+
+def test_render_in_parallel_reports_in_file_order(monkeypatch):
+    shards = []
+
+    def render_shard(model, files, format, tile_size):
+        shards.append(files)
+        return [(outfilename, 1.0) for _, outfilename in reversed(files)]
+
+    monkeypatch.setattr(
+        exportcli,
+        "ProcessPoolExecutor",
+        lambda max_workers, mp_context: ThreadPoolExecutor(max_workers),
+    )
+    monkeypatch.setattr(exportcli, "render_shard", render_shard)
+    files = [(str(n), f"{n}.pdf") for n in range(5)]
+
+    timings = render_in_parallel("model.gaphor", files, "pdf", 2)
+
+    assert sorted(shards) == [files[0::2], files[1::2]]
+    assert timings == [(f"{n}.pdf", 1.0) for n in range(5)]